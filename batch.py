@@ -0,0 +1,144 @@
+"""
+Module to run one star's solver over many input files at once, spreading the
+files over a pool of worker processes. Each worker loads the solver a single
+time and then keeps it warm for every file it is handed. A memory budget can be
+set on each solve, so that one oversized input fails on its own instead of
+exhausting a worker that the other inputs share.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from glob import glob
+from time import perf_counter
+from typing import Iterator
+import argparse
+import sys
+
+from budget import memory_budget
+from cache import ResultCache
+from solvers import get_solver, solver
+import instrument
+
+# batch_results are stored as a tuple with the following elements:
+# (filename, answer, seconds, error), where answer is None if the solver raised
+# and error is None if it did not.
+batch_result = tuple[str, int | None, float, str | None]
+
+_worker_star: tuple[int, int] | None = None
+_worker_solver: solver | None = None
+_worker_cache: ResultCache | None = None
+_worker_budget: float | None = None
+
+
+def _start_worker(day: int, part: int, timings: bool, memory: bool, cache_path: str | None,
+                  budget: float | None) -> None:
+    """
+    Runs once in every worker process, importing the solver so that it is
+    already loaded when the first file arrives, and opening the worker's own
+    connection to the result cache if one is used.
+    """
+    global _worker_star, _worker_solver, _worker_cache, _worker_budget
+    if timings:
+        instrument.enable(memory=memory)
+    _worker_star = (day, part)
+    _worker_budget = budget
+    _worker_solver = get_solver(day, part)
+    if cache_path is not None:
+        _worker_cache = ResultCache(cache_path or None)
+
+
+def _solve_file(filename: str) -> tuple[batch_result, instrument.phase_stats]:
+    """
+    Solves a single input file inside a worker, timing the read and the solve
+    together. Errors are returned rather than raised so that one bad input does
+    not end the whole batch, including going over the memory budget. Any phase
+    timings recorded during the solve are sent back alongside the result.
+    """
+    start = perf_counter()
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+        with memory_budget(_worker_budget):
+            if _worker_cache is None:
+                answer = _worker_solver(data.decode("utf-8"))
+            else:
+                answer = _worker_cache.solve(*_worker_star, data)
+    except Exception as error:  # pylint: disable = broad-exception-caught
+        result = filename, None, perf_counter() - start, f"{type(error).__name__}: {error}"
+    else:
+        result = filename, answer, perf_counter() - start, None
+    return result, instrument.collect()
+
+
+def run_batch(day: int, part: int, filenames: list[str], workers: int | None = None,
+              cache_path: str | None = None,
+              budget: float | None = None) -> Iterator[batch_result]:
+    """
+    Solves every input file for a star across a pool of worker processes,
+    yielding each result as soon as it completes. If instrumentation is enabled
+    in this process, it is enabled in the workers too and their phase timings
+    are merged into this process's.
+
+    Inputs:
+        day: the day of the puzzle, from 1 to 25
+        part: the part of the puzzle, 1 or 2
+        filenames: the input files to solve
+        workers: the number of worker processes, defaulting to the CPU count
+        cache_path: the result cache to use, where "" means the default cache
+            and None means no cache
+        budget: the memory budget of each solve in MiB, or None for no budget
+    """
+    # Checks the star exists before any workers are started.
+    get_solver(day, part)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker,
+                             initargs=(day, part, instrument.is_enabled(),
+                                       instrument.is_tracing_memory(), cache_path,
+                                       budget)) as executor:
+        futures = [executor.submit(_solve_file, filename) for filename in filenames]
+        for future in as_completed(futures):
+            result, stats = future.result()
+            instrument.merge(stats)
+            yield result
+
+
+def main(args: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Solve many inputs for one star.")
+    parser.add_argument("day", type=int)
+    parser.add_argument("part", type=int)
+    parser.add_argument("pattern", help="a glob matching the input files")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("--timings", action="store_true",
+                        help="report the time and allocations of each phase over all files")
+    parser.add_argument("--memory", action="store_true",
+                        help="also report the peak memory of each phase (slow)")
+    parser.add_argument("--cache", metavar="PATH", nargs="?", const="",
+                        help="look answers up in (and save them to) a result cache")
+    parser.add_argument("--memory-budget", metavar="MB", type=float, default=None,
+                        help="flush caches, then fail the file, if a solve goes over MB MiB")
+    options = parser.parse_args(args)
+
+    if options.timings or options.memory:
+        instrument.enable(memory=options.memory)
+
+    filenames = sorted(glob(options.pattern))
+    if not filenames:
+        raise FileNotFoundError(f"No input files match {options.pattern}")
+
+    start = perf_counter()
+    failures = 0
+    for filename, answer, seconds, error in run_batch(options.day, options.part, filenames,
+                                                      options.workers, options.cache,
+                                                      options.memory_budget):
+        if error is None:
+            print(f"{filename}\t{answer}\t{seconds:.4f}s")
+        else:
+            failures += 1
+            print(f"{filename}\tERROR {error}\t{seconds:.4f}s")
+    total = perf_counter() - start
+    print(f"Solved {len(filenames) - failures} / {len(filenames)} files in {total:.2f}s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
+    sys.exit(0)
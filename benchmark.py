@@ -0,0 +1,432 @@
+"""
+Module to benchmark every solver on synthetic inputs of growing size. Each
+measurement runs in a fresh process so that its peak RSS belongs to that one
+solve, and the results are printed as a scaling table.
+
+The exponent column estimates k in time ~ n^k between consecutive sizes, which
+makes super-linear solvers easy to spot.
+
+With --loader, the parsers ported to the zero-copy loader are instead timed on
+a large input file, once reading it into a string and once memory-mapping it.
+With --engines, the accelerated engines registered in solvers.ENGINES are timed
+next to the reference solver of their star, on the same input files. With
+--parsers, the alternative parsers of a day are timed on one memory-mapped
+input, reporting their throughput and the peak memory they allocate.
+"""
+from importlib import import_module
+from math import ceil, log
+from typing import Callable, Iterator
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from generators import generate
+from instrument import peak_rss
+from loader import map_input
+from solvers import ENGINES, SOLVERS, get_solver
+
+# Default size sweeps for each day. Days whose solvers are exponential or
+# quadratic in their size get shorter sweeps so that a full run stays short.
+DEFAULT_SIZES: dict[int, tuple[int, ...]] = {
+    1: (1000, 10000, 100000),
+    2: (1000, 10000, 100000),
+    3: (50, 100, 200, 400),
+    4: (1000, 10000, 100000),
+    5: (100, 1000, 10000),
+    6: (4, 8, 16, 32),
+    7: (1000, 10000, 100000),
+    8: (1000, 4000, 16000),
+    9: (1000, 10000, 100000),
+    10: (100, 200, 400, 800),
+    11: (100, 200, 400, 800),
+    12: (100, 1000, 10000),
+    13: (100, 1000, 10000),
+    14: (25, 50, 100),
+    15: (1000, 10000, 100000),
+    16: (25, 50, 100),
+    17: (50, 100, 200),
+    18: (1000, 10000, 100000),
+    19: (100, 1000, 10000),
+    20: (14, 28, 56),
+    21: (65, 131, 263, 525),
+    22: (250, 500, 1000, 2000),
+    23: (15, 21, 27, 33),
+    24: (50, 100, 200, 400),
+    25: (100, 200, 400, 800),
+}
+
+# The parsers which accept a buffer from map_input, as (module, function) pairs.
+LOADER_PARSERS: dict[int, tuple[str, str]] = {
+    2: ("day_02", "parse_input"),
+    4: ("day_04", "parse_input"),
+    7: ("day_07_part_1", "parse_input"),
+    19: ("day_19_part_1", "parse_input"),
+    22: ("day_22", "create_bricks"),
+}
+
+# The generator size of the input repeated to build a large file for --loader.
+LOADER_CHUNK_SIZE = 10000
+
+# The parsers of a day compared by --parsers, as (module, function) pairs, with
+# the day's original parser first. Each takes in a buffer from map_input.
+PARSER_VARIANTS: dict[int, list[tuple[str, str]]] = {
+    2: [("day_02", "parse_input"), ("day_02", "parse_max_table"), ("day_02", "fold_games")],
+    4: [("day_04", "parse_input"), ("day_04", "parse_match_counts")],
+}
+
+# benchmark_rows are stored as a tuple with the following elements:
+# (day, part, size, seconds, peak_rss_mb, error), where seconds and peak_rss_mb
+# are None if the measurement failed, and error is None if it did not.
+benchmark_row = tuple[int, int, int, float | None, float | None, str | None]
+# loader_rows are stored the same way, as (day, method, file_mb, seconds,
+# peak_rss_mb, error), where method is "read" or "mmap".
+loader_row = tuple[int, str, float, float | None, float | None, str | None]
+# engine_rows are stored as (day, part, function, file_mb, seconds, peak_rss_mb,
+# error), where function is the module.function name of the solver or engine.
+engine_row = tuple[int, int, str, float, float | None, float | None, str | None]
+# parser_rows are stored as (day, function, file_mb, seconds, allocated_mb,
+# error), where allocated_mb is the peak memory traced by tracemalloc while
+# parsing, which leaves out the pages of the memory-mapped file.
+parser_row = tuple[int, str, float, float | None, float | None, str | None]
+
+
+def _measure(connection, day: int, part: int, text: str) -> None:
+    """
+    Runs in a fresh child process, solving the text once and sending back the
+    wall time and the peak resident set size of the process in MiB.
+    """
+    try:
+        solver = get_solver(day, part)
+        start = time.perf_counter()
+        solver(text)
+        seconds = time.perf_counter() - start
+    except Exception as error:  # pylint: disable = broad-exception-caught
+        connection.send((None, None, f"{type(error).__name__}: {error}"))
+        return
+    connection.send((seconds, peak_rss(), None))
+
+
+def _spawn(target: Callable, args: tuple,
+           timeout: float) -> tuple[float | None, float | None, str | None]:
+    """
+    Runs a measuring function in a new process, passing it the sending end of
+    a pipe followed by args, and returns what it sends back. The process is
+    killed if it runs longer than the timeout.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=target, args=(sender, *args))
+    process.start()
+    sender.close()
+    if receiver.poll(timeout):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = (None, None, "the solver process died")
+    else:
+        process.kill()
+        result = (None, None, f"timed out after {timeout}s")
+    process.join()
+    return result
+
+
+def measure(day: int, part: int, text: str,
+            timeout: float) -> tuple[float | None, float | None, str | None]:
+    """
+    Solves an input in a new process, returning the wall time, the peak RSS in
+    MiB, and an error message (None if the solve succeeded). The process is
+    killed if it runs longer than the timeout.
+
+    Inputs:
+        day: the day of the puzzle, from 1 to 25
+        part: the part of the puzzle, 1 or 2
+        text: the contents of the input file
+        timeout: the number of seconds to wait before giving up
+    """
+    return _spawn(_measure, (day, part, text), timeout)
+
+
+def run_benchmark(days: list[int], sizes: list[int] | None = None,
+                  timeout: float = 60, seed: int = 2023) -> Iterator[benchmark_row]:
+    """
+    Times every solver of the given days across a sweep of input sizes. A size
+    stops being increased for a star once it fails or times out.
+
+    Inputs:
+        days: the days to benchmark
+        sizes: the sizes to sweep, defaulting to DEFAULT_SIZES for each day
+        timeout: the number of seconds allowed for a single solve
+        seed: the seed passed to the input generators
+    """
+    for day in days:
+        texts = {size: generate(day, size, seed) for size in sizes or DEFAULT_SIZES[day]}
+        for part in (1, 2):
+            if (day, part) not in SOLVERS:
+                continue
+            for size, text in texts.items():
+                seconds, peak, error = measure(day, part, text, timeout)
+                yield day, part, size, seconds, peak, error
+                if error is not None:
+                    break
+
+
+def _measure_loader(connection, day: int, filename: str, mapped: bool) -> None:
+    """
+    Runs in a fresh child process, parsing an input file once and sending back
+    the wall time, including reading the file, and the peak RSS in MiB.
+    """
+    try:
+        module_name, function_name = LOADER_PARSERS[day]
+        parser = getattr(import_module(module_name), function_name)
+        start = time.perf_counter()
+        if mapped:
+            with map_input(filename) as data:
+                parser(data)
+        else:
+            with open(filename, encoding="utf-8") as f:
+                parser(f.read())
+        seconds = time.perf_counter() - start
+    except Exception as error:  # pylint: disable = broad-exception-caught
+        connection.send((None, None, f"{type(error).__name__}: {error}"))
+        return
+    connection.send((seconds, peak_rss(), None))
+
+
+def write_input(day: int, megabytes: float, seed: int, directory: str) -> str:
+    """
+    Writes a generated input of roughly the given size to a file in directory,
+    returning its path. The generators cannot reach such sizes for every day
+    (day 7 runs out of distinct hands), so the last section of a generated
+    input, which is the whole input for most days and the items for day 19, is
+    repeated until the file is large enough.
+    """
+    text = generate(day, LOADER_CHUNK_SIZE, seed)
+    head, _, body = text.rpartition("\n\n")
+    body = body.rstrip("\n") + "\n"
+    repeats = max(1, ceil((megabytes * 1024 ** 2 - len(head)) / len(body)))
+    path = os.path.join(directory, f"day_{day:02}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        if head:
+            f.write(head + "\n\n")
+        for _ in range(repeats):
+            f.write(body)
+    return path
+
+
+def run_loader_benchmark(days: list[int], megabytes: float = 1024, timeout: float = 600,
+                         seed: int = 2023) -> Iterator[loader_row]:
+    """
+    Times the loader-based parsers of the given days on one large input each,
+    first reading the file into a string and then memory-mapping it.
+
+    Inputs:
+        days: the days to benchmark, skipping any not in LOADER_PARSERS
+        megabytes: the approximate size of each input file in MiB
+        timeout: the number of seconds allowed for a single parse
+        seed: the seed passed to the input generators
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for day in days:
+            if day not in LOADER_PARSERS:
+                continue
+            path = write_input(day, megabytes, seed, directory)
+            size = os.path.getsize(path) / 1024 ** 2
+            for method, mapped in (("read", False), ("mmap", True)):
+                yield (day, method, size,
+                       *_spawn(_measure_loader, (day, path, mapped), timeout))
+            os.remove(path)
+
+
+def _measure_file(connection, module_name: str, function_name: str, filename: str) -> None:
+    """
+    Runs in a fresh child process, reading an input file and then solving it
+    once, sending back the wall time of the solve alone and the peak RSS in MiB.
+    """
+    try:
+        function = getattr(import_module(module_name), function_name)
+        with open(filename, encoding="utf-8") as f:
+            text = f.read()
+        start = time.perf_counter()
+        function(text)
+        seconds = time.perf_counter() - start
+    except Exception as error:  # pylint: disable = broad-exception-caught
+        connection.send((None, None, f"{type(error).__name__}: {error}"))
+        return
+    connection.send((seconds, peak_rss(), None))
+
+
+def run_engine_benchmark(days: list[int], sizes: list[int] | None = None,
+                         megabytes: float | None = None, timeout: float = 60,
+                         seed: int = 2023) -> Iterator[engine_row]:
+    """
+    Times the engines registered for the given days against the solvers they
+    stand in for. Inputs are written to files, so that large ones are not
+    passed between processes, and each solve runs in a fresh process.
+
+    Inputs:
+        days: the days to benchmark, skipping any without engines
+        sizes: the generator sizes to sweep, defaulting to DEFAULT_SIZES
+        megabytes: if given, time a single input of about this many MiB
+            (built like the --loader inputs) instead of sweeping sizes
+        timeout: the number of seconds allowed for a single solve
+        seed: the seed passed to the input generators
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for day in days:
+            stars = [(part, [SOLVERS[(day, part)], *ENGINES[(day, part)]])
+                     for part in (1, 2) if ENGINES.get((day, part))]
+            if not stars:
+                continue
+            if megabytes is not None:
+                paths = [write_input(day, megabytes, seed, directory)]
+            else:
+                paths = []
+                for size in sizes or DEFAULT_SIZES[day]:
+                    paths.append(os.path.join(directory, f"day_{day:02}_{size}.txt"))
+                    with open(paths[-1], "w", encoding="utf-8") as f:
+                        f.write(generate(day, size, seed))
+            for path in paths:
+                file_size = os.path.getsize(path) / 1024 ** 2
+                for part, functions in stars:
+                    for module_name, function_name in functions:
+                        yield (day, part, f"{module_name}.{function_name}", file_size,
+                               *_spawn(_measure_file, (module_name, function_name, path),
+                                       timeout))
+                os.remove(path)
+
+
+def _measure_parser(connection, module_name: str, function_name: str, filename: str) -> None:
+    """
+    Runs in a fresh child process, parsing a memory-mapped input file once for
+    the wall time and once more under tracemalloc for the peak memory the
+    parser allocates, and sending both back.
+    """
+    try:
+        function = getattr(import_module(module_name), function_name)
+        with map_input(filename) as data:
+            start = time.perf_counter()
+            function(data)
+            seconds = time.perf_counter() - start
+            tracemalloc.start()
+            function(data)
+            allocated = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+    except Exception as error:  # pylint: disable = broad-exception-caught
+        connection.send((None, None, f"{type(error).__name__}: {error}"))
+        return
+    connection.send((seconds, allocated, None))
+
+
+def run_parser_benchmark(days: list[int], megabytes: float = 256, timeout: float = 600,
+                         seed: int = 2023) -> Iterator[parser_row]:
+    """
+    Times the parsers in PARSER_VARIANTS for the given days on one large input
+    each, memory-mapped, along with the peak memory each allocates.
+
+    Inputs:
+        days: the days to benchmark, skipping any not in PARSER_VARIANTS
+        megabytes: the approximate size of each input file in MiB
+        timeout: the number of seconds allowed for both parses
+        seed: the seed passed to the input generators
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for day in days:
+            if day not in PARSER_VARIANTS:
+                continue
+            path = write_input(day, megabytes, seed, directory)
+            size = os.path.getsize(path) / 1024 ** 2
+            for module_name, function_name in PARSER_VARIANTS[day]:
+                yield (day, f"{module_name}.{function_name}", size,
+                       *_spawn(_measure_parser, (module_name, function_name, path), timeout))
+            os.remove(path)
+
+
+def main(args: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark solvers on synthetic inputs.")
+    parser.add_argument("days", type=int, nargs="*", default=list(range(1, 26)),
+                        help="the days to benchmark (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help="input sizes to sweep (default: a sweep per day)")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="seconds allowed for a single solve")
+    parser.add_argument("--seed", type=int, default=2023)
+    parser.add_argument("--loader", action="store_true",
+                        help="compare reading and memory-mapping large inputs instead")
+    parser.add_argument("--engines", action="store_true",
+                        help="compare the registered engines with their solvers instead")
+    parser.add_argument("--parsers", action="store_true",
+                        help="compare the throughput of alternative parsers instead")
+    parser.add_argument("--megabytes", type=float, default=None,
+                        help="approximate input size in MiB for --loader (default: 1024), "
+                             "--parsers (default: 256), or --engines (default: sweep --sizes)")
+    options = parser.parse_args(args)
+
+    if options.parsers:
+        print(f"{'day':>3} {'function':<35} {'file MiB':>9} {'seconds':>10} {'MiB/s':>9} "
+              f"{'alloc MiB':>9} {'speedup':>8}")
+        baseline: float | None = None
+        for day, function, size, seconds, allocated, error in run_parser_benchmark(
+                options.days, options.megabytes or 256, options.timeout, options.seed):
+            # The original parser comes first for each day.
+            is_baseline = function == ".".join(PARSER_VARIANTS[day][0])
+            if is_baseline:
+                baseline = seconds
+            if error is not None:
+                print(f"{day:>3} {function:<35} {size:>9.1f} {error}")
+                continue
+            speedup = "" if is_baseline or not baseline else f"{baseline / seconds:.2f}x"
+            print(f"{day:>3} {function:<35} {size:>9.1f} {seconds:>10.4f} "
+                  f"{size / seconds:>9.1f} {allocated:>9.1f} {speedup:>8}")
+        return
+
+    if options.engines:
+        print(f"{'day':>3} {'part':>4} {'function':<35} {'file MiB':>9} {'seconds':>10} "
+              f"{'peak MiB':>9} {'speedup':>8}")
+        reference: float | None = None
+        for day, part, function, size, seconds, peak, error in run_engine_benchmark(
+                options.days, options.sizes, options.megabytes, options.timeout, options.seed):
+            # The star's solver comes first for each file, and the engines
+            # after it are compared with its time.
+            is_reference = function == ".".join(SOLVERS[(day, part)])
+            if is_reference:
+                reference = seconds
+            if error is not None:
+                print(f"{day:>3} {part:>4} {function:<35} {size:>9.1f} {error}")
+                continue
+            speedup = "" if is_reference or not reference else f"{reference / seconds:.2f}x"
+            print(f"{day:>3} {part:>4} {function:<35} {size:>9.1f} {seconds:>10.4f} "
+                  f"{peak:>9.1f} {speedup:>8}")
+        return
+
+    if options.loader:
+        print(f"{'day':>3} {'method':>6} {'file MiB':>9} {'seconds':>10} {'peak MiB':>9}")
+        for day, method, size, seconds, peak, error in run_loader_benchmark(
+                options.days, options.megabytes or 1024, options.timeout, options.seed):
+            if error is not None:
+                print(f"{day:>3} {method:>6} {size:>9.1f} {error}")
+            else:
+                print(f"{day:>3} {method:>6} {size:>9.1f} {seconds:>10.4f} {peak:>9.1f}")
+        return
+
+    print(f"{'day':>3} {'part':>4} {'n':>9} {'seconds':>10} {'peak MiB':>9} {'exponent':>8}")
+    last: tuple[int, int, int, float] | None = None
+    for day, part, size, seconds, peak, error in run_benchmark(
+            options.days, options.sizes, options.timeout, options.seed):
+        if error is not None:
+            print(f"{day:>3} {part:>4} {size:>9} {error}")
+            last = None
+            continue
+        exponent = ""
+        if last is not None and last[:2] == (day, part) and last[3] > 0 and size != last[2]:
+            exponent = f"{log(seconds / last[3]) / log(size / last[2]):.2f}"
+        print(f"{day:>3} {part:>4} {size:>9} {seconds:>10.4f} {peak:>9.1f} {exponent:>8}")
+        last = (day, part, size, seconds)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
+    sys.exit(0)
@@ -0,0 +1,104 @@
+"""
+Module providing memory budgets for solver runs, so that one oversized input
+cannot exhaust the memory of a process that is shared with other inputs, such
+as a batch worker.
+
+While a budget is in force, a watchdog thread polls the resident set size of
+the process. The first time it goes over budget, the caches registered by the
+day modules are flushed and the solve is allowed to carry on. If it grows past
+the budget again after that, the solve is interrupted with MemoryBudgetExceeded.
+"""
+from contextlib import contextmanager
+from typing import Callable, Iterator
+import _thread
+import gc
+import signal
+import threading
+
+from instrument import current_rss
+
+# The signal the watchdog interrupts the main thread with. It is simulated by
+# _thread.interrupt_main rather than sent to the process.
+INTERRUPT_SIGNAL = signal.SIGUSR1
+
+_caches: list[Callable] = []
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """
+    Raised inside a solve that kept growing past its memory budget even after
+    the registered caches were flushed.
+    """
+
+
+def register_cache(cached: Callable) -> Callable:
+    """
+    Decorator registering a function wrapped by functools.cache (or lru_cache)
+    so that its cache is flushed when a memory budget is exceeded. It is placed
+    above the cache decorator, and returns the cached function unchanged.
+    """
+    _caches.append(cached)
+    return cached
+
+
+def flush_caches() -> None:
+    """
+    Clears every registered cache and collects the garbage they leave behind.
+    """
+    for cached in _caches:
+        cached.cache_clear()
+    gc.collect()
+
+
+def _interrupt(signum, frame):
+    raise MemoryBudgetExceeded("The solve went over its memory budget.")
+
+
+@contextmanager
+def memory_budget(megabytes: float | None, interval: float = 0.01) -> Iterator[None]:
+    """
+    Enforces a memory budget on the body of the with statement, which has to run
+    in the main thread. If the budget is exceeded, the registered caches are
+    flushed once, and the body is interrupted with MemoryBudgetExceeded if the
+    memory keeps growing. The caches are also flushed after an interrupted
+    body, so that the process is left in a usable state.
+
+    Inputs:
+        megabytes: the largest resident set size allowed, in MiB, or None for
+            no budget
+        interval: the number of seconds between checks of the memory
+    """
+    if megabytes is None:
+        yield
+        return
+
+    stop = threading.Event()
+
+    def watch():
+        limit = megabytes
+        flushed = False
+        while not stop.wait(interval):
+            if current_rss() <= limit:
+                continue
+            if not flushed:
+                flush_caches()
+                flushed = True
+                # Freed memory is mostly kept by the allocator for reuse rather
+                # than given back, so after a flush only further growth counts.
+                limit = max(limit, current_rss())
+                continue
+            _thread.interrupt_main(INTERRUPT_SIGNAL)
+            return
+
+    previous = signal.signal(INTERRUPT_SIGNAL, _interrupt)
+    watchdog = threading.Thread(target=watch, daemon=True)
+    watchdog.start()
+    try:
+        yield
+    except MemoryBudgetExceeded:
+        flush_caches()
+        raise
+    finally:
+        stop.set()
+        watchdog.join()
+        signal.signal(INTERRUPT_SIGNAL, previous)
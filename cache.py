@@ -0,0 +1,204 @@
+"""
+Module providing an on-disk cache of solver answers, so that inputs which have
+already been solved are answered without being read past their hash.
+
+Answers are stored in a SQLite database keyed by the star, a version of its
+solver, and the SHA-256 of the input bytes. The solver version is the hash of
+the source of every module of this repository the solver runs, so editing a
+day module, or any shared module it imports, invalidates its old answers. Once
+the stored rows grow past a size limit the least recently used ones are evicted.
+"""
+from functools import cache
+from hashlib import sha256
+from pathlib import Path
+import ast
+import os
+import sqlite3
+import time
+
+from solvers import COMBINED_SOLVERS, SOLVERS, get_combined_solver, get_solver
+
+REPO_DIRECTORY = Path(__file__).resolve().parent
+
+CACHE_VARIABLE = "ADVENT_CACHE"
+DEFAULT_PATH = Path.home() / ".cache" / "advent2023" / "results.sqlite"
+DEFAULT_MAX_BYTES = 16 * 1024 ** 2
+
+# Rough number of bytes SQLite spends on a row beyond its key and answer.
+ROW_OVERHEAD = 64
+
+
+def local_imports(source: bytes) -> set[str]:
+    """
+    Returns the names of the modules of this repository imported by a source
+    file, read from its syntax tree rather than by importing it.
+    """
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    return {name for name in names if (REPO_DIRECTORY / f"{name}.py").is_file()}
+
+
+def module_sources(module_names: list[str]) -> dict[str, bytes]:
+    """
+    Returns the source of each of the given modules of this repository and of
+    every repository module they import, directly or not.
+    """
+    sources = {}
+    pending = list(module_names)
+    while pending:
+        name = pending.pop()
+        if name in sources:
+            continue
+        sources[name] = (REPO_DIRECTORY / f"{name}.py").read_bytes()
+        pending.extend(local_imports(sources[name]))
+    return sources
+
+
+@cache
+def solver_version(day: int, part: int) -> str:
+    """
+    Returns the SHA-256 of the source of every module a star's answers may be
+    computed by: the module holding its solver, the module holding the day's
+    combined solver (whose answers are stored under the same version), and
+    every repository module either imports. The modules are read but not
+    imported, so that cache hits stay cheap.
+
+    Inputs:
+        day: the day of the puzzle, from 1 to 25
+        part: the part of the puzzle, 1 or 2
+    """
+    if (day, part) not in SOLVERS:
+        raise KeyError(f"There is no solver for day {day} part {part}.")
+    solvers = [SOLVERS[(day, part)]]
+    if day in COMBINED_SOLVERS:
+        solvers.append(COMBINED_SOLVERS[day])
+
+    digest = sha256()
+    for module_name, function_name in solvers:
+        digest.update(f"{module_name}.{function_name}\n".encode())
+    sources = module_sources([module_name for module_name, _ in solvers])
+    # Modules are hashed in order of name, so the version does not depend on
+    # the order they were found in.
+    for name in sorted(sources):
+        digest.update(f"{name}\n".encode() + sha256(sources[name]).digest())
+    return digest.hexdigest()
+
+
+def cache_key(day: int, part: int, data: bytes) -> str:
+    """
+    Returns the key an input is stored under: the star, its solver version, and
+    the SHA-256 of the input bytes.
+    """
+    return f"{day}:{part}:{solver_version(day, part)}:{sha256(data).hexdigest()}"
+
+
+class ResultCache:
+    """
+    A SQLite-backed store of solver answers with size-limited LRU eviction.
+
+    Connections are opened per instance, so each worker process of a batch
+    should create its own. SQLite's locking lets them share one database file.
+    """
+
+    path: Path
+    max_bytes: int
+
+    def __init__(self, path: str | Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path or os.environ.get(CACHE_VARIABLE) or DEFAULT_PATH)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=30)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, answer TEXT NOT NULL, "
+                "size INTEGER NOT NULL, accessed REAL NOT NULL)")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def __repr__(self):
+        return f"ResultCache({str(self.path)!r}, {self.max_bytes})"
+
+    def get(self, day: int, part: int, data: bytes) -> int | None:
+        """
+        Returns the stored answer for an input, or None if it has not been
+        solved by the current version of the solver.
+        """
+        key = cache_key(day, part, data)
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT answer FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        return int(row[0])
+
+    def put(self, day: int, part: int, data: bytes, answer: int) -> None:
+        """
+        Stores the answer for an input, evicting the least recently used
+        answers if the store has grown past its size limit.
+        """
+        key = cache_key(day, part, data)
+        # Answers are stored as text since some do not fit in a 64-bit integer.
+        stored = str(answer)
+        size = len(key) + len(stored) + ROW_OVERHEAD
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, stored, size, time.time()))
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        stale = []
+        for key, size in self._connection.execute(
+                "SELECT key, size FROM results ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._connection.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def solve(self, day: int, part: int, data: bytes) -> int:
+        """
+        Returns the answer for the bytes of an input file, only decoding and
+        solving it if the answer is not already stored.
+
+        Inputs:
+            day: the day of the puzzle, from 1 to 25
+            part: the part of the puzzle, 1 or 2
+            data: the raw contents of the input file
+        """
+        answer = self.get(day, part, data)
+        if answer is None:
+            answer = get_solver(day, part)(data.decode("utf-8"))
+            self.put(day, part, data, answer)
+        return answer
+
+    def solve_both(self, day: int, data: bytes) -> tuple[int, int]:
+        """
+        Returns the answers to both stars of a day for the bytes of an input
+        file. If either is missing, both are solved together and stored.
+        """
+        answers = (self.get(day, 1, data), self.get(day, 2, data))
+        if None in answers:
+            answers = get_combined_solver(day)(data.decode("utf-8"))
+            for part, answer in enumerate(answers, 1):
+                self.put(day, part, data, answer)
+        return answers
+
+    def clear(self) -> None:
+        with self._connection:
+            self._connection.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        self._connection.close()
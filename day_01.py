@@ -2,8 +2,15 @@
 Module to solve Day 1 of the Advent of Code 2023, which consists of the 1st and
 2nd stars overall.
 """
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import os
 import sys
 
+import numpy as np
+
+from instrument import phase
+
 DIGIT_STRINGS: dict[str, int] = {"zero": 0, "one": 1, "two": 2, "three": 3, "four": 4,
                                  "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9}
 
@@ -27,42 +34,146 @@ def find_digit(line: str, cha_index: int) -> int | None:
     return None
 
 
-def unscramble_simple(lines: list[str]) -> int:
+def build_digit_automaton(digit_strings: dict[str, int]) -> tuple[list[dict[str, int]],
+                                                                  list[int | None]]:
+    """
+    Builds an Aho-Corasick automaton matching every digit and spelled digit,
+    with its failure links folded into the transitions so that each character
+    is a single dictionary lookup. The automaton returns to the root state on
+    any character no pattern continues with.
+
+    Input:
+        digit_strings: the spelled digits and their values
+
+    Returns:
+        lst[dict[str, int]]: the next state for each state and character
+        lst[int | None]: the digit matched on entering each state, if any
+    """
+    patterns: dict[str, int] = {str(digit): digit for digit in range(10)} | digit_strings
+
+    # Builds the trie of the patterns first.
+    children: list[dict[str, int]] = [{}]
+    outputs: list[int | None] = [None]
+    for pattern, value in patterns.items():
+        state = 0
+        for cha in pattern:
+            if cha not in children[state]:
+                children.append({})
+                outputs.append(None)
+                children[state][cha] = len(children) - 1
+            state = children[state][cha]
+        outputs[state] = value
+
+    # Then walks it breadth first, so that the failure state of every state (the
+    # longest proper suffix of its path that is also in the trie) is finished
+    # before the state itself. Each state starts from the transitions of its
+    # failure state and overrides them with its own children.
+    transitions: list[dict[str, int]] = [dict(children[0])] + [{} for _ in children[1:]]
+    failures: list[int] = [0] * len(children)
+    queue = deque(children[0].values())
+    while queue:
+        state = queue.popleft()
+        failure = failures[state]
+        if outputs[state] is None:
+            outputs[state] = outputs[failure]
+        transitions[state] = transitions[failure] | children[state]
+        for cha, child in children[state].items():
+            failures[child] = transitions[failure].get(cha, 0)
+            queue.append(child)
+
+    return transitions, outputs
+
+
+DIGIT_TRANSITIONS, DIGIT_OUTPUTS = build_digit_automaton(DIGIT_STRINGS)
+
+# The number of bytes of a calibration document each worker of the streaming
+# mode is handed at a time.
+STREAM_CHUNK_BYTES = 64 * 1024 ** 2
+
+# The message of the SyntaxError raised for a line without a calibration value,
+# for each star.
+NO_DIGITS: dict[int, str] = {1: "Line contains no digits.",
+                             2: "Line contains no digits or number names."}
+
+
+def calibration_value_simple(line: str) -> int | None:
+    """
+    Returns the calibration value of a line made from its first and last
+    digits, or None if it has no digits.
+    """
+    cha: str
+    # Scan the line and place the first found digit into first_digit, then do
+    # the same to the line in reverse
+    for cha in line:
+        if cha.isdigit():
+            first_digit: int = int(cha)
+            break
+    else:
+        return None
+
+    for cha in reversed(line):
+        if cha.isdigit():
+            last_digit: int = int(cha)
+            break
+
+    return first_digit * 10 + last_digit
+
+
+def calibration_value_automaton(line: str) -> int | None:
+    """
+    Returns the calibration value of a line made from its first and last digits
+    or spelled digits, found in a single pass of the digit automaton without
+    slicing the line, or None if it has neither.
+
+    No spelled digit contains another or a digit, so the first match the
+    automaton reaches is the first digit of the line, and the last it reaches
+    is the last digit.
+    """
+    transitions = DIGIT_TRANSITIONS
+    outputs = DIGIT_OUTPUTS
+    first_digit: int | None = None
+    last_digit: int | None = None
+    state = 0
+    for cha in line:
+        state = transitions[state].get(cha, 0)
+        digit = outputs[state]
+        if digit is not None:
+            if first_digit is None:
+                first_digit = digit
+            last_digit = digit
+
+    if first_digit is None:
+        return None
+    return first_digit * 10 + last_digit
+
+
+@phase("solve")
+def unscramble_simple(lines: list[str], filename: str = "<input>") -> int:
     """
     Takes in an amended elf trebuchet calibration (see Day 1 of Advent of Code
     2023), decodes it by finding the proper calibration numbers, and sums these
     calibration numbers.
 
     Inputs:
-        file: the name of the input file
+        lines: the lines of the calibration document
+        filename: the name of the input file, used when reporting a bad line
     """
     answer: int = 0
 
     line: str
     line_index: int
-    cha: str
-    # Scan each line and place the first found digit into first_digit, then do
-    # the same to the line in reverse
     for line_index, line in enumerate(lines):
-        for cha in line:
-            if cha.isdigit():
-                first_digit: int = int(cha)
-                break
-        else:
-            raise SyntaxError("Line contains no digits.",
-                              (sys.argv[1], line_index + 1, 1, line, line_index + 1, len(line)))
-
-        for cha in reversed(line):
-            if cha.isdigit():
-                last_digit: int = int(cha)
-                break
-
-        answer += first_digit * 10 + last_digit
+        value: int | None = calibration_value_simple(line)
+        if value is None:
+            raise SyntaxError(NO_DIGITS[1],
+                              (filename, line_index + 1, 1, line, line_index + 1, len(line)))
+        answer += value
 
     return answer
 
 
-def unscramble_complex(lines: list[str]) -> int:
+@phase("solve")
+def unscramble_complex(lines: list[str], filename: str = "<input>") -> int:
     """
     Takes in an amended elf trebuchet calibration (see Day 1 of Advent of Code
     2023), decodes it by finding the proper calibration numbers (including
@@ -70,7 +181,8 @@ def unscramble_complex(lines: list[str]) -> int:
     calibration numbers.
 
     Inputs:
-        file(str): the name of the input file
+        lines: the lines of the calibration document
+        filename: the name of the input file, used when reporting a bad line
 
     Returns int
     """
@@ -89,8 +201,8 @@ def unscramble_complex(lines: list[str]) -> int:
             if first_digit is not None:
                 break
         else:
-            raise SyntaxError("Line contains no digits or number names.",
-                              (sys.argv[1], line_index + 1, 1, line, line_index + 1, len(line)))
+            raise SyntaxError(NO_DIGITS[2],
+                              (filename, line_index + 1, 1, line, line_index + 1, len(line)))
 
         for cha_index in reversed(range(line_length)):
             last_digit: int | None = find_digit(line, cha_index)
@@ -102,13 +214,234 @@ def unscramble_complex(lines: list[str]) -> int:
     return answer
 
 
-def main(filename: str) -> None:
-    with open(filename, encoding="utf-8") as f:
-        lines: list[str] = f.read().strip().split("\n")
-    print(f"Your Star 1 answer is {unscramble_simple(lines)}")
-    print(f"Your Star 2 answer is {unscramble_complex(lines)}")
+@phase("solve")
+def unscramble_automaton(lines: list[str], filename: str = "<input>") -> int:
+    """
+    Decodes an amended elf trebuchet calibration like unscramble_complex, but
+    finds both calibration digits of each line in a single pass of the digit
+    automaton (see calibration_value_automaton).
+
+    Inputs:
+        lines: the lines of the calibration document
+        filename: the name of the input file, used when reporting a bad line
+
+    Returns int
+    """
+    answer: int = 0
+
+    line: str
+    line_index: int
+    for line_index, line in enumerate(lines):
+        value: int | None = calibration_value_automaton(line)
+        if value is None:
+            raise SyntaxError(NO_DIGITS[2],
+                              (filename, line_index + 1, 1, line, line_index + 1, len(line)))
+        answer += value
+
+    return answer
+
+
+@phase("solve")
+def unscramble_vectorized(data: bytes, filename: str = "<input>") -> int:
+    """
+    Decodes an amended elf trebuchet calibration like unscramble_simple, but
+    finds the first and last digit of every line at once with NumPy rather
+    than scanning each line in Python. Input that is not ASCII, where a digit
+    may take more than one byte, is decoded and handed to unscramble_simple.
+
+    Inputs:
+        data: the raw contents of the input file
+        filename: the name of the input file, used when reporting a bad line
+
+    Returns int
+    """
+    data = data.strip()
+    if not data or not data.isascii():
+        return unscramble_simple(parse_input(data.decode("utf-8")), filename)
+
+    cells = np.frombuffer(data, dtype=np.uint8)
+    line_starts = np.concatenate(([0], np.flatnonzero(cells == ord("\n")) + 1))
+    # Subtracting wraps every byte below "0" around to 246 or more.
+    digit_offsets = np.flatnonzero((cells - ord("0")) < 10)
+
+    # The digits are in file order, so the first digit of each line is the
+    # first one at or after the line's start, and its last digit is the one
+    # just before the next line's first. A line whose first digit index is the
+    # same as the next line's has no digits.
+    firsts = np.searchsorted(digit_offsets, line_starts)
+    nexts = np.append(firsts[1:], len(digit_offsets))
+
+    missing = np.flatnonzero(firsts == nexts)
+    if len(missing):
+        line_index = int(missing[0])
+        line = data.split(b"\n", line_index + 1)[line_index].decode("ascii")
+        raise SyntaxError(NO_DIGITS[1],
+                          (filename, line_index + 1, 1, line, line_index + 1, len(line)))
+
+    tens = cells[digit_offsets[firsts]].astype(np.int64) - ord("0")
+    ones = cells[digit_offsets[nexts - 1]].astype(np.int64) - ord("0")
+    return int((tens * 10 + ones).sum())
+
+
+@phase("parse")
+def parse_input(text: str) -> list[str]:
+    """
+    Splits the text of a calibration document into its lines.
+
+    Input:
+        text: the contents of the input file
+    """
+    return text.strip().split("\n")
+
+
+def solve_part_1(text: str) -> int:
+    """
+    Returns the Star 1 answer for the contents of a Day 1 input file.
+    """
+    return unscramble_simple(parse_input(text))
+
+
+def solve_part_1_vectorized(text: str) -> int:
+    """
+    Returns the Star 1 answer for the contents of a Day 1 input file, using
+    NumPy to find the digits of every line at once.
+    """
+    return unscramble_vectorized(text.encode("utf-8"))
+
+
+def solve_part_2(text: str) -> int:
+    """
+    Returns the Star 2 answer for the contents of a Day 1 input file.
+    """
+    return unscramble_complex(parse_input(text))
+
+
+def solve_part_2_automaton(text: str) -> int:
+    """
+    Returns the Star 2 answer for the contents of a Day 1 input file, using the
+    digit automaton.
+    """
+    return unscramble_automaton(parse_input(text))
+
+
+def split_byte_ranges(filename: str,
+                      chunk_bytes: int = STREAM_CHUNK_BYTES) -> list[tuple[int, int]]:
+    """
+    Splits a file into (start, end) byte ranges of about chunk_bytes each,
+    moving every boundary forward to the start of a line so that no line is
+    split between two ranges.
+    """
+    size = os.path.getsize(filename)
+    boundaries = [0]
+    with open(filename, "rb") as f:
+        for target in range(chunk_bytes, size, chunk_bytes):
+            if target <= boundaries[-1]:
+                continue
+            # Reading from the byte before the target finishes the line it is
+            # in, leaving the file at the first line start at or after it.
+            f.seek(target - 1)
+            f.readline()
+            boundaries.append(f.tell())
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def sum_byte_range(filename: str, start: int, end: int,
+                   part: int) -> tuple[int, int, tuple[int, str] | None]:
+    """
+    Sums the calibration values of the lines starting in a byte range of a
+    calibration document, reading one line at a time. Blank lines have no
+    calibration value, as in the in-memory solvers, and only the newline ending
+    the last line of the file is not read as the start of another line.
+
+    Inputs:
+        filename: the name of the input file
+        start: the byte offset of the first line of the range
+        end: the byte offset the range ends before
+        part: the star being solved, 1 or 2
+
+    Returns:
+        int: the sum of the calibration values of the range
+        int: the number of lines in the range, up to any bad line
+        tuple(int, str) | None: the index within the range and the text of the
+            first line without a calibration value, or None if there is none
+    """
+    calibration_value = calibration_value_simple if part == 1 else calibration_value_automaton
+    answer: int = 0
+    line_index: int = 0
+    with open(filename, "rb") as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            raw_line = f.readline()
+            if not raw_line:
+                break
+            position += len(raw_line)
+            line = raw_line.decode("utf-8").rstrip("\r\n")
+            value = calibration_value(line)
+            if value is None:
+                return answer, line_index, (line_index, line)
+            answer += value
+            line_index += 1
+    return answer, line_index, None
+
+
+@phase("solve")
+def stream_calibration(filename: str, part: int, workers: int | None = None,
+                       chunk_bytes: int = STREAM_CHUNK_BYTES) -> int:
+    """
+    Solves a star for a calibration document of any size without loading it,
+    by handing newline-aligned byte ranges of the file to a pool of worker
+    processes and summing their results. Each worker holds a single line at a
+    time. A line without a calibration value raises the same SyntaxError as
+    the in-memory solvers, numbered by its line in the file.
+
+    Inputs:
+        filename: the name of the input file
+        part: the star being solved, 1 or 2
+        workers: the number of worker processes, defaulting to the CPU count
+        chunk_bytes: the approximate size of the byte range of each task
+    """
+    ranges = split_byte_ranges(filename, chunk_bytes)
+    if not ranges:
+        # An empty document is read as a single empty line, as the in-memory
+        # solvers read it.
+        raise SyntaxError(NO_DIGITS[part], (filename, 1, 1, "", 1, 0))
+
+    answer: int = 0
+    lines_before: int = 0
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Results come back in file order, so the line counts of the ranges
+        # before a bad line give its line number.
+        for range_answer, line_count, bad_line in executor.map(
+                sum_byte_range, [filename] * len(ranges), starts, ends, [part] * len(ranges)):
+            if bad_line is not None:
+                line_index, line = bad_line
+                line_number = lines_before + line_index + 1
+                raise SyntaxError(NO_DIGITS[part],
+                                  (filename, line_number, 1, line, line_number, len(line)))
+            answer += range_answer
+            lines_before += line_count
+    return answer
+
+
+def main(filename: str, stream: bool = False) -> None:
+    if stream:
+        print(f"Your Star 1 answer is {stream_calibration(filename, 1)}")
+        print(f"Your Star 2 answer is {stream_calibration(filename, 2)}")
+        return
+    with open(filename, "rb") as f:
+        data: bytes = f.read()
+    print(f"Your Star 1 answer is {unscramble_vectorized(data, filename)}")
+    lines: list[str] = parse_input(data.decode("utf-8"))
+    print(f"Your Star 2 answer is {unscramble_automaton(lines, filename)}")
 
 
 if __name__ == '__main__':
-    main(sys.argv[1])
+    # Passing --stream after the filename solves it in parallel chunks rather
+    # than loading it whole.
+    main(sys.argv[1], "--stream" in sys.argv[2:])
     sys.exit(0)
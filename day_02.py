@@ -1,14 +1,203 @@
 """
 Module to solve Day 2 of the Advent of Code 2023, which consists of the 3rd and 4th stars overall.
 """
+from bisect import bisect_left, bisect_right
+from functools import cached_property
+from itertools import chain
+from typing import Iterator
 import sys
 
+import numpy as np
+
+from instrument import phase
+from loader import as_buffer, buffer, iter_lines, map_input
+
 subset = tuple[int, str]
 pull = list[subset]
 game = list[pull]
 
+# Cube types are looked up rather than decoded, so every subset shares the
+# same three strings.
+CUBE_TYPES = {b"red": "red", b"green": "green", b"blue": "blue"}
+
+# The bag of Star 3, as (red, green, blue) cube counts.
+STAR_3_BAG = (12, 13, 14)
+
+# The largest number of cells the prefix sums of MaxTable.id_sum_index may hold
+# (128 MiB of int64). Past it, possible_id_sums answers its bags with
+# MaxTable.sweep_id_sums, whose memory grows with n log n in the games instead.
+ID_SUM_INDEX_CELLS = 2 ** 24
+
+# The first byte of each cube type, which is all that is needed to tell them
+# apart when streaming.
+RED = ord("r")
+GREEN = ord("g")
+
+
+class MaxTable:
+    """
+    The largest number of cubes of each color shown in each Snow Island game,
+    stored as three int64 columns indexed by game (the game numbered i + 1 is
+    at index i). A game could have been played with a bag exactly when none of
+    its columns is above the bag's count of that color.
+    """
+
+    red: np.ndarray
+    green: np.ndarray
+    blue: np.ndarray
+
+    def __init__(self, red: np.ndarray, green: np.ndarray, blue: np.ndarray):
+        if not len(red) == len(green) == len(blue):
+            raise ValueError("The columns of the table have different lengths.")
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+    def __repr__(self):
+        return f"MaxTable({len(self)} games)"
+
+    def __len__(self):
+        return len(self.red)
+
+    def possible_id_sum(self, red: int, green: int, blue: int) -> int:
+        """
+        Returns the sum of the numbers of the games that could have been played
+        with a bag of the given cube counts, checking every game.
+        """
+        possible = (self.red <= red) & (self.green <= green) & (self.blue <= blue)
+        return int(np.flatnonzero(possible).sum() + np.count_nonzero(possible))
+
+    @cached_property
+    def id_sum_index(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None:
+        """
+        An index answering possible_id_sums, built once per table, or None if
+        its prefix sums would hold more than ID_SUM_INDEX_CELLS cells. They
+        hold one cell per combination of distinct counts of the three colors,
+        so they grow with the cube of the number of distinct counts, which
+        stays small only while the counts do (as in the puzzle, where they
+        stay at 20 or below).
+
+        Returns:
+            np.ndarray: the sorted distinct red counts of the games
+            np.ndarray: the sorted distinct green counts of the games
+            np.ndarray: the sorted distinct blue counts of the games
+            np.ndarray: a 3D prefix sum, where [r, g, b] holds the sum of the
+                numbers of the games whose counts are within the first r
+                distinct red, g distinct green, and b distinct blue counts
+        """
+        axes = []
+        positions = []
+        for column in (self.red, self.green, self.blue):
+            values, inverse = np.unique(column, return_inverse=True)
+            axes.append(values)
+            # Position 0 of each axis is kept for bags below every game.
+            positions.append(inverse + 1)
+
+        shape = tuple(len(values) + 1 for values in axes)
+        if shape[0] * shape[1] * shape[2] > ID_SUM_INDEX_CELLS:
+            return None
+        sums = np.zeros(shape, dtype=np.int64)
+        np.add.at(sums, tuple(positions), np.arange(1, len(self) + 1))
+        for axis in range(3):
+            np.cumsum(sums, axis=axis, out=sums)
+        return axes[0], axes[1], axes[2], sums
 
-def parse_input(file: str) -> list[game]:
+    def possible_id_sums(self, bags: np.ndarray | list[tuple[int, int, int]]) -> np.ndarray:
+        """
+        Answers possible_id_sum for many bags at once. Each bag is found in the
+        prefix sums of id_sum_index by a binary search of each of its counts,
+        so a query takes time logarithmic in the number of games rather than
+        linear, once the index is built. If the index would be too large, the
+        bags are answered together by sweep_id_sums instead.
+
+        Input:
+            bags: the (red, green, blue) cube counts of each bag, as a
+                (bags, 3) array or a list of tuples
+
+        Returns np.ndarray: the possible game number sum for each bag
+        """
+        bags = np.asarray(bags, dtype=np.int64).reshape(-1, 3)
+        if self.id_sum_index is None:
+            return self.sweep_id_sums(bags)
+        *axes, sums = self.id_sum_index
+        positions = tuple(np.searchsorted(values, bags[:, color], side="right")
+                          for color, values in enumerate(axes))
+        return sums[positions]
+
+    def sweep_id_sums(self, bags: np.ndarray) -> np.ndarray:
+        """
+        Answers possible_id_sum for many bags at once without a dense index, in
+        O((games + bags) log^2 games) time and O(games log games) memory.
+
+        The bags are taken in order of their red count, and the games with no
+        more red cubes than each bag are added before it is answered to a
+        Fenwick tree over the rank of their green count. Each node of the tree
+        holds the sorted blue counts of the games it covers, with a Fenwick
+        tree of its own over them, so that the games within a bag's green and
+        blue counts are summed by two nested binary searches.
+
+        Input:
+            bags: the (red, green, blue) cube counts of each bag, as a
+                (bags, 3) array
+
+        Returns np.ndarray: the possible game number sum for each bag
+        """
+        red, green, blue = self.red.tolist(), self.green.tolist(), self.blue.tolist()
+        greens = sorted(set(green))
+        size = len(greens)
+        green_ranks = [bisect_left(greens, count) + 1 for count in green]
+
+        # Node i of the outer tree covers the green ranks after i - (i & -i)
+        # up to i, and holds the blue counts of the games with those ranks.
+        node_blues: list[list[int]] = [[] for _ in range(size + 1)]
+        for rank, count in zip(green_ranks, blue):
+            while rank <= size:
+                node_blues[rank].append(count)
+                rank += rank & -rank
+        for blues in node_blues:
+            blues.sort()
+        node_sums = [[0] * (len(blues) + 1) for blues in node_blues]
+
+        games = sorted(range(len(self)), key=red.__getitem__)
+        answers = np.zeros(len(bags), dtype=np.int64)
+        added = 0
+        for bag in np.argsort(bags[:, 0], kind="stable").tolist():
+            bag_red, bag_green, bag_blue = bags[bag].tolist()
+            while added < len(games) and red[games[added]] <= bag_red:
+                game = games[added]
+                added += 1
+                rank = green_ranks[game]
+                while rank <= size:
+                    sums = node_sums[rank]
+                    position = bisect_left(node_blues[rank], blue[game]) + 1
+                    while position < len(sums):
+                        sums[position] += game + 1
+                        position += position & -position
+                    rank += rank & -rank
+
+            total = 0
+            rank = bisect_right(greens, bag_green)
+            while rank > 0:
+                sums = node_sums[rank]
+                position = bisect_right(node_blues[rank], bag_blue)
+                while position > 0:
+                    total += sums[position]
+                    position -= position & -position
+                rank -= rank & -rank
+            answers[bag] = total
+
+        return answers
+
+    def power_sum(self) -> int:
+        """
+        Returns the sum of the powers of the smallest bag each game could have
+        been played with, which holds exactly the game's largest counts.
+        """
+        return int((self.red * self.green * self.blue).sum())
+
+
+@phase("parse")
+def parse_input(text: str | buffer) -> list[game]:
     """
     Takes in an input text for Day 2 of the Advent of Code 2023 and returns it
     as a list of Snow Island "game"s. Each "game" is themselves a list of
@@ -17,22 +206,19 @@ def parse_input(file: str) -> list[game]:
     complexity is unavoidable.
 
     Input:
-        file: the filename or path to the input file
+        text: the contents of the input file, as text or a buffer from
+            map_input
     """
-    # Process input file into usable list for algorithm
-    with open(file, encoding="utf-8") as f:
-        raw_games: list[str] = f.read().strip().split("\n")
-
     games: list[game] = []
-    for raw_game in raw_games:
-        draft_game = raw_game.split(":")[1].split(";")
+    for raw_game in iter_lines(as_buffer(text)):
+        draft_game = raw_game[raw_game.index(b":") + 1:].split(b";")
         new_game: game = []
         for raw_pull in draft_game:
-            draft_pull = raw_pull.split(",")
             new_pull: pull = []
-            for raw_subset in draft_pull:
-                draft_subset = raw_subset.strip().split()
-                new_subset: subset = (int(draft_subset[0]), draft_subset[1])
+            for raw_subset in raw_pull.split(b","):
+                quantity, cube_type = raw_subset.split()
+                new_subset: subset = (int(quantity),
+                                      CUBE_TYPES.get(cube_type) or cube_type.decode())
                 new_pull.append(new_subset)
             new_game.append(new_pull)
         games.append(new_game)
@@ -40,6 +226,81 @@ def parse_input(file: str) -> list[game]:
     return games
 
 
+def iter_game_maxima(text: str | buffer) -> Iterator[tuple[int, int, int]]:
+    """
+    Yields the largest number of red, green, and blue cubes shown in each game
+    of an input text for Day 2 of the Advent of Code 2023, in a single pass
+    over each line. Only the line being read is held, so streaming a
+    memory-mapped file takes the same memory however many games it has.
+
+    Each line is split into words once. After the "Game N:" words they
+    alternate between a quantity and a cube type (with any trailing comma or
+    semicolon), which is told apart by its first byte alone, so no pull or
+    subset is ever built.
+
+    Input:
+        text: the contents of the input file, as text or a buffer from
+            map_input
+    """
+    for raw_game in iter_lines(as_buffer(text)):
+        words = iter(raw_game.split())
+        next(words)
+        next(words)
+        red = green = blue = 0
+        for raw_quantity, cube_type in zip(words, words):
+            quantity = int(raw_quantity)
+            if cube_type[0] == RED:
+                if quantity > red:
+                    red = quantity
+            elif cube_type[0] == GREEN:
+                if quantity > green:
+                    green = quantity
+            elif quantity > blue:
+                blue = quantity
+        yield red, green, blue
+
+
+@phase("parse")
+def parse_max_table(text: str | buffer) -> MaxTable:
+    """
+    Takes in an input text for Day 2 of the Advent of Code 2023 and returns the
+    largest number of cubes of each color shown in each game, without building
+    the pulls of each game.
+
+    Input:
+        text: the contents of the input file, as text or a buffer from
+            map_input
+    """
+    maxima = np.fromiter(chain.from_iterable(iter_game_maxima(text)), dtype=np.int64)
+    return MaxTable(*np.ascontiguousarray(maxima.reshape(-1, 3).T))
+
+
+@phase("solve")
+def fold_games(text: str | buffer) -> tuple[int, int]:
+    """
+    Returns both answers for an input text for Day 2 of the Advent of Code
+    2023, folding each game into them as it is streamed by iter_game_maxima, so
+    that no per-game state is kept at all.
+
+    Input:
+        text: the contents of the input file, as text or a buffer from
+            map_input
+
+    Returns:
+        int: the Star 3 answer
+        int: the Star 4 answer
+    """
+    max_red, max_green, max_blue = STAR_3_BAG
+    id_sum = 0
+    power_sum = 0
+    for game_id, (red, green, blue) in enumerate(iter_game_maxima(text), 1):
+        if red <= max_red and green <= max_green and blue <= max_blue:
+            id_sum += game_id
+        power_sum += red * green * blue
+    return id_sum, power_sum
+
+
+@phase("solve")
 def find_impossible_games(games: list[game]) -> int:
     """
     Takes in a list of Snow Island games (see Day 2 of Advent of Code 2023), and
@@ -74,6 +335,7 @@ def find_impossible_games(games: list[game]) -> int:
     return good_count
 
 
+@phase("solve")
 def count_power_games(games: list[game]) -> int:
     """
     Takes in a list of Snow Island games (see Day 2 of Advent of Code 2023),
@@ -101,10 +363,41 @@ def count_power_games(games: list[game]) -> int:
     return powers
 
 
+def solve_part_1(text: str) -> int:
+    """
+    Returns the Star 3 answer for the contents of a Day 2 input file.
+    """
+    return find_impossible_games(parse_input(text))
+
+
+def solve_part_2(text: str) -> int:
+    """
+    Returns the Star 4 answer for the contents of a Day 2 input file.
+    """
+    return count_power_games(parse_input(text))
+
+
+def solve_part_1_table(text: str) -> int:
+    """
+    Returns the Star 3 answer for the contents of a Day 2 input file, using the
+    columnar max table.
+    """
+    return parse_max_table(text).possible_id_sum(*STAR_3_BAG)
+
+
+def solve_part_2_table(text: str) -> int:
+    """
+    Returns the Star 4 answer for the contents of a Day 2 input file, using the
+    columnar max table.
+    """
+    return parse_max_table(text).power_sum()
+
+
 def main(file: str) -> None:
-    parsed_games = parse_input(file)
-    print(f"Your Star 3 answer is {find_impossible_games(parsed_games)}")
-    print(f"Your Star 4 answer is {count_power_games(parsed_games)}")
+    with map_input(file) as data:
+        id_sum, power_sum = fold_games(data)
+    print(f"Your Star 3 answer is {id_sum}")
+    print(f"Your Star 4 answer is {power_sum}")
 
 
 if __name__ == '__main__':
@@ -1,8 +1,17 @@
 """
 Module to solve Day 3 of the Advent of Code 2023,  which consists of the 5th and 6th stars overall.
 """
+from bisect import bisect_left
+from operator import mul
+from typing import Iterable, Iterator
+import re
 import sys
 
+import numpy as np
+
+from grid import Grid
+from instrument import phase
+
 SYMBOLS = ["@", "#", "$", "%", "&", "*", "-", "+", "=", "/"]
 
 # number_texts are stored as tuple with the following elements:
@@ -13,60 +22,62 @@ number_text = tuple[int, int, int, int]
 # (row_index, column_index, type)
 symbol = tuple[int, int, str]
 
+# symbol_indexes map a row index to the sorted column indexes of the symbols in
+# that row, leaving out rows without symbols.
+symbol_index = dict[int, list[int]]
 
-def find_number(col: int, line: str) -> tuple[int, int]:
-    """
-    Takes in a number's starting column in a line and returns the column it
-    ends and the value of the number.
+# scanned_rows are stored as a tuple with the following elements:
+# (numbers, symbol_columns, asterisk_columns), where numbers holds the
+# (start_column_index, end_column_index, value) of each number in the row.
+scanned_row = tuple[list[tuple[int, int, int]], list[int], list[int]]
 
-    Inputs:
-        col: the column coordinate of the start of a number
-        line: the line of the text that the number was found in
+# labelled_schematics are stored as a tuple with the following elements:
+# (cells, width, labels, values), where cells is the flat uint8 array of the
+# schematic with a border of "." around it, width is the padded row width,
+# labels holds the index of the number each cell is a digit of (or -1), and
+# values holds the value of each number, as int64 unless a number has more
+# than MAX_INT64_DIGITS digits, in which case they are all Python ints.
+labelled_schematic = tuple[np.ndarray, int, np.ndarray, np.ndarray]
 
-    """
-    line_len = len(line)
+# The most digits of a number whose value always fits in an int64.
+MAX_INT64_DIGITS = 18
 
-    value = 0
-    while col < line_len:
-        cha = line[col]
-        if cha.isdigit():
-            value = value * 10 + int(cha)
-            col += 1
-        else:
-            break
-
-    return col, value
+NUMBER_PATTERN = re.compile(r"[0-9]+")
+SYMBOL_PATTERN = re.compile(r"[^0-9.]")
 
 
-def parse_input(file: str) -> tuple[list[number_text], list[symbol]]:
+@phase("parse")
+def parse_input(text: str) -> tuple[list[number_text], list[symbol]]:
     """
     Takes in an engine schematic (see Day 3 of Advent of Code 2023), and returns
     the coordinates of all the numbers and symbols.
 
     Input:
-        file: the name/path of the input text file
+        text: the contents of the input text file
     """
+    schematic = Grid.from_text(text)
+    rows = schematic.rows
+    is_digit = (rows >= ord("0")) & (rows <= ord("9"))
 
-    with open(file, "r", encoding="utf-8") as f:
-        matrix = f.read().strip().split("\n")
-
-    numbers: list[number_text] = []
-    symbols: list[symbol] = []
-    for row, line in enumerate(matrix):
-        end_col = -1
-        for col, dot in enumerate(line):
-            if col < end_col or dot == ".":
-                continue
-            if dot.isdigit():
-                start_col = col
-                end_col, number = find_number(start_col, line)
-                numbers.append((row, start_col, end_col, number))
-            else:
-                symbols.append((row, col, dot))
+    # A number starts where a row steps from a non-digit to a digit and ends
+    # where it steps back, so padding each row with a non-digit on both sides
+    # pairs up every start with its end in row-major order.
+    padded = np.pad(is_digit, ((0, 0), (1, 1))).astype(np.int8)
+    steps = np.diff(padded, axis=1)
+    starts = np.argwhere(steps == 1).tolist()
+    ends = np.argwhere(steps == -1)[:, 1].tolist()
+
+    numbers: list[number_text] = [
+        (row, start_col, end_col, int(rows[row, start_col:end_col].tobytes()))
+        for (row, start_col), end_col in zip(starts, ends)]
+    symbols: list[symbol] = [
+        (row, col, chr(rows[row, col]))
+        for row, col in np.argwhere(~is_digit & (rows != ord("."))).tolist()]
 
     return numbers, symbols
 
 
+@phase("solve")
 def find_part_numbers(numbers: list[number_text], symbols: list[symbol]) -> int:
     """
     Takes in the coordinates of all the numbers and the symbols of a schematic
@@ -87,6 +98,7 @@ def find_part_numbers(numbers: list[number_text], symbols: list[symbol]) -> int:
     return answer
 
 
+@phase("solve")
 def find_gear_ratios(numbers: list[number_text], symbols: list[symbol]) -> int:
     """
     Takes in the coordinates of all the numbers and the symbols of a schematic,
@@ -118,12 +130,407 @@ def find_gear_ratios(numbers: list[number_text], symbols: list[symbol]) -> int:
     return answer
 
 
-def main(file: str) -> None:
-    parsed_numbers, parsed_symbols = parse_input(file)
-    print(f"Your Star 3 answer is {find_part_numbers(parsed_numbers, parsed_symbols)}")
-    print(f"Your Star 4 answer is {find_gear_ratios(parsed_numbers, parsed_symbols)}")
+@phase("build")
+def index_symbols(symbols: list[symbol], symbol_type: str | None = None) -> symbol_index:
+    """
+    Buckets the symbols of a schematic by row, so that the symbols around a
+    number can be found by a binary search of at most three rows.
+
+    Inputs:
+        symbols: the coordinates of all the symbols, in row-major order
+        symbol_type: if given, only symbols of this type are indexed
+    """
+    index: symbol_index = {}
+    for row, col, value in symbols:
+        if symbol_type is None or value == symbol_type:
+            index.setdefault(row, []).append(col)
+    return index
+
+
+def first_adjacent(index: symbol_index, row: int, start_col: int,
+                   end_col: int) -> tuple[int, int] | None:
+    """
+    Returns the coordinates of the first indexed symbol in row-major order that
+    is adjacent to a number, or None if there is none.
+
+    Inputs:
+        index: the symbols by row, from index_symbols
+        row, start_col, end_col: the coordinates of the number, as in
+            number_text
+    """
+    for i in (row - 1, row, row + 1):
+        cols = index.get(i)
+        if cols is None:
+            continue
+        k = bisect_left(cols, start_col - 1)
+        if k < len(cols) and cols[k] <= end_col:
+            return i, cols[k]
+    return None
+
+
+@phase("solve")
+def find_part_numbers_indexed(numbers: list[number_text], symbols: list[symbol]) -> int:
+    """
+    Sums the part numbers of a schematic like find_part_numbers, but looks up
+    each number's neighbouring symbols in a row index rather than comparing it
+    with every symbol, which takes the time from O(numbers * symbols) down to
+    O(numbers * log(width)).
+
+    Inputs:
+        numbers: the coordinates of all the numbers
+        symbols: the coordinates of all the symbols
+    """
+    index = index_symbols(symbols)
+    answer = 0
+    for row, start_col, end_col, value in numbers:
+        if first_adjacent(index, row, start_col, end_col) is not None:
+            answer += value
+
+    return answer
+
+
+@phase("solve")
+def find_gear_ratios_indexed(numbers: list[number_text], symbols: list[symbol]) -> int:
+    """
+    Sums the gear ratios of a schematic like find_gear_ratios, but looks up
+    each number's neighbouring asterisks in a row index. As there, a number
+    next to several asterisks only counts towards the first of them in
+    row-major order.
+
+    Inputs:
+        numbers: the coordinates of all the numbers
+        symbols: the coordinates of all the symbols
+    """
+    index = index_symbols(symbols, "*")
+    asterisks: dict[tuple[int, int], list[int]] = {}
+    for row, start_col, end_col, value in numbers:
+        asterisk = first_adjacent(index, row, start_col, end_col)
+        if asterisk is not None:
+            asterisks.setdefault(asterisk, []).append(value)
+
+    answer = 0
+    for adj_nums in asterisks.values():
+        if len(adj_nums) == 2:
+            answer += adj_nums[0] * adj_nums[1]
+
+    return answer
+
+
+def scan_row(line: str) -> scanned_row:
+    """
+    Finds the numbers, symbols, and asterisks of a single row of a schematic,
+    where every character that is neither a digit nor "." is a symbol.
+    """
+    numbers = [(match.start(), match.end(), int(match.group()))
+               for match in NUMBER_PATTERN.finditer(line)]
+    symbols: list[int] = []
+    asterisks: list[int] = []
+    for match in SYMBOL_PATTERN.finditer(line):
+        symbols.append(match.start())
+        if match.group() == "*":
+            asterisks.append(match.start())
+    return numbers, symbols, asterisks
+
+
+def gear_ratio_sum(asterisks: dict[int, list[int]]) -> int:
+    """
+    Returns the sum of the gear ratios of a row's asterisks, given the numbers
+    next to each of them.
+    """
+    return sum(adj_nums[0] * adj_nums[1] for adj_nums in asterisks.values()
+               if len(adj_nums) == 2)
+
+
+def stream_schematic(lines: Iterable[str]) -> Iterator[tuple[int, int, int]]:
+    """
+    Reads a schematic one row at a time, keeping only a window of three rows,
+    and yields the part number sum and gear ratio sum of each row as soon as
+    no later row can change them. Memory is O(width) however tall the
+    schematic is, so it can be read from a pipe. Blank lines are skipped.
+
+    The numbers of a row are checked once the row below it has been read. A
+    gear is complete once the numbers of the row below it have been checked,
+    so each row is yielded one row after its numbers are checked. As in
+    find_gear_ratios, a number next to several asterisks only counts towards
+    the first of them in row-major order.
+
+    Input:
+        lines: the lines of the schematic, with or without their newlines
+
+    Yields:
+        int: the index of the row
+        int: the sum of the part numbers in the row
+        int: the sum of the ratios of the gears in the row
+    """
+    empty: scanned_row = ([], [], [])
+    window: list[scanned_row] = [empty, empty]
+    row = -1
+    part_sums: dict[int, int] = {}
+    # The numbers next to each asterisk, by row and then column, for the rows
+    # whose gears may still gain numbers.
+    gears: dict[int, dict[int, list[int]]] = {}
+
+    def check_row() -> Iterator[tuple[int, int, int]]:
+        # Checks the numbers of the middle row of the window, then yields the
+        # row above it, whose gears have now seen every number they can.
+        above, middle, below = window
+        symbols = {row - 1: above[1], row: middle[1], row + 1: below[1]}
+        asterisks = {row - 1: above[2], row: middle[2], row + 1: below[2]}
+        part_sum = 0
+        for start_col, end_col, value in middle[0]:
+            if first_adjacent(symbols, row, start_col, end_col) is not None:
+                part_sum += value
+            asterisk = first_adjacent(asterisks, row, start_col, end_col)
+            if asterisk is not None:
+                gears.setdefault(asterisk[0], {}).setdefault(asterisk[1], []).append(value)
+        part_sums[row] = part_sum
+
+        if row >= 1:
+            gear_sum = gear_ratio_sum(gears.pop(row - 1, {}))
+            yield row - 1, part_sums.pop(row - 1), gear_sum
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            continue
+        window.append(scan_row(line))
+        if row >= 0:
+            yield from check_row()
+        window.pop(0)
+        row += 1
+
+    if row >= 0:
+        window.append(empty)
+        yield from check_row()
+        gear_sum = gear_ratio_sum(gears.pop(row, {}))
+        yield row, part_sums.pop(row), gear_sum
+
+
+@phase("solve")
+def sum_schematic_stream(lines: Iterable[str]) -> tuple[int, int]:
+    """
+    Returns both answers for the lines of a schematic, read one row at a time
+    by stream_schematic.
+
+    Returns:
+        int: the Star 5 answer
+        int: the Star 6 answer
+    """
+    part_total = 0
+    gear_total = 0
+    for _, part_sum, gear_sum in stream_schematic(lines):
+        part_total += part_sum
+        gear_total += gear_sum
+    return part_total, gear_total
+
+
+@phase("parse")
+def label_schematic(text: str) -> labelled_schematic:
+    """
+    Loads an engine schematic into a flat array and labels every digit cell
+    with the number it belongs to, by run-length encoding the digits of each
+    row, without a Python loop over the numbers.
+
+    The schematic is padded with a border of ".", so that the eight neighbours
+    of every cell inside it are in the array and no run crosses a row.
+
+    Input:
+        text: the contents of the input text file
+    """
+    rows = Grid.from_text(text).rows
+    padded = np.pad(rows, 1, constant_values=ord("."))
+    width = padded.shape[1]
+    cells = padded.ravel()
+
+    is_digit = (cells - ord("0")) < 10
+    digit_cells = np.flatnonzero(is_digit)
+    # A digit starts a run unless the cell before it is a digit too.
+    is_start = np.ones(len(digit_cells), dtype=bool)
+    is_start[1:] = np.diff(digit_cells) > 1
+    run_starts = np.flatnonzero(is_start)
+    digit_labels = np.cumsum(is_start, dtype=np.int32) - 1
+    labels = np.full(len(cells), -1, dtype=np.int32)
+    labels[digit_cells] = digit_labels
+    if len(digit_cells) == 0:
+        return cells, width, labels, np.zeros(0, dtype=np.int64)
+
+    run_ends = np.append(run_starts[1:], len(digit_cells)) - 1
+    if (run_ends - run_starts).max() + 1 > MAX_INT64_DIGITS:
+        # Numbers too long for an int64 are read as Python ints, one at a time.
+        values = np.array([int(cells[start:end + 1].tobytes())
+                           for start, end in zip(digit_cells[run_starts].tolist(),
+                                                 digit_cells[run_ends].tolist())],
+                          dtype=object)
+        return cells, width, labels, values
+
+    # Each digit is worth its value times ten to the power of the number of
+    # digits after it in its run, and the runs are summed into their values.
+    places = digit_cells[run_ends][digit_labels] - digit_cells
+    worth = (cells[digit_cells].astype(np.int64) - ord("0")) * 10 ** places
+    values = np.add.reduceat(worth, run_starts)
+
+    return cells, width, labels, values
+
+
+def neighbourhood(width: int) -> list[int]:
+    """
+    Returns the flat offsets of a cell and its eight neighbours in an array of
+    rows of the given width.
+    """
+    return [row * width + col for row in (-1, 0, 1) for col in (-1, 0, 1)]
+
+
+@phase("solve")
+def find_part_numbers_vectorized(cells: np.ndarray, width: int, labels: np.ndarray,
+                                 values: np.ndarray) -> int:
+    """
+    Sums the part numbers of a schematic like find_part_numbers, by dilating
+    the mask of the symbols by one cell in every direction and summing the
+    numbers with a digit under the dilated mask.
+
+    Inputs:
+        cells, width, labels, values: the labelled schematic, as returned by
+            label_schematic
+    """
+    is_symbol = ((cells - ord("0")) >= 10) & (cells != ord("."))
+    # The border holds no symbols and no digits, so only the cells inside it
+    # need to be dilated into.
+    inside = slice(width + 1, len(cells) - width - 1)
+    near_symbol = np.zeros_like(is_symbol)
+    for offset in neighbourhood(width):
+        near_symbol[inside] |= is_symbol[width + 1 + offset:len(cells) - width - 1 + offset]
+
+    is_part = np.zeros(len(values) + 1, dtype=bool)
+    # Cells outside every number have label -1, which marks the spare last
+    # entry rather than a number.
+    is_part[labels[near_symbol]] = True
+    # The sum is taken over Python ints, as it can overflow an int64.
+    return sum(values[is_part[:-1]].tolist())
+
+
+@phase("solve")
+def find_gear_ratios_vectorized(cells: np.ndarray, width: int, labels: np.ndarray,
+                                values: np.ndarray) -> int:
+    """
+    Sums the gear ratios of a schematic like find_gear_ratios, by collecting
+    every (number, asterisk) pair of neighbours from the cells around each
+    asterisk and grouping the numbers by asterisk.
+
+    As there, a number next to several asterisks only counts towards the first
+    in row-major order, which is the one with the lowest flat index.
+
+    Inputs:
+        cells, width, labels, values: the labelled schematic, as returned by
+            label_schematic
+    """
+    asterisks = np.flatnonzero(cells == ord("*"))
+    pair_labels = []
+    pair_asterisks = []
+    for offset in neighbourhood(width):
+        neighbour_labels = labels[asterisks + offset]
+        adjacent = neighbour_labels >= 0
+        pair_labels.append(neighbour_labels[adjacent])
+        pair_asterisks.append(asterisks[adjacent])
+    pair_labels = np.concatenate(pair_labels)
+    pair_asterisks = np.concatenate(pair_asterisks)
+    if len(pair_labels) == 0:
+        return 0
+
+    # Sorting the pairs by number and then asterisk puts the first asterisk
+    # next to each number at the start of its group.
+    order = np.lexsort((pair_asterisks, pair_labels))
+    numbers, firsts = np.unique(pair_labels[order], return_index=True)
+    gears = pair_asterisks[order][firsts]
+
+    order = np.argsort(gears, kind="stable")
+    gear_values = values[numbers][order]
+    _, starts, counts = np.unique(gears[order], return_index=True, return_counts=True)
+    pairs = starts[counts == 2]
+    # The ratios are taken over Python ints, as they can overflow an int64.
+    return sum(map(mul, gear_values[pairs].tolist(), gear_values[pairs + 1].tolist()))
+
+
+def solve_part_1(text: str) -> int:
+    """
+    Returns the Star 5 answer for the contents of a Day 3 input file.
+    """
+    return find_part_numbers(*parse_input(text))
+
+
+def solve_part_2(text: str) -> int:
+    """
+    Returns the Star 6 answer for the contents of a Day 3 input file.
+    """
+    return find_gear_ratios(*parse_input(text))
+
+
+def solve_part_1_indexed(text: str) -> int:
+    """
+    Returns the Star 5 answer for the contents of a Day 3 input file, using the
+    row index of the symbols.
+    """
+    return find_part_numbers_indexed(*parse_input(text))
+
+
+def solve_part_2_indexed(text: str) -> int:
+    """
+    Returns the Star 6 answer for the contents of a Day 3 input file, using the
+    row index of the symbols.
+    """
+    return find_gear_ratios_indexed(*parse_input(text))
+
+
+def solve_part_1_stream(text: str) -> int:
+    """
+    Returns the Star 5 answer for the contents of a Day 3 input file, reading
+    it one row at a time.
+    """
+    return sum_schematic_stream(text.split("\n"))[0]
+
+
+def solve_part_2_stream(text: str) -> int:
+    """
+    Returns the Star 6 answer for the contents of a Day 3 input file, reading
+    it one row at a time.
+    """
+    return sum_schematic_stream(text.split("\n"))[1]
+
+
+def solve_part_1_vectorized(text: str) -> int:
+    """
+    Returns the Star 5 answer for the contents of a Day 3 input file, using
+    NumPy masks over the whole schematic.
+    """
+    return find_part_numbers_vectorized(*label_schematic(text))
+
+
+def solve_part_2_vectorized(text: str) -> int:
+    """
+    Returns the Star 6 answer for the contents of a Day 3 input file, using
+    NumPy masks over the whole schematic.
+    """
+    return find_gear_ratios_vectorized(*label_schematic(text))
+
+
+def main(file: str, stream: bool = False) -> None:
+    if stream:
+        # A file of "-" streams the schematic from standard input.
+        if file == "-":
+            part_total, gear_total = sum_schematic_stream(sys.stdin)
+        else:
+            with open(file, "r", encoding="utf-8") as f:
+                part_total, gear_total = sum_schematic_stream(f)
+        print(f"Your Star 3 answer is {part_total}")
+        print(f"Your Star 4 answer is {gear_total}")
+        return
+    with open(file, "r", encoding="utf-8") as f:
+        parsed_numbers, parsed_symbols = parse_input(f.read())
+    print(f"Your Star 3 answer is {find_part_numbers_indexed(parsed_numbers, parsed_symbols)}")
+    print(f"Your Star 4 answer is {find_gear_ratios_indexed(parsed_numbers, parsed_symbols)}")
 
 
 if __name__ == "__main__":
-    main(sys.argv[1])
+    # Passing --stream after the filename reads the schematic one row at a time
+    # rather than loading it whole.
+    main(sys.argv[1], "--stream" in sys.argv[2:])
     sys.exit(0)
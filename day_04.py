@@ -2,24 +2,37 @@
 Module to solve the first star of Day 4 of the Advent of Code 2023, which is the
 7th star overall.
 """
+from collections import Counter
+from itertools import tee
+from typing import Iterable, Iterator
 import sys
 
+import numpy as np
+
+from instrument import phase
+from loader import as_buffer, buffer, iter_lines, map_input
+
 s_cards = list[tuple[list[int], list[int]]]
 
-def parse_input(file: str) -> s_cards:
+# Each number of a card takes a field of a space and two columns, so numbers
+# below 100 line up in the same columns on every card.
+FIELD_WIDTH = 3
+
+# The number of cards matched at once in NumPy, which bounds the size of the
+# arrays made along the way.
+CARD_BLOCK = 1 << 16
+
+@phase("parse")
+def parse_input(text: str | buffer) -> s_cards:
     """
     Takes in an input text of scratch cards and their numbers (see Day 4 of
     Advent of Code 2023), and returns an s_card formated list for easy access
-    of each card and their winning and scratched off numbers.
+    of each card and their winning and scratched off numbers. The text may also
+    be a buffer from map_input.
     """
-
-    with open(file, 'r', encoding="utf-8") as f:
-        raw_cards: list[str] = f.read().strip().split("\n")
-        raw_cards: list[str] = [line.split(":")[1] for line in raw_cards]
-
     scratch_cards: s_cards = []
-    for card in raw_cards:
-        raw_winning, raw_scratch = card.split("|")
+    for card in iter_lines(as_buffer(text)):
+        raw_winning, raw_scratch = card[card.index(b":") + 1:].split(b"|")
 
         winning_numbers = [int(num) for num in raw_winning.split()]
         scratched_numbers = [int(num) for num in raw_scratch.split()]
@@ -29,6 +42,126 @@ def parse_input(file: str) -> s_cards:
     return scratch_cards
 
 
+def card_bitmask(raw_numbers: bytes) -> int:
+    """
+    Returns the numbers in a space-separated list as a bitmask, where bit n is
+    set if n is in the list.
+    """
+    mask = 0
+    for num in raw_numbers.split():
+        mask |= 1 << int(num)
+    return mask
+
+
+def read_fields(rows: np.ndarray) -> np.ndarray | None:
+    """
+    Reads the numbers in a block of fixed-width fields of every card, given as
+    a (cards, fields * FIELD_WIDTH) uint8 array, or returns None if any field
+    is not a space followed by a right-aligned number below 100.
+    """
+    if rows.shape[1] % FIELD_WIDTH:
+        return None
+    fields = rows.reshape(len(rows), -1, FIELD_WIDTH)
+    spaces, tens, ones = fields[:, :, 0], fields[:, :, 1], fields[:, :, 2]
+    tens_digits = tens - ord("0")
+    ones_digits = ones - ord("0")
+    if not ((spaces == ord(" ")).all() and (ones_digits < 10).all()
+            and ((tens_digits < 10) | (tens == ord(" "))).all()):
+        return None
+    return np.where(tens == ord(" "), 0, tens_digits) * 10 + ones_digits
+
+
+def pack_bits(numbers: np.ndarray) -> np.ndarray:
+    """
+    Packs the numbers below 128 of each card, given as a (cards, fields) array,
+    into a (cards, 2) uint64 bit matrix, where bit n of a card is set if n is
+    one of its numbers.
+    """
+    numbers = numbers.astype(np.uint64)
+    bits = np.uint64(1) << (numbers & np.uint64(63))
+    is_low = numbers < 64
+    return np.stack((np.bitwise_or.reduce(np.where(is_low, bits, 0), axis=1),
+                     np.bitwise_or.reduce(np.where(is_low, 0, bits), axis=1)), axis=1)
+
+
+def match_counts_fixed_width(data: buffer) -> np.ndarray | None:
+    """
+    Counts the matches of every card at once when the numbers of the cards are
+    laid out in fixed-width columns, as puzzle inputs are, by gathering the
+    numbers into a (cards, width) array and packing each side of every card
+    into a bit matrix. The card labels before the colons may differ in width.
+    Returns None for any other layout.
+    """
+    if not data:
+        return None
+    cells = np.frombuffer(data, dtype=np.uint8)
+    line_ends = np.flatnonzero(cells == ord("\n"))
+    if cells[-1] != ord("\n"):
+        line_ends = np.append(line_ends, len(cells))
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    colons = np.flatnonzero(cells == ord(":"))
+    if len(colons) != len(line_ends) or not (
+            (colons >= line_starts).all() and (colons < line_ends).all()):
+        return None
+
+    # Each row runs from a colon to the end of its line.
+    widths = line_ends - colons
+    if not (widths == widths[0]).all():
+        return None
+    columns = np.arange(widths[0])
+    bar = data[colons[0]:line_ends[0]].find(b"|")
+    if bar < 2:
+        return None
+
+    matches = np.zeros(len(colons), dtype=np.int64)
+    for start in range(0, len(colons), CARD_BLOCK):
+        rows = cells[colons[start:start + CARD_BLOCK, np.newaxis] + columns]
+        if not ((rows[:, bar - 1] == ord(" ")).all() and (rows[:, bar] == ord("|")).all()):
+            return None
+        winning_numbers = read_fields(rows[:, 1:bar - 1])
+        scratched_numbers = read_fields(rows[:, bar + 1:])
+        if winning_numbers is None or scratched_numbers is None:
+            return None
+        common = pack_bits(winning_numbers) & pack_bits(scratched_numbers)
+        matches[start:start + CARD_BLOCK] = np.bitwise_count(common).sum(axis=1)
+    return matches
+
+
+@phase("parse")
+def parse_match_counts(text: str | buffer) -> np.ndarray:
+    """
+    Takes in an input text of scratch cards and returns the number of matching
+    numbers on each card, as an int64 array shared by both stars. The numbers
+    of each side of a card are encoded as a bitmask, so that a card's matches
+    are the popcount of the AND of its two masks. The text may also be a
+    buffer from map_input.
+
+    Cards in fixed-width columns are all matched at once in NumPy, and any
+    other layout is matched a card at a time with Python int bitmasks. The
+    numbers on each side of a card are taken to be distinct, as they are in
+    the puzzle.
+    """
+    data = as_buffer(text)
+    matches = match_counts_fixed_width(data)
+    if matches is not None:
+        return matches
+
+    return np.fromiter(iter_match_counts(data), dtype=np.int64)
+
+
+def iter_match_counts(text: str | buffer) -> Iterator[int]:
+    """
+    Yields the number of matching numbers on each card of an input text of
+    scratch cards, one card at a time, using Python int bitmasks. Only the
+    card being read is held, so a memory-mapped file of any size can be
+    streamed.
+    """
+    for card in iter_lines(as_buffer(text)):
+        raw_winning, raw_scratch = card[card.index(b":") + 1:].split(b"|")
+        yield (card_bitmask(raw_winning) & card_bitmask(raw_scratch)).bit_count()
+
+
+@phase("solve")
 def count_card_points(scratch_cards: s_cards) -> int:
     """
     Takes in list of scratch cards and counts the points each card won by
@@ -59,6 +192,7 @@ def count_card_points(scratch_cards: s_cards) -> int:
     return points
 
 
+@phase("solve")
 def count_scratch_cards(scratch_cards: s_cards) -> int:
     """
     Takes in list of scratch cards and counts the extra cards won by comparing
@@ -91,12 +225,125 @@ def count_scratch_cards(scratch_cards: s_cards) -> int:
     return total_cards
 
 
-def main(file: str) -> None:
-    cards: s_cards = parse_input(file)
-    print(f"Your Star 3 answer is {count_card_points(cards)}")
-    print(f"Your Star 4 answer is {count_scratch_cards(cards)}")
+@phase("solve")
+def sum_match_points(match_counts: np.ndarray) -> int:
+    """
+    Sums the points of every card like count_card_points, from the number of
+    matches on each card. Cards are grouped by their number of matches, so
+    that the points, which can pass 64 bits, are summed as Python ints.
+    """
+    return sum(count << (matches - 1)
+               for matches, count in Counter(match_counts.tolist()).items() if matches)
+
+
+def iter_card_copies(match_counts: Iterable[int]) -> Iterator[int]:
+    """
+    Yields the number of copies held of each card, given a stream of the
+    number of matches on each card, in O(1) time per card.
+
+    Rather than adding a card's copies to each of the cards it wins one at a
+    time, as count_scratch_cards does, the copies are added to a running total
+    of pending copies when the card is scratched, and taken off it again after
+    the last card they win. The cards that still owe a removal are all the
+    memory kept, so it is bounded by the largest number of matches rather than
+    the number of cards. The copies are Python ints, since they pass 64 bits
+    long before a large input is done.
+
+    Raises IndexError, as count_scratch_cards does, if a card wins copies of
+    cards past the end of the stream.
+    """
+    pending: int = 0
+    # Maps the index of a card to the copies that stop being won at it.
+    expiring: dict[int, int] = {}
+    card_number = -1
+    for card_number, matches in enumerate(match_counts):
+        pending -= expiring.pop(card_number, 0)
+        card_copies = pending + 1
+        yield card_copies
+        if matches:
+            pending += card_copies
+            end = card_number + 1 + matches
+            expiring[end] = expiring.get(end, 0) + card_copies
+
+    if any(end > card_number + 1 for end in expiring):
+        raise IndexError("A card won copies of cards past the end of the table.")
+
+
+@phase("solve")
+def count_match_copies(match_counts: np.ndarray) -> int:
+    """
+    Counts the scratch cards won like count_scratch_cards, from the number of
+    matches on each card, propagating the copies with iter_card_copies.
+    """
+    return sum(iter_card_copies(match_counts.tolist()))
+
+
+def solve_part_1(text: str) -> int:
+    """
+    Returns the Star 7 answer for the contents of a Day 4 input file.
+    """
+    return count_card_points(parse_input(text))
+
+
+def solve_part_2(text: str) -> int:
+    """
+    Returns the Star 8 answer for the contents of a Day 4 input file.
+    """
+    return count_scratch_cards(parse_input(text))
+
+
+def solve_part_1_bitset(text: str) -> int:
+    """
+    Returns the Star 7 answer for the contents of a Day 4 input file, matching
+    the cards as bitmasks.
+    """
+    return sum_match_points(parse_match_counts(text))
+
+
+def solve_part_2_bitset(text: str) -> int:
+    """
+    Returns the Star 8 answer for the contents of a Day 4 input file, matching
+    the cards as bitmasks.
+    """
+    return count_match_copies(parse_match_counts(text))
+
+
+@phase("solve")
+def stream_cards(text: str | buffer) -> tuple[int, int]:
+    """
+    Returns both answers for an input text of scratch cards, reading it one
+    card at a time, so that memory stays constant however many cards there are.
+
+    Returns:
+        int: the Star 7 answer
+        int: the Star 8 answer
+    """
+    # The two copies of the stream are consumed in step, so tee holds at most
+    # one card between them. The copies come first, so that iter_card_copies
+    # is run to its end and checks the cards left owing copies.
+    for_copies, for_points = tee(iter_match_counts(text))
+    points = 0
+    total_cards = 0
+    for card_copies, matches in zip(iter_card_copies(for_copies), for_points):
+        if matches:
+            points += 1 << (matches - 1)
+        total_cards += card_copies
+    return points, total_cards
+
+
+def main(file: str, stream: bool = False) -> None:
+    with map_input(file) as data:
+        if stream:
+            points, total_cards = stream_cards(data)
+        else:
+            match_counts = parse_match_counts(data)
+            points, total_cards = sum_match_points(match_counts), count_match_copies(match_counts)
+    print(f"Your Star 3 answer is {points}")
+    print(f"Your Star 4 answer is {total_cards}")
 
 
 if __name__ == "__main__":
-    main(sys.argv[1])
+    # Passing --stream after the filename reads the cards one at a time rather
+    # than matching them all at once.
+    main(sys.argv[1], "--stream" in sys.argv[2:])
     sys.exit(0)
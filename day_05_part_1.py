@@ -2,8 +2,13 @@
 Module to solve the first star of Day 5 of the Advent of Code 2023, which is
 the 9th star overall.
 """
+from bisect import bisect_right
 import sys
 
+import numpy as np
+
+from instrument import phase
+
 
 def assemble_piecewise(piecewise_data):
     """
@@ -38,19 +43,18 @@ def assemble_piecewise(piecewise_data):
     return tuple(piecewise)
 
 
-def parse_data(file):
+@phase("parse")
+def parse_data(text):
     """
     This function parses the input text file into a usable outputs, consisting
     of a list of seed ranges and a list of mapped ranges.
 
     Inputs:
-        file [str]: the input file name
+        text [str]: the contents of the input file
 
     Returns lst[tuple(int, int)], lst[tuple(int, int, int)]
     """
-    f = open(file, encoding = "utf-8")
-    text = f.read()
-    text = text.split("\n\n")
+    text = text.strip().split("\n\n")
 
     seeds = text[0].split()[1:]
     seeds = [int(seed) for seed in seeds]
@@ -64,19 +68,20 @@ def parse_data(file):
     return seeds, conversion_maps
 
 
-def compute_seeds_through_map(file):
+@phase("solve")
+def compute_seeds_through_map(seeds, conversion_maps):
     """
     Takes in a series of seed values and an elf almanac (see Day 5 of Advent of
     Code 2023) and processes them to find the locations that these seeds should
     be planted in. It then outputs the minimum location value.
 
     Inputs:
-        file [str]: the input file name
+        seeds [lst[int]]: the seed values, sorted from greatest to least
+        conversion_maps [tuple(tuple(int, int, int))]: the sorted piecewise
+            functions of each map
 
     Returns int
     """
-    seeds, conversion_maps = parse_data(file)
-
     for convert_piecewise in conversion_maps:
         seed_heap = seeds[::]
         seeds = []
@@ -90,6 +95,11 @@ def compute_seeds_through_map(file):
         # than the ones before.
         while seed_heap:
             seed = seed_heap.pop()
+            if function_id == len(convert_piecewise):
+                # Seeds past the domain of every conversion function are
+                # unaffected by the map transformation.
+                seeds.append(seed)
+                continue
 
             # Unpacks a conversion function and finds the end of the range
             # of the domain of the function, along with where the current
@@ -121,4 +131,404 @@ def compute_seeds_through_map(file):
     return minimum
 
 
-print(compute_seeds_through_map(sys.argv[1]))
+def map_pieces(convert_piecewise):
+    """
+    Rewrites the sorted piecewise functions of one map as pieces covering
+    every seed value from 0 up, where each piece is the start of an interval
+    and the offset added to the seeds in it. Seeds outside every function are
+    kept as pieces with an offset of 0. Where functions overlap, the one with
+    the lower source start is used, as compute_seeds_through_map does.
+
+    Inputs:
+        convert_piecewise [tuple(tuple(int, int, int))]: the sorted piecewise
+            functions of a map
+
+    Returns lst[int], lst[int]: the start and the offset of each piece
+    """
+    starts, offsets = [0], [0]
+    covered = 0
+    for dest_start, source_start, func_range in convert_piecewise:
+        source_end = source_start + func_range
+        offset = dest_start - source_start
+        # Only the part of a function past the functions before it is used.
+        source_start = max(source_start, covered)
+        if source_start >= source_end:
+            continue
+        starts.append(source_start)
+        offsets.append(offset)
+        starts.append(source_end)
+        offsets.append(0)
+        covered = source_end
+
+    return merge_pieces(starts, offsets)
+
+
+def merge_pieces(starts, offsets):
+    """
+    Drops the pieces that are empty, or that have the same offset as the piece
+    before them, from lists of piece starts and offsets.
+
+    Returns lst[int], lst[int]
+    """
+    merged_starts, merged_offsets = [], []
+    for i, (start, offset) in enumerate(zip(starts, offsets)):
+        if i + 1 < len(starts) and starts[i + 1] == start:
+            continue
+        if merged_offsets and merged_offsets[-1] == offset:
+            continue
+        merged_starts.append(start)
+        merged_offsets.append(offset)
+
+    return merged_starts, merged_offsets
+
+
+def compose_pieces(first, second):
+    """
+    Composes two maps given as pieces, returning the pieces of the map that
+    applies the first and then the second. Each piece of the first map is cut
+    wherever its image crosses the start of a piece of the second.
+
+    Inputs:
+        first (lst[int], lst[int]): the starts and offsets of the first map
+        second (lst[int], lst[int]): the starts and offsets of the second map
+
+    Returns lst[int], lst[int]
+    """
+    first_starts, first_offsets = first
+    second_starts, second_offsets = second
+    starts, offsets = [], []
+
+    for i, (start, offset) in enumerate(zip(first_starts, first_offsets)):
+        image_start = start + offset
+        j = bisect_right(second_starts, image_start) - 1
+        starts.append(start)
+        offsets.append(offset + second_offsets[j])
+
+        # The last piece of the first map runs on forever, so its image
+        # crosses every piece of the second map after its start.
+        image_end = first_starts[i + 1] + offset if i + 1 < len(first_starts) else None
+        j += 1
+        while j < len(second_starts) and (image_end is None or second_starts[j] < image_end):
+            starts.append(second_starts[j] - offset)
+            offsets.append(offset + second_offsets[j])
+            j += 1
+
+    return merge_pieces(starts, offsets)
+
+
+def find_overlaps_and_gaps(source_starts, source_ends):
+    """
+    Checks the domains of the functions of one map, sorted by their starts,
+    for seeds covered by more than one function and for seeds between two
+    functions that are covered by neither.
+
+    Inputs:
+        source_starts [np.ndarray]: the first seed of each function's domain
+        source_ends [np.ndarray]: the seed after the last of each domain
+
+    Returns np.ndarray, np.ndarray: the (start, end) of every overlap, and of
+        every gap
+    """
+    if len(source_starts) < 2:
+        return np.empty((0, 2), dtype = np.int64), np.empty((0, 2), dtype = np.int64)
+    # The furthest any function before each one reaches.
+    reach = np.maximum.accumulate(source_ends)[:-1]
+    starts = source_starts[1:]
+    overlapping = np.flatnonzero(starts < reach)
+    overlaps = np.column_stack((starts[overlapping],
+                                np.minimum(reach, source_ends[1:])[overlapping]))
+    gapping = np.flatnonzero(starts > reach)
+    gaps = np.column_stack((reach[gapping], starts[gapping]))
+    return overlaps, gaps
+
+
+class MapIndex:
+    """
+    An index of the piecewise functions of one map, stored as three int64
+    arrays sorted by seed: where each function's domain starts and ends, and
+    the offset it adds to the seeds in it. A seed is resolved with one binary
+    search, rather than a scan up the functions.
+
+    Where functions overlap, the one with the lower source start is used, as
+    compute_seeds_through_map does, so the domains of the others are cut back
+    when the index is built and the stored domains never overlap.
+    """
+
+    def __init__(self, source_starts, source_ends, offsets):
+        self.source_starts = np.asarray(source_starts, dtype = np.int64)
+        self.source_ends = np.asarray(source_ends, dtype = np.int64)
+        self.offsets = np.asarray(offsets, dtype = np.int64)
+
+    @classmethod
+    def from_functions(cls, functions, strict = False):
+        """
+        Builds the index of a map from its functions.
+
+        Inputs:
+            functions [np.ndarray | tuple(tuple(int, int, int))]: the
+                destination start, source start, and length of each function
+                of the map, in any order
+            strict [bool]: whether to raise a ValueError if any functions
+                overlap, rather than using the one with the lower source start
+
+        Returns MapIndex
+        """
+        functions = np.asarray(functions, dtype = np.int64).reshape(-1, 3)
+        if (functions[:, 2] < 0).any():
+            raise ValueError("A function of the map has a negative length.")
+        # A stable sort keeps the first listed of two functions with the same
+        # source start first, as the sort in assemble_piecewise does.
+        functions = functions[np.argsort(functions[:, 1], kind = "stable")]
+        dest_starts, source_starts, lengths = functions.T
+        source_ends = source_starts + lengths
+
+        if strict:
+            overlaps, _ = find_overlaps_and_gaps(source_starts, source_ends)
+            if len(overlaps):
+                start, end = overlaps[0].tolist()
+                raise ValueError(f"Functions of the map overlap over seeds {start} to {end - 1}.")
+
+        # Each domain is cut back to start past every domain before it, which
+        # leaves nothing of the ones inside an earlier domain.
+        reach = np.maximum.accumulate(source_ends)
+        clipped = source_starts.copy()
+        clipped[1:] = np.maximum(source_starts[1:], reach[:-1])
+        kept = clipped < source_ends
+        return cls(clipped[kept], source_ends[kept], (dest_starts - source_starts)[kept])
+
+    @classmethod
+    def from_text(cls, piecewise_data, strict = False):
+        """
+        Builds the index of a map from its text in an input file, reading the
+        numbers straight into an array rather than into tuples.
+        """
+        # The first two words are the name of the map and "map:".
+        return cls.from_functions(np.array(piecewise_data.split()[2:], dtype = np.int64),
+                                  strict)
+
+    def __repr__(self):
+        return f"MapIndex({len(self)} functions)"
+
+    def __len__(self):
+        return len(self.source_starts)
+
+    def gaps(self):
+        """
+        Returns the (start, end) of every stretch of seeds between two functions
+        that the map leaves unchanged.
+        """
+        return find_overlaps_and_gaps(self.source_starts, self.source_ends)[1]
+
+    def convert_all(self, seeds):
+        """
+        Returns the image of each seed of an array of seeds under the map.
+        """
+        seeds = np.asarray(seeds, dtype = np.int64)
+        if len(self) == 0:
+            return seeds
+        functions = np.searchsorted(self.source_starts, seeds, side = "right") - 1
+        inside = (functions >= 0) & (seeds < self.source_ends[functions])
+        return seeds + np.where(inside, self.offsets[functions], 0)
+
+    def convert(self, seed):
+        return int(self.convert_all([seed])[0])
+
+    def split_range(self, range_start, range_length):
+        """
+        Returns the images under the map of the parts of a seed range that fall
+        in each function's domain and in each gap. The first function is found
+        by binary search, and the rest by walking up from it.
+
+        Inputs:
+            range_start [int]: the first seed of the range
+            range_length [int]: the number of seeds in the range
+
+        Returns lst[tuple(int, int)]: the start and length of each image
+        """
+        starts, ends, offsets = self.source_starts, self.source_ends, self.offsets
+        count = len(starts)
+        range_end = range_start + range_length
+        function = int(np.searchsorted(starts, range_start, side = "right")) - 1
+        images = []
+
+        while range_start < range_end:
+            while function + 1 < count and starts[function + 1] <= range_start:
+                function += 1
+            if function >= 0 and range_start < ends[function]:
+                piece_end = min(range_end, int(ends[function]))
+                offset = int(offsets[function])
+            else:
+                # Seeds between functions are unchanged.
+                piece_end = range_end if function + 1 == count else min(
+                    range_end, int(starts[function + 1]))
+                offset = 0
+            images.append((range_start + offset, piece_end - range_start))
+            range_start = piece_end
+
+        return images
+
+
+class SeedMap:
+    """
+    The seven maps of an almanac composed into a single piecewise function
+    from seed to location. The function is stored as two sorted int64 arrays:
+    the seed each piece starts at, and the offset added to the seeds in it.
+    A seed is resolved with one binary search for its piece.
+
+    The lowest location of a seed range is either its first seed or the first
+    seed of another piece it overlaps, so a sparse table of the lowest piece
+    start location over every power-of-two run of pieces is kept as well.
+    """
+
+    def __init__(self, starts, offsets):
+        self.starts = np.asarray(starts, dtype = np.int64)
+        self.offsets = np.asarray(offsets, dtype = np.int64)
+
+        # levels[k][i] is the lowest start location of pieces i to i + 2^k - 1.
+        levels = [self.starts + self.offsets]
+        while 2 ** len(levels) <= len(self.starts):
+            previous = levels[-1]
+            half = 2 ** (len(levels) - 1)
+            levels.append(np.minimum(previous[:-half], previous[half:]))
+        self.levels = levels
+
+    @classmethod
+    def from_maps(cls, conversion_maps):
+        """
+        Composes the sorted piecewise functions of every map of an almanac, as
+        returned by parse_data, into one SeedMap.
+        """
+        pieces = ([0], [0])
+        for convert_piecewise in conversion_maps:
+            pieces = compose_pieces(pieces, map_pieces(convert_piecewise))
+        return cls(*pieces)
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Loads the maps of the contents of a Day 5 input file into a SeedMap.
+        """
+        return cls.from_maps(parse_data(text)[1])
+
+    def __repr__(self):
+        return f"SeedMap({len(self)} pieces)"
+
+    def __len__(self):
+        return len(self.starts)
+
+    def pieces_of(self, seeds):
+        return np.searchsorted(self.starts, seeds, side = "right") - 1
+
+    def locations(self, seeds):
+        """
+        Returns the location of each seed of an array of non-negative seeds.
+        """
+        seeds = np.asarray(seeds, dtype = np.int64)
+        return seeds + self.offsets[self.pieces_of(seeds)]
+
+    def lowest_locations(self, range_starts, range_lengths):
+        """
+        Returns the lowest location of each seed range of a batch, given as
+        arrays of their first seeds and lengths. A range of length 0 is taken
+        to hold its first seed, as compute_ranges_through_map does.
+
+        Inputs:
+            range_starts [np.ndarray]: the first seed of each range
+            range_lengths [np.ndarray]: the number of seeds in each range
+
+        Returns np.ndarray
+        """
+        range_starts = np.asarray(range_starts, dtype = np.int64)
+        range_ends = range_starts + np.maximum(np.asarray(range_lengths, dtype = np.int64), 1)
+        first_pieces = self.pieces_of(range_starts)
+        last_pieces = self.pieces_of(range_ends - 1)
+        lowest = range_starts + self.offsets[first_pieces]
+
+        # The pieces after the first that a range overlaps start inside it, so
+        # the lowest location among their starts is looked up in the sparse
+        # table, as the minimum of two runs covering them.
+        spans = last_pieces - first_pieces
+        crossing = np.flatnonzero(spans > 0)
+        if len(crossing):
+            left = first_pieces[crossing] + 1
+            right = last_pieces[crossing]
+            level = np.log2(spans[crossing]).astype(np.int64)
+            table = self.levels
+            for k in np.unique(level).tolist():
+                at = np.flatnonzero(level == k)
+                runs = np.minimum(table[k][left[at]], table[k][right[at] - 2 ** k + 1])
+                lowest[crossing[at]] = np.minimum(lowest[crossing[at]], runs)
+
+        return lowest
+
+    def location(self, seed):
+        return int(self.locations([seed])[0])
+
+    def lowest_location(self, range_start, range_length):
+        return int(self.lowest_locations([range_start], [range_length])[0])
+
+
+@phase("build")
+def compose_almanac(conversion_maps):
+    """
+    Composes the maps of an almanac into a SeedMap ahead of any lookups.
+
+    Inputs:
+        conversion_maps [tuple(tuple(int, int, int))]: the sorted piecewise
+            functions of each map
+
+    Returns SeedMap
+    """
+    return SeedMap.from_maps(conversion_maps)
+
+
+@phase("parse")
+def parse_indexed(text):
+    """
+    Parses the input text file into an array of the seed values and the
+    MapIndex of each map, without building the piecewise tuples.
+
+    Inputs:
+        text [str]: the contents of the input file
+
+    Returns np.ndarray, tuple(MapIndex)
+    """
+    text = text.strip().split("\n\n")
+    seeds = np.array(text[0].split()[1:], dtype = np.int64)
+    return seeds, tuple(MapIndex.from_text(item) for item in text[1:])
+
+
+def solve(text):
+    """
+    Returns the Star 9 answer for the contents of a Day 5 input file.
+    """
+    return compute_seeds_through_map(*parse_data(text))
+
+
+def solve_composed(text):
+    """
+    Returns the Star 9 answer for the contents of a Day 5 input file, using the
+    composed map of the almanac.
+    """
+    seeds, conversion_maps = parse_data(text)
+    return int(compose_almanac(conversion_maps).locations(seeds).min())
+
+
+def solve_indexed(text):
+    """
+    Returns the Star 9 answer for the contents of a Day 5 input file, looking
+    each seed up in the index of every map.
+    """
+    seeds, map_indices = parse_indexed(text)
+    for map_index in map_indices:
+        seeds = map_index.convert_all(seeds)
+    return int(seeds.min())
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
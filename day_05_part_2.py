@@ -2,8 +2,14 @@
 Module to solve the second star of Day 6 of the Advent of Code 2023, which is
 the 12th star overall.
 """
+from bisect import insort
 import sys
 
+import numpy as np
+
+import day_05_part_1
+from instrument import phase
+
 def construct_seed_array(seeds):
     """
     A subfunction of the parser. This takes in the text string for the inital
@@ -61,19 +67,18 @@ def assemble_piecewise(piecewise_data):
     return tuple(piecewise)
 
 
-def parse_data(file):
+@phase("parse")
+def parse_data(text):
     """
     This function parses the input text file into a usable outputs, consisting
     of a list of seed ranges and a list of mapped ranges.
 
     Inputs:
-        file [str]: the input file name
+        text [str]: the contents of the input file
 
     Returns lst[tuple(int, int)], lst[tuple(int, int, int)]
     """
-    f = open(file, encoding = "utf-8")
-    text = f.read()
-    text = text.split("\n\n")
+    text = text.strip().split("\n\n")
 
     seed_array = construct_seed_array(text[0])
 
@@ -83,19 +88,21 @@ def parse_data(file):
     return seed_array, conversion_functions
 
 
-def compute_ranges_through_map(file):
+@phase("solve")
+def compute_ranges_through_map(seed_array, conversion_functions):
     """
     Takes in a series of seed ranges and an elf almanac (see Day 5 of Advent of
     Code 2023) and processes them to find the locations that these seeds should
     be planted in. It then outputs the minimum location value.
 
     Inputs:
-        file [str]: the input file name
+        seed_array [lst[tuple(int, int)]]: the seed ranges, sorted from greatest
+            to least starting seed
+        conversion_functions [tuple(tuple(int, int, int))]: the sorted
+            piecewise functions of each map
 
     Returns int
     """
-    seed_array, conversion_functions = parse_data(file)
-
     for convert_func in conversion_functions:
         seed_heap = seed_array[::]
         seed_array = []
@@ -109,6 +116,11 @@ def compute_ranges_through_map(file):
         # than the ones before.
         while seed_heap:
             seed, s_range = seed_heap.pop()
+            if function_index == len(convert_func):
+                # Seed ranges past the domain of every conversion function are
+                # unaffected by the map transformation.
+                seed_array.append((seed, s_range))
+                continue
 
             # Unpacks a conversion function and finds the end of the range
             # of the domain of the function, along with where the current
@@ -122,7 +134,13 @@ def compute_ranges_through_map(file):
                 function_index += 1
                 seed_heap.append((seed, s_range))
             elif seed < source_start:
-                seed_array.append((seed, s_range))
+                # The part of the range before the domain of the function is
+                # unaffected, and the rest is added back into the pile.
+                if array_end < source_start:
+                    seed_array.append((seed, s_range))
+                else:
+                    seed_array.append((seed, source_start - seed))
+                    seed_heap.append((source_start, array_end - source_start + 1))
             elif heap_start > array_end:
                 # Checks if current seed range fits in the domain of the current
                 # conversion function. If it is, the entire range is transformed.
@@ -135,7 +153,10 @@ def compute_ranges_through_map(file):
                 heap_s_range = array_end - heap_start + 1
                 array_s_range = heap_start - seed
                 seed_array.append((dest_seed, array_s_range))
-                seed_heap.append((heap_start, heap_s_range))
+                # Seed ranges may overlap, so the orphaned portion is put back
+                # in its place in the heap rather than on top of it, keeping
+                # every range still to come above the current function.
+                insort(seed_heap, (heap_start, heap_s_range), key = lambda a: -a[0])
 
         seed_array.sort(key = lambda a: a[0], reverse = True)
 
@@ -143,4 +164,198 @@ def compute_ranges_through_map(file):
 
     return minimum
 
-print(compute_ranges_through_map(sys.argv[1]))
+
+@phase("parse")
+def parse_indexed(text):
+    """
+    Parses the input text file into a list of seed ranges and the MapIndex of
+    each map (see day_05_part_1.MapIndex).
+
+    Inputs:
+        text [str]: the contents of the input file
+
+    Returns lst[tuple(int, int)], tuple(MapIndex)
+    """
+    text = text.strip().split("\n\n")
+    seed_array = construct_seed_array(text[0])
+    map_indices = tuple(day_05_part_1.MapIndex.from_text(item) for item in text[1:])
+    return seed_array, map_indices
+
+
+@phase("solve")
+def compute_ranges_indexed(seed_array, map_indices):
+    """
+    Pushes every seed range through the index of each map in turn and returns
+    the lowest location, like compute_ranges_through_map. Each range finds the
+    first function it meets with a binary search, so neither the ranges nor
+    the functions need to be walked in order.
+
+    Inputs:
+        seed_array [lst[tuple(int, int)]]: the seed ranges, in any order
+        map_indices [tuple(MapIndex)]: the index of each map
+
+    Returns int
+    """
+    # A range of length 0 is taken to hold its first seed, as
+    # compute_ranges_through_map does.
+    seed_array = [(seed, max(s_range, 1)) for seed, s_range in seed_array]
+    for map_index in map_indices:
+        seed_array = [image for seed, s_range in seed_array
+                      for image in map_index.split_range(seed, s_range)]
+
+    return min(seed for seed, _ in seed_array)
+
+
+def coalesce_ranges(starts, ends, order = None):
+    """
+    Sorts a batch of seed ranges and merges the ones that overlap or touch,
+    which keeps the batch from growing with every map it passes through.
+
+    Inputs:
+        starts [np.ndarray]: the first seed of each range
+        ends [np.ndarray]: the seed after the last of each range
+        order [np.ndarray | None]: an ordering of the ranges to try before
+            sorting them, used if it leaves the starts sorted
+
+    Returns np.ndarray, np.ndarray: the starts and ends of the merged ranges
+    """
+    if order is not None:
+        starts, ends = starts[order], ends[order]
+    if (starts[1:] < starts[:-1]).any():
+        order = np.argsort(starts, kind = "stable")
+        starts, ends = starts[order], ends[order]
+    # A range starts a new group unless it begins at or before the furthest
+    # end of the ranges before it.
+    reach = np.maximum.accumulate(ends)
+    is_head = np.concatenate(([True], starts[1:] > reach[:-1]))
+    if is_head.all():
+        return starts, ends
+    heads = np.flatnonzero(is_head)
+    return starts[heads], np.maximum.reduceat(ends, heads)
+
+
+@phase("solve")
+def propagate_ranges(range_starts, range_lengths, conversion_functions):
+    """
+    Pushes a batch of seed ranges through every map of an almanac at once and
+    returns the lowest location, like compute_ranges_through_map, but with
+    every live range held in int64 arrays rather than split one at a time.
+
+    For each map, each range is cut at the starts of the pieces of the map
+    (see day_05_part_1.map_pieces) that fall inside it, found by binary
+    search, and every cut range is shifted by its piece's offset in one step.
+    The ranges are then coalesced before the next map. A range of length 0 is
+    taken to hold its first seed, as compute_ranges_through_map does.
+
+    Inputs:
+        range_starts [np.ndarray]: the first seed of each range
+        range_lengths [np.ndarray]: the number of seeds in each range
+        conversion_functions [tuple(tuple(int, int, int))]: the sorted
+            piecewise functions of each map
+
+    Returns int
+    """
+    starts = np.asarray(range_starts, dtype = np.int64)
+    ends = starts + np.maximum(np.asarray(range_lengths, dtype = np.int64), 1)
+    starts, ends = coalesce_ranges(starts, ends)
+
+    for convert_func in conversion_functions:
+        piece_starts, piece_offsets = (np.array(values, dtype = np.int64)
+                                       for values in day_05_part_1.map_pieces(convert_func))
+        # The last piece runs on past any seed.
+        piece_ends = np.append(piece_starts[1:], np.iinfo(np.int64).max)
+        # The rank of each piece by where its image starts, in the smallest
+        # integer type that holds it, which NumPy sorts fastest.
+        rank_type = np.int16 if len(piece_starts) <= np.iinfo(np.int16).max else np.int32
+        piece_ranks = np.argsort(piece_starts + piece_offsets).argsort().astype(rank_type)
+
+        pieces = np.searchsorted(piece_starts, starts, side = "right") - 1
+        crossing = np.flatnonzero(ends > piece_ends[pieces])
+
+        if len(crossing):
+            # The ranges that run past their first piece are cut at its end,
+            # and the rest of each is split into a tail in every later piece
+            # it overlaps.
+            last_pieces = np.searchsorted(piece_starts, ends[crossing] - 1, side = "right") - 1
+            cuts = last_pieces - pieces[crossing]
+            tail_owners = np.repeat(crossing, cuts)
+            tail_pieces = pieces[tail_owners] + 1 + (np.arange(len(tail_owners))
+                                                     - np.repeat(np.cumsum(cuts) - cuts, cuts))
+            tail_starts = piece_starts[tail_pieces]
+            tail_ends = np.minimum(ends[tail_owners], piece_ends[tail_pieces])
+            ends = np.minimum(ends, piece_ends[pieces])
+
+            # Ranges do not overlap once coalesced, so a tail is the first range
+            # in its piece, and tails are put before the ranges that start in
+            # their pieces.
+            starts = np.concatenate((tail_starts, starts))
+            ends = np.concatenate((tail_ends, ends))
+            pieces = np.concatenate((tail_pieces, pieces))
+
+        offsets = piece_offsets[pieces]
+        # The ranges in each piece are still in order once shifted, so putting
+        # the pieces in the order of their images sorts every range, unless
+        # the images of two pieces overlap.
+        starts, ends = coalesce_ranges(starts + offsets, ends + offsets,
+                                       np.argsort(piece_ranks[pieces], kind = "stable"))
+
+    return int(starts[0])
+
+
+def solve(text):
+    """
+    Returns the Star 10 answer for the contents of a Day 5 input file.
+    """
+    return compute_ranges_through_map(*parse_data(text))
+
+
+def solve_composed(text):
+    """
+    Returns the Star 10 answer for the contents of a Day 5 input file, using
+    the composed map of the almanac.
+    """
+    seed_array, conversion_functions = parse_data(text)
+    seed_map = day_05_part_1.compose_almanac(conversion_functions)
+    range_starts, range_lengths = zip(*seed_array)
+    return int(seed_map.lowest_locations(range_starts, range_lengths).min())
+
+
+def solve_indexed(text):
+    """
+    Returns the Star 10 answer for the contents of a Day 5 input file, looking
+    each seed range up in the index of every map.
+    """
+    return compute_ranges_indexed(*parse_indexed(text))
+
+
+def solve_vectorized(text):
+    """
+    Returns the Star 10 answer for the contents of a Day 5 input file, pushing
+    every seed range through the maps at once with NumPy.
+    """
+    seed_array, conversion_functions = parse_data(text)
+    range_starts, range_lengths = zip(*seed_array)
+    return propagate_ranges(range_starts, range_lengths, conversion_functions)
+
+
+def solve_both(text):
+    """
+    Returns the Star 9 and Star 10 answers for the contents of a Day 5 input
+    file, parsing it only once. The seed values of Star 9 are every number of
+    the seed ranges, so they are taken back out of the parsed ranges.
+    """
+    seed_array, conversion_functions = parse_data(text)
+    seeds = [number for seed_range in seed_array for number in seed_range]
+    seeds.sort(reverse = True)
+
+    return (day_05_part_1.compute_seeds_through_map(seeds, conversion_functions),
+            compute_ranges_through_map(seed_array, conversion_functions))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
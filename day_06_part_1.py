@@ -5,19 +5,30 @@ Module to solve the first star of Day 6 of the Advent of Code 2023, which is the
 import math
 import sys
 
-def parse_file(file):
+import numpy as np
+
+from instrument import phase
+
+# Races shorter than this, with a record below the other limit (which is past
+# any record such a race can beat), have a discriminant that fits in an int64
+# and whose square root float64 gets to within one, so count_ways_batch can
+# take them.
+BATCH_TIME_LIMIT = 2 ** 31
+BATCH_RECORD_LIMIT = 2 ** 60
+
+@phase("parse")
+def parse_file(text):
     """
     This function parses the input text file into a usable output, consisting
     a list of tuples, the tuples consisting of the time length of a race and
     the record distance of the same race.
 
     Inputs:
-        file [str]: the input file name
+        text [str]: the contents of the input file
 
     Returns int, int
     """
-    f = open(file, encoding = "utf-8")
-    text = f.read()
+    text = text.strip()
     times, records = text.split("\n")
     times = [int(time) for time in times.split()[1:]]
     records = [int(record) for record in records.split()[1:]]
@@ -26,44 +37,123 @@ def parse_file(file):
     return races
 
 
-def find_int_roots(c, b, a = 1):
+def count_ways(time, record):
     """
-    A function for the quadratic formula, but finds exclusive integer upper and
-    lower bounds, for use in solving a quadratic inequality.
+    Returns the number of whole times the button of a race can be held for to
+    beat its record, or 0 if the record cannot be beaten.
+
+    Holding for h beats the record when h * (time - h) > record, which is when
+    (2h - time)^2 < time^2 - 4 * record, so the answer is the number of
+    integers k = 2h - time of the same parity as time that are below the
+    square root of the discriminant in size.
 
     Inputs:
-        c [int]: the coefficient of the degree 0 term
-        b [int]: the coefficient of the degree 1 term
-        a [int] = 1: the coefficient of the degree 2 term, default value is 1
+        time [int]: the time length of the race
+        record [int]: the record distance of the race
 
-    Returns int, int
+    Returns int
     """
-    root_1 = math.floor((-b - math.sqrt(b ** 2 - 4 * c)) / (2 * a))
-    root_2 = math.ceil((-b + math.sqrt(b ** 2 - 4 * c)) / (2 * a))
+    discriminant = time * time - 4 * record
+    if discriminant <= 0:
+        return 0
+    # The largest integer strictly below the square root of the discriminant.
+    root = math.isqrt(discriminant - 1)
+    return root + 1 - (root + time) % 2
 
-    return root_1, root_2
 
+def count_ways_batch(times, records):
+    """
+    Counts the ways to beat the record of every race of a batch at once, as
+    count_ways does for one. Races too large for int64 arithmetic are counted
+    one at a time with count_ways.
 
-def find_ways_to_win(file):
+    Inputs:
+        times [lst[int] | np.ndarray]: the time length of each race
+        records [lst[int] | np.ndarray]: the record distance of each race
+
+    Returns np.ndarray: the number of ways to win each race, as objects if
+        any of them is too large for an int64
+    """
+    try:
+        times = np.asarray(times, dtype = np.int64)
+        records = np.asarray(records, dtype = np.int64)
+    except OverflowError:
+        return np.array([count_ways(int(time), int(record))
+                         for time, record in zip(times, records)], dtype = object)
+
+    fits = ((times >= 0) & (times < BATCH_TIME_LIMIT)
+            & (records >= 0) & (records < BATCH_RECORD_LIMIT))
+    if not fits.all():
+        return np.array([count_ways(time, record)
+                         for time, record in zip(times.tolist(), records.tolist())])
+
+    discriminants = times * times - 4 * records
+    roots = np.sqrt(np.maximum(discriminants, 0).astype(np.float64)).astype(np.int64)
+    # The float root can be one off either way, and is then moved down to the
+    # largest integer strictly below the square root.
+    roots += (roots + 1) * (roots + 1) <= discriminants
+    roots -= roots * roots >= discriminants
+    ways = roots + 1 - (roots + times) % 2
+    return np.where(discriminants > 0, ways, 0)
+
+
+@phase("solve")
+def find_ways_to_win(races):
     """
     Takes in a series of race times and race records (see Day 6 of Advent of
     Code 2023) and processes them to find the number of combination of ways
     these races could be won. It does this by solving a quadratic inequality.
 
     Inputs:
-        file [str]: the input file name
+        races [lst[tuple(int, int)]]: the time and record distance of each race
 
     Returns int
     """
-    races = parse_file(file)
-
     win_combinations = 1
     for time, record in races:
-        lower_bound, upper_bound = find_int_roots(record, -time)
-        valid_times = upper_bound - lower_bound - 1
-        win_combinations = win_combinations * valid_times
+        win_combinations = win_combinations * count_ways(time, record)
 
     return win_combinations
 
 
-print(find_ways_to_win(sys.argv[1]))
+@phase("solve")
+def find_ways_to_win_batch(races):
+    """
+    Finds the product of the number of ways to win each race, like
+    find_ways_to_win, but counting the ways for every race at once.
+
+    Inputs:
+        races [lst[tuple(int, int)]]: the time and record distance of each race
+
+    Returns int
+    """
+    # Like find_ways_to_win, no races at all give the empty product.
+    if not races:
+        return 1
+    times, records = zip(*races)
+    # The product is taken over Python ints, as it can overflow an int64.
+    return math.prod(count_ways_batch(times, records).tolist())
+
+
+def solve(text):
+    """
+    Returns the Star 11 answer for the contents of a Day 6 input file.
+    """
+    return find_ways_to_win(parse_file(text))
+
+
+def solve_batch(text):
+    """
+    Returns the Star 11 answer for the contents of a Day 6 input file, counting
+    the ways to win every race at once.
+    """
+    return find_ways_to_win_batch(parse_file(text))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -2,21 +2,23 @@
 Module to solve the second star of Day 6 of the Advent of Code 2023, which is
 the 12th star overall.
 """
-import math
 import sys
 
-def parse_file(file):
+import day_06_part_1
+from instrument import phase
+
+@phase("parse")
+def parse_file(text):
     """
     This function parses the input text file into a usable output, consisting
     of the total time length of the race and the record distance.
 
     Inputs:
-        file [str]: the input file name
+        text [str]: the contents of the input file
 
     Returns int, int
     """
-    f = open(file, encoding = "utf-8")
-    text = f.read()
+    text = text.strip()
     time, record = text.split("\n")
     time = int("".join(time.split()[1:]))
     record = int("".join(record.split()[1:]))
@@ -24,41 +26,48 @@ def parse_file(file):
     return time, record
 
 
-def find_int_roots(c, b, a = 1):
+@phase("solve")
+def find_ways_to_win(time, record):
     """
-    A function for the quadratic formula, but finds exclusive integer upper and
-    lower bounds, for use in solving a quadratic inequality.
+    Takes in a large race time and race record (see Day 6 of Advent of
+    Code 2023) and processes it to find the number of ways this race could be
+    won. It does this by solving a quadratic inequality.
 
     Inputs:
-        c [int]: the coefficient of the degree 0 term
-        b [int]: the coefficient of the degree 1 term
-        a [int] = 1: the coefficient of the degree 2 term, default value is 1
+        time [int]: the time length of the race
+        record [int]: the record distance of the race
 
-    Returns int, int
+    Returns int
     """
-    root_1 = math.floor((-b - math.sqrt(b ** 2 - 4 * c)) / (2 * a))
-    root_2 = math.ceil((-b + math.sqrt(b ** 2 - 4 * c)) / (2 * a))
+    # The joined race is far past the precision of floats, so the exact count
+    # of day_06_part_1 is used.
+    return day_06_part_1.count_ways(time, record)
 
-    return root_1, root_2
 
-
-def find_ways_to_win(file):
+def solve(text):
     """
-    Takes in a large race time and race record (see Day 6 of Advent of
-    Code 2023) and processes it to find the number of ways this race could be
-    won. It does this by solving a quadratic inequality.
+    Returns the Star 12 answer for the contents of a Day 6 input file.
+    """
+    return find_ways_to_win(*parse_file(text))
 
-    Inputs:
-        file [str]: the input file name
 
-    Returns int
+def solve_both(text):
+    """
+    Returns the Star 11 and Star 12 answers for the contents of a Day 6 input
+    file, parsing it only once. The single race of Star 12 is read from the
+    races of Star 11 by joining their digits back together.
     """
-    time, record = parse_file(file)
+    races = day_06_part_1.parse_file(text)
+    time = int("".join(str(race_time) for race_time, _ in races))
+    record = int("".join(str(race_record) for _, race_record in races))
+
+    return day_06_part_1.find_ways_to_win(races), find_ways_to_win(time, record)
 
-    lower_bound, upper_bound = find_int_roots(record, -time)
-    valid_times = upper_bound - lower_bound - 1
 
-    return valid_times
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
 
 
-print(find_ways_to_win(sys.argv[1]))
+if __name__ == "__main__":
+    main(sys.argv[1])
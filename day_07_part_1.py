@@ -4,24 +4,132 @@ Module to solve the first star of Day 7 of the Advent of Code 2023, which is the
 """
 import sys
 
+import numpy as np
+
+from instrument import phase
+from loader import as_buffer, iter_lines, map_input
+
 CARDS = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
-def parse_input(file):
+
+# Hand keys hold the category of a hand above the ranks of its five cards, four
+# bits each, so that sorting the keys sorts the hands.
+RANK_BITS = 4
+CATEGORY_SHIFT = 5 * RANK_BITS
+
+# The category of a hand (0 for high card up to 6 for five of a kind) indexed
+# by the sum of the squares of how many of each card it holds, which is
+# different for every category.
+CATEGORY_OF_SQUARES = np.full(26, -1, dtype = np.int64)
+CATEGORY_OF_SQUARES[[5, 7, 9, 11, 13, 17, 25]] = np.arange(7)
+
+
+@phase("parse")
+def parse_input(text):
     """
     Parses the input file into a list of hands with their corrosponding bids.
 
     Input:
-        file[str]: the file name of the input
+        text[str]: the contents of the input file, or a buffer from map_input
 
     Returns lst[tuple(str, int)]
     """
-    f = open(file, encoding = "utf-8")
-    text = f.read()
-    hands = [tuple(line.split()) for line in text.split("\n")]
-    hands = [(hand, int(bid)) for hand, bid in hands]
+    hands = [tuple(line.split()) for line in iter_lines(as_buffer(text))]
+    hands = [(hand.decode("ascii"), int(bid)) for hand, bid in hands]
 
     return hands
 
 
+@phase("parse")
+def parse_hand_array(text):
+    """
+    Parses the input file into an array of the bytes of every hand and an
+    array of their bids.
+
+    Input:
+        text[str]: the contents of the input file, or a buffer from map_input
+
+    Returns np.ndarray, np.ndarray: the (n, 5) uint8 cards and the n bids
+    """
+    words = as_buffer(text).split()
+    hands = np.frombuffer(b"".join(words[0::2]), dtype = np.uint8).reshape(-1, 5)
+    bids = np.array(words[1::2], dtype = np.int64)
+
+    return hands, bids
+
+
+def hand_keys(hands, cards = CARDS, joker = None):
+    """
+    Encodes every hand as one integer key, which is its category followed by
+    the rank of each of its cards in order, so that the hands can be ranked
+    with a single sort. This takes the place of both categorize_hands and
+    sort_hands.
+
+    The category comes from the sum of the squares of the number of copies of
+    each card, which is 5 plus twice the number of pairs of positions holding
+    the same card. Jokers are added to the most numerous other card.
+
+    Input:
+        hands[np.ndarray]: the (n, 5) uint8 bytes of every hand
+        cards[lst[str]]: the cards from lowest to highest rank
+        joker[str | None]: the wild card, if there is one
+
+    Returns np.ndarray
+    """
+    rank_of_byte = np.full(256, len(cards), dtype = np.uint8)
+    rank_of_byte[[ord(card) for card in cards]] = np.arange(len(cards))
+    ranks = rank_of_byte[hands]
+    if (ranks == len(cards)).any():
+        raise ValueError("A hand holds a card that is not a Camel Card.")
+
+    # The number of copies in the hand of the card at each position, kept in
+    # uint8 columns as the arrays are as long as the input.
+    columns = [hands[:, i] for i in range(5)]
+    copies = [np.ones(len(hands), dtype = np.uint8) for _ in range(5)]
+    for i in range(5):
+        for j in range(i + 1, 5):
+            same = columns[i] == columns[j]
+            copies[i] += same
+            copies[j] += same
+
+    if joker is None:
+        squares = sum(copies)
+    else:
+        jokers = np.zeros(len(hands), dtype = np.uint8)
+        for column, count in zip(columns, copies):
+            is_joker = column == ord(joker)
+            jokers += is_joker
+            count[is_joker] = 0
+        most = np.maximum.reduce(copies)
+        squares = sum(copies) + 2 * most * jokers + jokers * jokers
+
+    # Keys take 23 bits, so they fit in an int32, which sorts faster.
+    keys = CATEGORY_OF_SQUARES[squares].astype(np.int32) << CATEGORY_SHIFT
+    for i in range(5):
+        keys |= ranks[:, i].astype(np.int32) << (4 - i) * RANK_BITS
+    return keys
+
+
+@phase("solve")
+def rank_hand_keys(keys, bids):
+    """
+    Sorts the keys of every hand and sums the product of the rank of each hand
+    with its bid, as calculate_won_bids does.
+
+    Inputs:
+        keys [np.ndarray]: the key of each hand from hand_keys
+        bids [np.ndarray]: the bid of each hand
+
+    Returns int
+    """
+    order = np.argsort(keys, kind = "stable")
+    ranks = np.arange(1, len(keys) + 1, dtype = np.int64)
+    # The total is summed in an int64 unless it could overflow one.
+    if len(bids) and int(np.abs(bids).max()) * len(keys) ** 2 >= 2 ** 63:
+        return sum((bids[order] * ranks).tolist())
+    return int(np.dot(bids[order], ranks))
+
+
+@phase("build")
 def categorize_hands(hands):
     """
     Takes in the input of hands and bids and sorts them by type. These types
@@ -75,42 +183,23 @@ def categorize_hands(hands):
 
 def sort_hands(hands):
     """
-    A quick sort variant to sort hands according to their place in the index
-    CARDS. This is done not by highest value card to least valued card (as it
-    should be), but instead an unorthodox method of comparing the first cards,
-    then the second cards, and so on.
+    Sorts hands according to their place in the index CARDS. This is done not
+    by highest value card to least valued card (as it should be), but instead
+    an unorthodox method of comparing the first cards, then the second cards,
+    and so on, which is the order of the lists of their card indices. The
+    sort is not recursive, so a long run of ascending hands cannot exhaust
+    the call stack.
 
     Input:
         hands[lst[tuple(str, int)]]
 
     Returns lst[tuple(str, int)]
     """
-    if not hands:
-        return []
-
-    pivot_w_bid, *rest = hands
-    lower_stack = []
-    upper_stack = []
-
-    pivot, _ = pivot_w_bid
-    pivot_val = [CARDS.index(card) for card in pivot]
-
-    for hand, bid in rest:
-        hand_val = [CARDS.index(card) for card in hand]
-        for index, val in enumerate(hand_val):
-            if pivot_val[index] > val:
-                lower_stack.append((hand, bid))
-                break
-            elif pivot_val[index] < val:
-                upper_stack.append((hand, bid))
-                break
-
-    lower_stack = sort_hands(lower_stack)
-    upper_stack = sort_hands(upper_stack)
-
-    return lower_stack + [pivot_w_bid] + upper_stack
+    return sorted(hands, key = lambda hand_w_bid: [CARDS.index(card)
+                                                   for card in hand_w_bid[0]])
 
-def calculate_won_bids(file):
+@phase("solve")
+def calculate_won_bids(hands):
     """
     Takes in a series of Camel Card hands and bets (see Day 7 of Advent of
     Code 2023) and processes it to rank them by their value. It then sums the
@@ -118,11 +207,11 @@ def calculate_won_bids(file):
     bid.
 
     Inputs:
-        file [str]: the input file name
+        hands [lst[tuple(str, int)]]: a list of hands with their bids
 
     Returns int
     """
-    hand_groups = categorize_hands(parse_input(file))
+    hand_groups = categorize_hands(hands)
 
     for index, hand_type in enumerate(hand_groups):
         hand_groups[index] = sort_hands(hand_type)
@@ -138,4 +227,27 @@ def calculate_won_bids(file):
 
     return answer
 
-print(calculate_won_bids(sys.argv[1]))
+
+def solve(text):
+    """
+    Returns the Star 13 answer for the contents of a Day 7 input file.
+    """
+    return calculate_won_bids(parse_input(text))
+
+
+def solve_keyed(text):
+    """
+    Returns the Star 13 answer for the contents of a Day 7 input file, sorting
+    the hands by their integer keys.
+    """
+    hands, bids = parse_hand_array(text)
+    return rank_hand_keys(hand_keys(hands), bids)
+
+
+def main(filename):
+    with map_input(filename) as data:
+        print(calculate_won_bids(parse_input(data)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -4,24 +4,28 @@ the 14th star overall.
 """
 import sys
 
+import day_07_part_1
+from instrument import phase
+from loader import as_buffer, iter_lines, map_input
 
-def parse_input(file):
+
+@phase("parse")
+def parse_input(text):
     """
     Parses the input file into a list of hands with their corrosponding bids.
 
     Input:
-        file[str]: the file name of the input
+        text[str]: the contents of the input file, or a buffer from map_input
 
     Returns lst[tuple(str, int)]
     """
-    f = open(file, encoding = "utf-8")
-    text = f.read()
-    hands = [tuple(line.split()) for line in text.split("\n")]
-    hands = [(hand, int(bid)) for hand, bid in hands]
+    hands = [tuple(line.split()) for line in iter_lines(as_buffer(text))]
+    hands = [(hand.decode("ascii"), int(bid)) for hand, bid in hands]
 
     return hands
 
 
+@phase("build")
 def categorize_hands(hands):
     """
     Takes in the input of hands and bids and sorts them by type. These types
@@ -89,42 +93,23 @@ def categorize_hands(hands):
 CARDS = ["J", "2", "3", "4", "5", "6", "7", "8", "9", "T", "Q", "K", "A"]
 def sort_hands(hands):
     """
-    A quick sort variant to sort hands according to their place in the index
-    CARDS. This is done not by highest value card to least valued card (as it
-    should be), but instead an unorthodox method of comparing the first cards,
-    then the second cards, and so on.
+    Sorts hands according to their place in the index CARDS. This is done not
+    by highest value card to least valued card (as it should be), but instead
+    an unorthodox method of comparing the first cards, then the second cards,
+    and so on, which is the order of the lists of their card indices. The
+    sort is not recursive, so a long run of ascending hands cannot exhaust
+    the call stack.
 
     Input:
         hands[lst[tuple(str, int)]]
 
     Returns lst[tuple(str, int)]
     """
-    if not hands:
-        return []
-
-    pivot_w_bid, *rest = hands
-    lower_stack = []
-    upper_stack = []
-
-    pivot, _ = pivot_w_bid
-    pivot_val = [CARDS.index(card) for card in pivot]
-
-    for hand, bid in rest:
-        hand_val = [CARDS.index(card) for card in hand]
-        for index, val in enumerate(hand_val):
-            if pivot_val[index] > val:
-                lower_stack.append((hand, bid))
-                break
-            elif pivot_val[index] < val:
-                upper_stack.append((hand, bid))
-                break
-
-    lower_stack = sort_hands(lower_stack)
-    upper_stack = sort_hands(upper_stack)
-
-    return lower_stack + [pivot_w_bid] + upper_stack
+    return sorted(hands, key = lambda hand_w_bid: [CARDS.index(card)
+                                                   for card in hand_w_bid[0]])
 
-def calculate_won_bids(file):
+@phase("solve")
+def calculate_won_bids(hands):
     """
     Takes in a series of Camel Card hands and bets (see Day 7 of Advent of
     Code 2023) and processes it to rank them by their value. It then sums the
@@ -132,11 +117,11 @@ def calculate_won_bids(file):
     bid.
 
     Inputs:
-        file [str]: the input file name
+        hands [lst[tuple(str, int)]]: a list of hands with their bids
 
     Returns int
     """
-    hand_groups = categorize_hands(parse_input(file))
+    hand_groups = categorize_hands(hands)
 
     for index, hand_type in enumerate(hand_groups):
         hand_groups[index] = sort_hands(hand_type)
@@ -152,4 +137,36 @@ def calculate_won_bids(file):
 
     return answer
 
-print(calculate_won_bids(sys.argv[1]))
+
+def solve(text):
+    """
+    Returns the Star 14 answer for the contents of a Day 7 input file.
+    """
+    return calculate_won_bids(parse_input(text))
+
+
+def solve_keyed(text):
+    """
+    Returns the Star 14 answer for the contents of a Day 7 input file, sorting
+    the hands by their integer keys.
+    """
+    hands, bids = day_07_part_1.parse_hand_array(text)
+    return day_07_part_1.rank_hand_keys(day_07_part_1.hand_keys(hands, CARDS, "J"), bids)
+
+
+def solve_both(text):
+    """
+    Returns the Star 13 and Star 14 answers for the contents of a Day 7 input
+    file, parsing it only once.
+    """
+    hands = parse_input(text)
+    return day_07_part_1.calculate_won_bids(hands), calculate_won_bids(hands)
+
+
+def main(filename):
+    with map_input(filename) as data:
+        print(calculate_won_bids(parse_input(data)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -4,20 +4,22 @@ Module to solve the first star of Day 8 of the Advent of Code 2023, which is the
 """
 import sys
 
-def load_graph(filename):
+from instrument import phase
+
+@phase("parse")
+def load_graph(text):
     """
     Creates graph as an adjacency dictionary from file, while also exporting the
     direction list.
 
     Inputs:
-      filename [str]: The name of the file to load the graph from.
+      text [str]: The contents of the file to load the graph from.
 
     Returns:
         str
         dict[str: lst[str]]
     """
-    with open(filename, encoding = "utf-8") as file:
-        input_lines = file.read().split('\n')
+    input_lines = text.strip().split('\n')
 
     # Build graph
     nodes = {}
@@ -28,19 +30,19 @@ def load_graph(filename):
     return input_lines[0], nodes
 
 
-def follow_directions(file):
+@phase("solve")
+def follow_directions(instructions, graph):
     """
     Takes in a list of left and right commands and a graph adjacency list
     (see Day 8 of Advent of Code 2023) and processes it to find how many turns
     it takes to go from node AAA to node ZZZ.
 
     Inputs:
-        file [str]: the input file name
+        instructions [str]: the list of left and right commands
+        graph [dict[str: lst[str]]]: the graph adjacency list
 
     Returns int
     """
-    instructions, graph = load_graph(file)
-
     node = "AAA"
     break_flag = True
     path_steps = 0
@@ -58,4 +60,17 @@ def follow_directions(file):
     return path_steps
 
 
-print(follow_directions(sys.argv[1]))
+def solve(text):
+    """
+    Returns the Star 15 answer for the contents of a Day 8 input file.
+    """
+    return follow_directions(*load_graph(text))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -5,21 +5,24 @@ the 16th star overall.
 import sys
 import math
 
-def load_graph(filename):
+import day_08_part_1
+from instrument import phase
+
+@phase("parse")
+def load_graph(text):
     """
     Creates graph as an adjacency dictionary from file, while also exporting the
     direction list and the list of nodes ending in A.
 
     Inputs:
-      filename [str]: The name of the file to load the graph from.
+      text [str]: The contents of the file to load the graph from.
 
     Returns:
         str
         dict{str: lst[str]}
         lst[str]
     """
-    with open(filename, encoding = "utf-8") as file:
-        input_lines = file.read().split('\n')
+    input_lines = text.strip().split('\n')
 
     # Build graph
     graph = {}
@@ -33,7 +36,8 @@ def load_graph(filename):
     return input_lines[0], graph, a_nodes
 
 
-def follow_directions_simultaneously(file):
+@phase("solve")
+def follow_directions_simultaneously(instructions, graph, nodes):
     """
     Takes in a list of left and right commands and a graph adjacency list
     (see Day 8 of Advent of Code 2023) and processes it to find how many turns
@@ -43,12 +47,12 @@ def follow_directions_simultaneously(file):
     cycles lengths.
 
     Inputs:
-        file [str]: the input file name
+        instructions [str]: the list of left and right commands
+        graph [dict{str: lst[str]}]: the graph adjacency list
+        nodes [lst[str]]: the nodes ending in A
 
     Returns int
     """
-    instructions, graph, nodes = load_graph(file)
-
     path_steps = 0
     loop_number = [None for _ in range(len(nodes))]
 
@@ -75,4 +79,27 @@ def follow_directions_simultaneously(file):
     return answer
 
 
-print(follow_directions_simultaneously(sys.argv[1]))
+def solve(text):
+    """
+    Returns the Star 16 answer for the contents of a Day 8 input file.
+    """
+    return follow_directions_simultaneously(*load_graph(text))
+
+
+def solve_both(text):
+    """
+    Returns the Star 15 and Star 16 answers for the contents of a Day 8 input
+    file, loading the graph only once.
+    """
+    instructions, graph, a_nodes = load_graph(text)
+    return (day_08_part_1.follow_directions(instructions, graph),
+            follow_directions_simultaneously(instructions, graph, a_nodes))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
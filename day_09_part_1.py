@@ -4,6 +4,8 @@ Module to solve the first star of Day 9 of the Advent of Code 2023, which is the
 """
 import sys
 
+from instrument import phase
+
 def next_in_polynomial_discrete_sequence(sequence):
     """
     Takes in a sequence of integers following a polynomial curve and
@@ -30,24 +32,49 @@ def next_in_polynomial_discrete_sequence(sequence):
     return last_val + next_diff
 
 
-def extrapolate_oasis_list(file):
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a list of sequences of OASIS values.
+
+    Input:
+        text [str]: the contents of the input file
+
+    Returns lst[lst[int]]
+    """
+    return [[int(num) for num in line.split()] for line in text.strip().split("\n")]
+
+
+@phase("solve")
+def extrapolate_oasis_list(lst_of_seq):
     """
     Takes in a list of OASIS values over a consistent time frame (see Day 9 of
     the Advent of Code 2023) and predicts the next value of the sequence. It
     then sums these predictions
 
     Input:
-        file [str]: the filename of the input
+        lst_of_seq [lst[lst[int]]]: the sequences of OASIS values
 
     Returns int
     """
-    with open(file, encoding = "utf-8") as f:
-        lst_of_seq = [[int(num) for num in line] for line in f.read().split("\n")]
-
     answer = 0
     for seq in lst_of_seq:
         answer += next_in_polynomial_discrete_sequence(seq)
 
     return answer
 
-print(extrapolate_oasis_list(sys.argv[1]))
+
+def solve(text):
+    """
+    Returns the Star 17 answer for the contents of a Day 9 input file.
+    """
+    return extrapolate_oasis_list(parse_input(text))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -4,6 +4,8 @@ the 18th star overall.
 """
 import sys
 
+from instrument import phase
+
 def next_in_polynomial_discrete_sequence(sequence):
     """
     Takes in a sequence of integers following a polynomial curve and
@@ -30,24 +32,105 @@ def next_in_polynomial_discrete_sequence(sequence):
     return last_val + next_diff
 
 
-def extrapolate_oasis_list(file):
+def extrapolate_both_ends(sequence):
+    """
+    Takes in a sequence of integers following a polynomial curve and finds both
+    the next value and the 0th value of the sequence from a single pass down
+    its derivatives. The next value is the sum of the last value of every
+    derivative, while the 0th value is the alternating sum of their first
+    values.
+
+    Inputs:
+        sequence [list[int]]: a list of integers assumed to be evenly spaced and
+            following some polynomial function.
+
+    Returns int, int
+    """
+    next_val = 0
+    zeroth_val = 0
+    sign = 1
+    while any(sequence):
+        next_val += sequence[-1]
+        zeroth_val += sign * sequence[0]
+        sign = -sign
+        sequence = [val - last_val for last_val, val in zip(sequence, sequence[1:])]
+
+    return next_val, zeroth_val
+
+
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a list of sequences of OASIS values.
+
+    Input:
+        text [str]: the contents of the input file
+
+    Returns lst[lst[int]]
+    """
+    return [[int(num) for num in line.split()] for line in text.strip().split("\n")]
+
+
+@phase("solve")
+def extrapolate_oasis_list(lst_of_seq):
     """
     Takes in a list of OASIS values over a consistent time frame (see Day 9 of
     the Advent of Code 2023) and predicts the 0th value of the sequence. It
     then sums these predictions.
 
     Input:
-        file [str]: the filename of the input
+        lst_of_seq [lst[lst[int]]]: the sequences of OASIS values
 
     Returns int
     """
-    with open(file, encoding = "utf-8") as f:
-        lst_of_seq = [[int(num) for num in line] for line in f.read().split("\n")]
-
     answer = 0
     for seq in lst_of_seq:
         answer += next_in_polynomial_discrete_sequence(seq[::-1])
 
     return answer
 
-print(extrapolate_oasis_list(sys.argv[1]))
+
+def solve(text):
+    """
+    Returns the Star 18 answer for the contents of a Day 9 input file.
+    """
+    return extrapolate_oasis_list(parse_input(text))
+
+
+@phase("solve")
+def extrapolate_oasis_both_ways(lst_of_seq):
+    """
+    Takes in a list of OASIS values over a consistent time frame (see Day 9 of
+    the Advent of Code 2023) and predicts both the next and the 0th value of
+    each sequence, summing each kind of prediction.
+
+    Input:
+        lst_of_seq [lst[lst[int]]]: the sequences of OASIS values
+
+    Returns int, int
+    """
+    next_answer = 0
+    zeroth_answer = 0
+    for seq in lst_of_seq:
+        next_val, zeroth_val = extrapolate_both_ends(seq)
+        next_answer += next_val
+        zeroth_answer += zeroth_val
+
+    return next_answer, zeroth_answer
+
+
+def solve_both(text):
+    """
+    Returns the Star 17 and Star 18 answers for the contents of a Day 9 input
+    file, parsing it and building each difference table only once.
+    """
+    return extrapolate_oasis_both_ways(parse_input(text))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -4,154 +4,118 @@ the 19th star overall.
 """
 import sys
 
-DIRECTIONS = [("N", 1, 0), ("E", 0, -1), ("S", 1, 0), ("W", 0, 1)]
+from grid import DIRECTIONS, EAST, NORTH, OUTSIDE, SOUTH, WEST, Grid, opposite
+from instrument import phase
 
-def find_loop_trail(pipe_map):
+# The two directions each pipe connects, keyed by the byte of its character.
+PIPES = {ord("|"): (NORTH, SOUTH), ord("-"): (EAST, WEST), ord("L"): (NORTH, EAST),
+         ord("J"): (NORTH, WEST), ord("7"): (SOUTH, WEST), ord("F"): (SOUTH, EAST)}
+
+
+def find_loop_trails(pipe_map):
     """
-    Takes in a map of pipes, finds the location of the starting tile and one of
-    the tiles it is connected to. It also finds the direction this connecting
-    tile is approached from.
+    Takes in a map of pipes, finds the location of the starting tile, and yields
+    each of the tiles next to it with a pipe connecting to it. It also yields
+    the direction each connecting tile is headed into from S. Pipes that are
+    not on the loop may connect to S too, so only two of these need lead back
+    around to it.
 
     Input:
-        pipe_map [lst[lst[cha]]]
+        pipe_map [Grid]
 
-    Returns:
-        (int, int): the coordinate of tile connecting to S (i.e., the start of
-            loop).
-        cha: the direction of S relative to the connecting tile.
+    Yields:
+        int: the flat index of a tile connecting to S (i.e., a possible start of
+            the loop).
+        int: the direction heading from S into the connecting tile.
     """
-    break_flag = False
-    for row, line in enumerate(pipe_map):
-        for col, char in enumerate(line):
-            if char == "S":
-                break_flag = True
-                start_row = row
-                start_col = col
-                break
-        if break_flag:
-            break
-    height = len(pipe_map)
-    width = len(pipe_map[0])
-
-    for from_direction, diff_row, diff_col in DIRECTIONS:
-        trail_row = start_row + diff_row
-        trail_col = start_col + diff_col
-        if (0 <= trail_row < height) and (0 <= trail_col < width):
-            trail_char = pipe_map[trail_row][trail_col]
-            match (from_direction, trail_char):
-                case ("N", "|") | ("N", "L") | ("N", "J"):
-                    return (trail_row, trail_col), from_direction
-                case ("E", "-") | ("E", "L") | ("E", "F"):
-                    return (trail_row, trail_col), from_direction
-                case ("S", "|") | ("S", "7") | ("S", "F"):
-                    return (trail_row, trail_col), from_direction
-                case ("W", "-") | ("W", "7") | ("W", "J"):
-                    return (trail_row, trail_col), from_direction
-
-
-def track_loop(loop_tile, st_from_direction, pipe_map):
+    start = pipe_map.find("S")
+    for direction in DIRECTIONS:
+        trail = pipe_map.neighbours[start, direction]
+        if trail != OUTSIDE and opposite(direction) in PIPES.get(pipe_map.cells[trail], ()):
+            yield int(trail), direction
+
+
+def track_loop(loop_tile, st_heading, pipe_map):
     """
     Traces a loop through a pipe map using the start of the loop and the
-    direction it shouldn't head in (i.e., the direction from which this tile
-    was arrived at).
+    direction it was headed into (i.e., the direction it shouldn't head back in).
 
     Inputs:
-        loop_tile [tuple(int, int)]: the coordinates of the start of the loop.
-        st_from_direction [cha]: the position of the "S" tile relative to
+        loop_tile [int]: the flat index of the start of the loop.
+        st_heading [int]: the direction heading from the "S" tile into the
             beginning of the loop.
-        pipe_map [lst[lst[cha]]]: the matrix of pipes representing the map.
+        pipe_map [Grid]: the grid of pipes representing the map.
 
     Returns:
-        lst[tuple(int, int)]: a list of cooridantes that the loop visited
+        lst[int] | None: a list of flat indices that the loop visited, or None
+            if the pipes lead off the map or into a tile they do not connect
+            to before coming back to S
     """
-    pipe_row, pipe_col = loop_tile
-
-    loop = [(pipe_row, pipe_col)]
-    pipe_char = pipe_map[pipe_row][pipe_col]
-    from_direction = st_from_direction
-    while True:
-        match pipe_char:
-            case "|":
-                if from_direction == "N":
-                    pipe_row += 1
-                    # pipe_col += 0
-                    # from_direction = "N"
-                else:
-                    pipe_row += -1
-                    # pipe_col += 0
-                    # from_direction = "S"
-            case "-":
-                if from_direction == "W":
-                    # pipe_row += 0
-                    pipe_col += 1
-                    # from_direction = "W"
-                else:
-                    # pipe_row += 0
-                    pipe_col += -1
-                    # from_direction = "E"
-            case "L":
-                if from_direction == "N":
-                    # pipe_row += 0
-                    pipe_col += 1
-                    from_direction = "W"
-                else:
-                    pipe_row += -1
-                    # pipe_col += 0
-                    from_direction = "S"
-            case "J":
-                if from_direction == "N":
-                    # pipe_row += 0
-                    pipe_col += -1
-                    from_direction = "E"
-                else:
-                    pipe_row += -1
-                    # pipe_col += 0
-                    from_direction = "S"
-            case "7":
-                if from_direction == "S":
-                    # pipe_row += 0
-                    pipe_col += -1
-                    from_direction = "E"
-                else:
-                    pipe_row += 1
-                    # pipe_col += 0
-                    from_direction = "N"
-            case "F":
-                if from_direction == "S":
-                    # pipe_row += 0
-                    pipe_col += 1
-                    from_direction = "W"
-                else:
-                    pipe_row += 1
-                    # pipe_col += 0
-                    from_direction = "N"
-            case "S":
-                break
-        pipe_char = pipe_map[pipe_row][pipe_col]
-        loop.append((pipe_row, pipe_col))
+    cells, neighbours = pipe_map.views()
+    start = ord("S")
+
+    loop = [loop_tile]
+    pipe_tile = loop_tile
+    heading = st_heading
+    while cells[pipe_tile] != start:
+        # Leaves through whichever end of the pipe it did not enter through.
+        ends = PIPES.get(cells[pipe_tile], ())
+        if opposite(heading) not in ends:
+            return None
+        first, second = ends
+        heading = second if first == opposite(heading) else first
+        pipe_tile = neighbours[4 * pipe_tile + heading]
+        if pipe_tile == OUTSIDE:
+            return None
+        loop.append(pipe_tile)
 
     return loop
 
 
-def find_beetle_loop_length(file):
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a grid of pipe characters.
+
+    Input:
+        text [str]: the contents of the input file
+
+    Returns Grid
+    """
+    return Grid.from_text(text)
+
+
+@phase("solve")
+def find_beetle_loop_length(pipe_map):
     """
     Takes in a map of a field of pipes that a beetle-like organism has entered
     (see Day 10 of the Advent of Code 2023) and finds the length of the
     pipe loop that the beetle is scurring in.
 
     Inputs:
-        file [str]: the filename of the input.
+        pipe_map [Grid]: the grid of pipes representing the map.
 
     Returns int
     """
-    with open(file, encoding = "utf-8") as f:
-        pipe_map = [[*line] for line in f.read().split("\n")]
+    for loop_tile, heading in find_loop_trails(pipe_map):
+        loop = track_loop(loop_tile, heading, pipe_map)
+        if loop is not None:
+            return len(loop)
 
-    loop_tile, from_direction = find_loop_trail(pipe_map)
+    raise ValueError("No loop of pipes runs through the S tile.")
+
+
+def solve(text):
+    """
+    Returns the Star 19 answer for the contents of a Day 10 input file.
+    """
+    return find_beetle_loop_length(parse_input(text)) // 2
 
-    loop_length = len(track_loop(loop_tile, from_direction, pipe_map))
 
-    return loop_length
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
 
 
-print(find_beetle_loop_length(sys.argv[1]) // 2)
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -3,222 +3,194 @@ Module to solve the second star of Day 10 of the Advent of Code 2023, which is
 the 20th star overall.
 """
 import sys
-DIRECTIONS = [("N", 1, 0), ("E", 0, -1), ("S", 1, 0), ("W", 0, 1)]
 
-def find_loop_trail(pipe_map):
+import numpy as np
+
+from grid import DIRECTIONS, EAST, NORTH, OUTSIDE, SOUTH, WEST, Grid, opposite
+from instrument import phase
+
+# The two directions each pipe connects, keyed by the byte of its character.
+PIPES = {ord("|"): (NORTH, SOUTH), ord("-"): (EAST, WEST), ord("L"): (NORTH, EAST),
+         ord("J"): (NORTH, WEST), ord("7"): (SOUTH, WEST), ord("F"): (SOUTH, EAST)}
+
+
+def find_loop_trails(pipe_map, s_tile):
     """
-    Takes in a map of pipes, finds the locations of the starting tile and one of
-    the tiles it is connected to. It also finds the direction this connecting
-    tile is approached from.
+    Takes in a map of pipes and the location of its starting tile, and yields
+    each of the tiles next to it with a pipe connecting to it. It also yields
+    the direction each connecting tile is headed into from S. Pipes that are
+    not on the loop may connect to S too, so only two of these need lead back
+    around to it.
 
     Input:
-        pipe_map [lst[lst[cha]]]
+        pipe_map [Grid]
+        s_tile [int]: the flat index of the S tile
 
-    Returns:
-        (int, int): the coordinates of the S tile
-        (int, int): the coordinate of tile connecting to S (i.e., the start of
-            loop)
-        cha: the direction of S relative to the connecting tile
-    """
-    break_flag = False
-    for row, line in enumerate(pipe_map):
-        for col, char in enumerate(line):
-            if char == "S":
-                break_flag = True
-                start_row = row
-                start_col = col
-                break
-        if break_flag:
-            break
-    height = len(pipe_map)
-    width = len(pipe_map[0])
-
-    for from_direction, diff_row, diff_col in DIRECTIONS:
-        trail_row = start_row + diff_row
-        trail_col = start_col + diff_col
-        if (0 <= trail_row < height) and (0 <= trail_col < width):
-            trail_char = pipe_map[trail_row][trail_col]
-            match (from_direction, trail_char):
-                case ("N", "|") | ("N", "L") | ("N", "J"):
-                    return (start_row, start_col), (trail_row, trail_col), from_direction
-                case ("E", "-") | ("E", "L") | ("E", "F"):
-                    return (start_row, start_col), (trail_row, trail_col), from_direction
-                case ("S", "|") | ("S", "7") | ("S", "F"):
-                    return (start_row, start_col), (trail_row, trail_col), from_direction
-                case ("W", "-") | ("W", "7") | ("W", "J"):
-                    return (start_row, start_col), (trail_row, trail_col), from_direction
-
-
-def track_loop(loop_tile, st_from_direction, pipe_map):
+    Yields:
+        int: the flat index of a tile connecting to S (i.e., a possible start of
+            the loop)
+        int: the direction heading from S into the connecting tile
+    """
+    for direction in DIRECTIONS:
+        trail = pipe_map.neighbours[s_tile, direction]
+        if trail != OUTSIDE and opposite(direction) in PIPES.get(pipe_map.cells[trail], ()):
+            yield int(trail), direction
+
+
+def track_loop(loop_tile, st_heading, pipe_map):
     """
     Traces a loop through a pipe map using the start of the loop and the
-    direction it shouldn't head in (i.e., the direction from which this tile
-    was arrived at).
+    direction it was headed into (i.e., the direction it shouldn't head back in).
 
     Inputs:
-        loop_tile [tuple(int, int)]: the coordinates of the start of the loop.
-        st_from_direction [cha]: the position of the "S" tile relative to
+        loop_tile [int]: the flat index of the start of the loop.
+        st_heading [int]: the direction heading from the "S" tile into the
             beginning of the loop.
-        pipe_map [lst[lst[cha]]]: the matrix of pipes representing the map.
+        pipe_map [Grid]: the grid of pipes representing the map.
 
     Returns:
-        lst[lst[bool]]: a matrix corresponding with the pipe map that tracked
-            which tiles the loop visited.
-        cha: the direction from which the end of the loop (i.e., the S tile) was
-            visited from.
+        np.ndarray[bool]: a flat array corresponding with the pipe map that
+            tracked which tiles the loop visited.
+        int: the direction heading into the end of the loop (i.e., the S tile).
+        Returns None instead if the pipes lead off the map or into a tile they
+        do not connect to before coming back to S.
     """
-    pipe_row, pipe_col = loop_tile
+    cells, neighbours = pipe_map.views()
+    start = ord("S")
 
-    # Creates a matrix of booleans that represent whether a tile is part of the
+    # Creates an array of booleans that represent whether a tile is part of the
     # boundary
-    height = len(pipe_map)
-    width = len(pipe_map[0])
-    boundary_tiles = [[False for _ in range(width)] for _ in range(height)]
-    boundary_tiles[pipe_row][pipe_col] = True
-
-    pipe_char = pipe_map[pipe_row][pipe_col]
-    from_direction = st_from_direction
-    while True:
-        match pipe_char:
-            case "|":
-                if from_direction == "N":
-                    pipe_row += 1
-                    # pipe_col += 0
-                    # from_direction = "N"
-                else:
-                    pipe_row += -1
-                    # pipe_col += 0
-                    # from_direction = "S"
-            case "-":
-                if from_direction == "W":
-                    # pipe_row += 0
-                    pipe_col += 1
-                    # from_direction = "W"
-                else:
-                    # pipe_row += 0
-                    pipe_col += -1
-                    # from_direction = "E"
-            case "L":
-                if from_direction == "N":
-                    # pipe_row += 0
-                    pipe_col += 1
-                    from_direction = "W"
-                else:
-                    pipe_row += -1
-                    # pipe_col += 0
-                    from_direction = "S"
-            case "J":
-                if from_direction == "N":
-                    # pipe_row += 0
-                    pipe_col += -1
-                    from_direction = "E"
-                else:
-                    pipe_row += -1
-                    # pipe_col += 0
-                    from_direction = "S"
-            case "7":
-                if from_direction == "S":
-                    # pipe_row += 0
-                    pipe_col += -1
-                    from_direction = "E"
-                else:
-                    pipe_row += 1
-                    # pipe_col += 0
-                    from_direction = "N"
-            case "F":
-                if from_direction == "S":
-                    # pipe_row += 0
-                    pipe_col += 1
-                    from_direction = "W"
-                else:
-                    pipe_row += 1
-                    # pipe_col += 0
-                    from_direction = "N"
-            case "S":
-                break
-        pipe_char = pipe_map[pipe_row][pipe_col]
-        boundary_tiles[pipe_row][pipe_col] = True
-
-    return boundary_tiles, from_direction
-
-
-def adjust_s(from_direction, to_direction):
+    boundary_tiles = np.zeros(len(pipe_map), dtype=bool)
+    boundary_tiles[loop_tile] = True
+
+    pipe_tile = loop_tile
+    heading = st_heading
+    while cells[pipe_tile] != start:
+        # Leaves through whichever end of the pipe it did not enter through.
+        ends = PIPES.get(cells[pipe_tile], ())
+        if opposite(heading) not in ends:
+            return None
+        first, second = ends
+        heading = second if first == opposite(heading) else first
+        pipe_tile = neighbours[4 * pipe_tile + heading]
+        if pipe_tile == OUTSIDE:
+            return None
+        boundary_tiles[pipe_tile] = True
+
+    return boundary_tiles, heading
+
+
+def adjust_s(st_heading, end_heading):
     """
     Finds the type of pipe that the S tile is.
 
     Inputs:
-        from_direction: the direction that the S tile approaches the first tile
-            of the loop from.
-        to_direction: the direction that the second-to-last tile of the loop
-            approaches S from.
+        st_heading: the direction heading from S into the first tile of the
+            loop.
+        end_heading: the direction heading from the last tile of the loop into
+            S.
 
     Returns cha
     """
-    to_direction = [to_direction]
-    # Inverts the from_direction to find the location of the first tile of the
-    # loop relative to S.
-    match from_direction:
-        case "S":
-            to_direction.append("N")
-        case "N":
-            to_direction.append("S")
-        case "E":
-            to_direction.append("W")
-        case "W":
-            to_direction.append("E")
-
-    # Uses the relative locations of the tiles that S is connected to determine
-    # its shape.
-    match to_direction:
-        case ["N", "S"] | ["S", "N"]:
-            return "|"
-        case ["E", "W"] | ["W", "E"]:
-            return "-"
-        case ["N", "E"] | ["E", "N"]:
-            return "L"
-        case ["N", "W"] | ["W", "N"]:
-            return "J"
-        case ["S", "W"] | ["W", "S"]:
-            return "7"
-        case ["S", "E"] | ["E", "S"]:
-            return "F"
-
-
-def find_beetle_loop_area(file):
+    # S connects towards the first tile of the loop, and back towards the last.
+    connections = {st_heading, opposite(end_heading)}
+    for pipe, pipe_connections in PIPES.items():
+        if connections == set(pipe_connections):
+            return chr(pipe)
+
+
+@phase("build")
+def trace_loop(pipe_map):
+    """
+    Traces the loop of pipes through the S tile, and replaces the S tile in the
+    pipe map with the type of pipe it stands for.
+
+    Input:
+        pipe_map [Grid]: the grid of pipes representing the map.
+
+    Returns np.ndarray[bool]: a flat array corresponding with the pipe map that
+        tracked which tiles the loop visited.
+    """
+    s_tile = pipe_map.find("S")
+    for loop_tile, st_heading in find_loop_trails(pipe_map, s_tile):
+        traced = track_loop(loop_tile, st_heading, pipe_map)
+        if traced is not None:
+            break
+    else:
+        raise ValueError("No loop of pipes runs through the S tile.")
+
+    # The shape of S comes from the two ends of the loop that was followed,
+    # rather than from every pipe next to it.
+    boundary_tiles, end_heading = traced
+    pipe_map.cells[s_tile] = ord(adjust_s(st_heading, end_heading))
+
+    return boundary_tiles
+
+
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a grid of pipe characters.
+
+    Input:
+        text [str]: the contents of the input file
+
+    Returns Grid
+    """
+    return Grid.from_text(text)
+
+
+@phase("solve")
+def find_beetle_loop_area(pipe_map, boundary_tiles):
     """
     Takes in a map of a field of pipes that a rat-like organism has entered (see
     Day 10 of the Advent of Code 2023) and finds the discrete area of tiles
     enclosed by the loop of pipes the rat entered.
 
     Inputs:
-        file [str]: the filename of the input
+        pipe_map [Grid]: the grid of pipes representing the map, with the S tile
+            replaced by its pipe.
+        boundary_tiles [np.ndarray[bool]]: the tiles of the loop, as found by
+            trace_loop.
 
     Returns int
     """
-    with open(file, encoding = "utf-8") as f:
-        pipe_map = [[*line] for line in f.read().split("\n")]
+    # Casts a ray through every row of the pipe map, determining whether each
+    # tile of the row is enclosed by the loop of pipes using the point in
+    # polygon ray-casting method: a tile is inside if the boundary pipes with a
+    # northern end to its left are odd in number.
+    crossings = (boundary_tiles & pipe_map.mask("|LJ")).reshape(pipe_map.height, pipe_map.width)
+    in_polygon = np.cumsum(crossings, axis=1) % 2 == 1
+    answer = np.count_nonzero(in_polygon.ravel() & ~boundary_tiles)
 
-    s_tile, loop_tile, from_direction = find_loop_trail(pipe_map)
+    return int(answer)
 
-    boundary_tiles, to_direction = track_loop(loop_tile, from_direction, pipe_map)
 
-    start_row, start_col = s_tile
-    pipe_map[start_row][start_col] = adjust_s(from_direction, to_direction)
+def solve(text):
+    """
+    Returns the Star 20 answer for the contents of a Day 10 input file.
+    """
+    pipe_map = parse_input(text)
+    return find_beetle_loop_area(pipe_map, trace_loop(pipe_map))
+
+
+def solve_both(text):
+    """
+    Returns the Star 19 and Star 20 answers for the contents of a Day 10 input
+    file. The loop is only traced once: the farthest point along it is half of
+    its length, which is the number of tiles it visited.
+    """
+    pipe_map = parse_input(text)
+    boundary_tiles = trace_loop(pipe_map)
+    loop_length = int(np.count_nonzero(boundary_tiles))
+
+    return loop_length // 2, find_beetle_loop_area(pipe_map, boundary_tiles)
 
-    # Casts a ray through every row of the pipe map, determining whether each
-    # tile of the row is enclosed by the loop of pipes using the point in
-    # polygon ray-casting method.
-    answer = 0
-    for row, line in enumerate(pipe_map):
-        in_polygon = False
-        for col, cha in enumerate(line):
-            if boundary_tiles[row][col]:
-                if cha in ["|", "L", "J"]:
-                    in_polygon = not in_polygon
-            elif in_polygon:
-                answer += 1
 
-    return answer
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
 
 
-print(find_beetle_loop_area(sys.argv[1]))
+if __name__ == "__main__":
+    main(sys.argv[1])
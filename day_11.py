@@ -4,6 +4,13 @@ which are the 21st and 22nd stars overall.
 """
 import sys
 
+import numpy as np
+
+from grid import Grid
+from instrument import phase
+
+
+@phase("build")
 def expand_cols(galaxy_positions, width, expansion_rate):
     """
     Takes in a sequence of coordiantes for the positions of galaxies, and
@@ -45,7 +52,57 @@ def expand_cols(galaxy_positions, width, expansion_rate):
     return new_galaxy_positions
 
 
-def calculate_galactic_distances(file, expansion_rate = 1):
+@phase("build")
+def expand_coordinates(coordinates, size, expansion_rate):
+    """
+    Takes in the row or column coordinates of every galaxy, and adjusts them to
+    reflect the expansion of the empty rows or columns before them.
+
+    Input:
+        coordinates [np.ndarray[int]]: the row or column of each galaxy.
+        size [int]: the height or width of the initial data the galaxies were
+            found in.
+        expansion_rate [int]: how many extra rows or columns of distance each
+            empty one should be worth as compared to an occupied one.
+
+    Returns np.ndarray[int]
+    """
+    is_empty = np.bincount(coordinates, minlength=size) == 0
+    expansion = np.cumsum(is_empty, dtype=np.int64) * expansion_rate
+    return coordinates + expansion[coordinates]
+
+
+def sum_pairwise_distances(coordinates):
+    """
+    Sums the distances between every pair of coordinates along one axis. Once
+    sorted, the i-th of n coordinates is the larger of a pair i times and the
+    smaller n - 1 - i times. Python ints are used since the sum can overflow.
+
+    Input:
+        coordinates [np.ndarray[int]]: the coordinates of each galaxy.
+
+    Returns int
+    """
+    number = len(coordinates)
+    return sum((2 * index - number + 1) * coordinate
+               for index, coordinate in enumerate(np.sort(coordinates).tolist()))
+
+
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a grid of night sky characters.
+
+    Input:
+        text [str]: the contents of the input file
+
+    Returns Grid
+    """
+    return Grid.from_text(text)
+
+
+@phase("solve")
+def calculate_galactic_distances(star_map, expansion_rate = 1):
     """
     Taking in a map of the night sky and an expansion rate (see Day 11 of Advent
     of Code 2023) and calculates the sum of the Manhattan distances between all
@@ -53,28 +110,26 @@ def calculate_galactic_distances(file, expansion_rate = 1):
     time.
 
     Inputs:
-        file [str]: the name of the input file.
+        star_map [Grid]: the map of the night sky.
         expansion_rate [int = 1]: how many extra rows or cols of distance an
             unoccupied row or col should be worth respectively as compared to a
             row or column that has at least one galaxy found in it.
 
     Return int
     """
-    with open(file, encoding="utf-8") as f:
-        star_map = [[*line] for line in f.read().split("\n")]
-
+    galaxy = ord("#")
     galaxy_positions = []
     row_expansion = 0
-    for row, line in enumerate(star_map):
+    for row, line in enumerate(star_map.rows.tolist()):
         found_galaxies = False
         for col, cha in enumerate(line):
-            if cha == "#":
+            if cha == galaxy:
                 galaxy_positions.append((row + row_expansion, col))
                 found_galaxies = True
         if not found_galaxies:
             row_expansion += expansion_rate
 
-    galaxy_positions = expand_cols(galaxy_positions, len(star_map[0]), expansion_rate)
+    galaxy_positions = expand_cols(galaxy_positions, star_map.width, expansion_rate)
 
     answer = 0
     galaxy_number = len(galaxy_positions)
@@ -88,5 +143,73 @@ def calculate_galactic_distances(file, expansion_rate = 1):
 
     return answer
 
-print(calculate_galactic_distances(sys.argv[1]))
-print(calculate_galactic_distances(sys.argv[1], 999999))
+
+@phase("solve")
+def calculate_galactic_distances_sorted(star_map, expansion_rate = 1):
+    """
+    Taking in a map of the night sky and an expansion rate (see Day 11 of Advent
+    of Code 2023) and calculates the sum of the Manhattan distances between all
+    pairs of galaxies while accounting for the expansion of the universe over
+    time.
+
+    Like calculate_galactic_distances, but the distances along each axis are
+    summed from the sorted coordinates rather than pair by pair.
+
+    Inputs:
+        star_map [Grid]: the map of the night sky.
+        expansion_rate [int = 1]: how many extra rows or cols of distance an
+            unoccupied row or col should be worth respectively as compared to a
+            row or column that has at least one galaxy found in it.
+
+    Return int
+    """
+    galaxy_rows, galaxy_cols = np.divmod(np.flatnonzero(star_map.cells == ord("#")),
+                                         star_map.width)
+
+    # The Manhattan distance splits into a row and a column distance, so each
+    # axis is expanded and summed on its own.
+    galaxy_rows = expand_coordinates(galaxy_rows, star_map.height, expansion_rate)
+    galaxy_cols = expand_coordinates(galaxy_cols, star_map.width, expansion_rate)
+
+    return sum_pairwise_distances(galaxy_rows) + sum_pairwise_distances(galaxy_cols)
+
+
+def solve_part_1(text):
+    """
+    Returns the Star 21 answer for the contents of a Day 11 input file.
+    """
+    return calculate_galactic_distances(parse_input(text))
+
+
+def solve_part_2(text):
+    """
+    Returns the Star 22 answer for the contents of a Day 11 input file.
+    """
+    return calculate_galactic_distances(parse_input(text), 999999)
+
+
+def solve_part_1_sorted(text):
+    """
+    Returns the Star 21 answer for the contents of a Day 11 input file, summing
+    the distances from the sorted coordinates of the galaxies.
+    """
+    return calculate_galactic_distances_sorted(parse_input(text))
+
+
+def solve_part_2_sorted(text):
+    """
+    Returns the Star 22 answer for the contents of a Day 11 input file, summing
+    the distances from the sorted coordinates of the galaxies.
+    """
+    return calculate_galactic_distances_sorted(parse_input(text), 999999)
+
+
+def main(filename):
+    with open(filename, encoding="utf-8") as f:
+        star_map = parse_input(f.read())
+    print(calculate_galactic_distances(star_map))
+    print(calculate_galactic_distances(star_map, 999999))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
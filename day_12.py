@@ -5,12 +5,17 @@ which are the 23rd and 24th stars overall.
 from functools import cache
 import sys
 
+from budget import register_cache
+from instrument import phase
+
+@register_cache
 @cache
 def recurse_nonogram_row(row, numbers):
     """
     Finds the number of valid solutions to a nonogram (aka Picross) row using
     dynamic programming and the help of the functools cache function, which will
-    remember rows and numbers we've already counted solutions for.
+    remember rows and numbers we've already counted solutions for. The cache is
+    flushed if a memory budget is exceeded.
 
     Inputs:
         row [str]: a picross row consisting of "#" (filled tiles),
@@ -28,7 +33,7 @@ def recurse_nonogram_row(row, numbers):
         if not numbers:
             return 1
         return 0
-    if numbers == []:
+    if not numbers:
         # If numbers is empty, the row has to be full of empty tiles or else
         # there are no valid solutions.
         if "#" in row:
@@ -53,14 +58,30 @@ def recurse_nonogram_row(row, numbers):
         # If there is an interruption that prohibits us from filling out the
         # the next chunk, we know this row to have no valid solutions
         return 0
-    if row[numbers[0]] == "#":
-        # If the chunk is too long, we know this row to have no valid solutions
+    if len(row) <= numbers[0] or row[numbers[0]] == "#":
+        # If the chunk is too long (or runs off the end of the row), we know
+        # this row to have no valid solutions
         return 0
     # Otherwise, the placement of the next chunk is forced and we can move on.
     return recurse_nonogram_row(row[numbers[0] + 1:], numbers[1:])
 
 
-def solve_nonogram_rows(file, duplication = 1):
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a list of picross rows with their numbers.
+
+    Input:
+        text [str]: the contents of the input file
+
+    Returns lst[tuple(str, tuple(int))]
+    """
+    text = [line.split() for line in text.strip().split("\n")]
+    return [(row, tuple(map(int, nums.split(",")))) for row, nums in text]
+
+
+@phase("solve")
+def solve_nonogram_rows(picross_rows, duplication = 1, verbose = False):
     """
     Takes in a map of broken, working, and unknown springs (See Day 12 of the
     Advent of Code 2023) along with the number of bunches of broken springs per
@@ -68,25 +89,45 @@ def solve_nonogram_rows(file, duplication = 1):
     duplicate the size of each row in case the map happens to be folded.
 
     Input:
-        file [str]: the filename of the input
+        picross_rows [lst[tuple(str, tuple(int))]]: the rows and their numbers
         duplication [int = 1]: for each row, how duplicated should it be (with
             1 meaning no duplication, 2 meaning the row is doubled, etc.)
+        verbose [bool = False]: whether to print progress after each row
 
     Returns int
     """
-    with open(file, encoding = "utf-8") as f:
-        text = [(line.split()[0], line.split()[1]) for line in f.read().split("\n")]
-        picross_rows = [(row, tuple(map(int, nums.split(",")))) for row, nums in text]
-
     total_arrangements = 0
     for index, row_w_num in enumerate(picross_rows):
         row, numbers = row_w_num
         new_row = "?".join([row] * duplication) + "."
         new_numbers = numbers * duplication
         total_arrangements += recurse_nonogram_row(new_row, new_numbers)
-        print(f"Finished {index + 1} / {len(picross_rows)}!")
+        if verbose:
+            print(f"Finished {index + 1} / {len(picross_rows)}!")
 
     return total_arrangements
 
-print(solve_nonogram_rows(sys.argv[1]))
-print(solve_nonogram_rows(sys.argv[1], 5))
+
+def solve_part_1(text):
+    """
+    Returns the Star 23 answer for the contents of a Day 12 input file.
+    """
+    return solve_nonogram_rows(parse_input(text))
+
+
+def solve_part_2(text):
+    """
+    Returns the Star 24 answer for the contents of a Day 12 input file.
+    """
+    return solve_nonogram_rows(parse_input(text), 5)
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        picross_rows = parse_input(f.read())
+    print(solve_nonogram_rows(picross_rows, verbose = True))
+    print(solve_nonogram_rows(picross_rows, 5, verbose = True))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -4,57 +4,63 @@ the 25th star overall.
 """
 import sys
 
-def search_reflection(array, length):
+import numpy as np
+
+from grid import Grid
+from instrument import phase
+
+
+def search_reflection(array):
     """
-    Searches a 2D array of characters to find a line of reflection across the
-    rows or columns (depending on the array type) of the array.
+    Searches a 2D array of characters to find a line of reflection across its
+    rows (or its columns, if it is passed transposed).
 
     Inputs:
-        array [lst[str]]: a list of columns/rows of an 2D array of characters.
-        length [int]: the number of rows/columns in the array (for row array and
-            column arrays respectively).
+        array [np.ndarray]: a (rows, columns) array of characters.
 
-    Returns int
+    Returns bool, int
     """
-    next_column = array[0]
-    found_reflection = False
-    for index in range(1, len(array)):
-        curr_column = next_column[:]
-        next_column = array[index]
-        if curr_column == next_column and check_reflect(array, length, index):
-            found_reflection = True
-            break
-    if not found_reflection:
-        return False, index
-    return True, index
+    length = len(array)
+    for index in range(1, length):
+        if check_reflect(array, length, index):
+            return True, index
+    return False, length - 1
 
 
 def check_reflect(array, length, reflect_index):
     """
     Checks whether a given index creates a valid reflection across the rows
-    or columns (depending on the array type) of an array.
+    of an array, by comparing the rows before it (flipped) with those after.
 
     Inputs:
-        array [lst[str]]: a list of columns/rows of an 2D array of characters.
-        length [int]: the number of rows/columns in the array (for row array and
-            column arrays respectively).
+        array [np.ndarray]: a (rows, columns) array of characters.
+        length [int]: the number of rows in the array.
         reflect_index [int]: the index of reflection to check.
 
     Return bool
     """
-    index = 2
-    not_reflection = False
-    while (0 <= reflect_index - index) and (reflect_index + index - 1 < length):
-        if array[reflect_index - index] != array[reflect_index + index - 1]:
-            not_reflection = True
-            break
-        index += 1
-    if not_reflection:
-        return False
-    return True
-
-
-def volcano_reflections(filename):
+    span = min(reflect_index, length - reflect_index)
+    before = array[reflect_index - span:reflect_index][::-1]
+    after = array[reflect_index:reflect_index + span]
+    return bool(np.array_equal(before, after))
+
+
+@phase("parse")
+def parse_input(text):
+    """
+    Parses each lava rock field into a grid, whose rows can be searched
+    directly and whose columns are searched through its transpose.
+
+    Input:
+        text [str]: the contents of the input file.
+
+    Returns lst[Grid]
+    """
+    return [Grid.from_text(array) for array in text.strip().split("\n\n")]
+
+
+@phase("solve")
+def volcano_reflections(arrays):
     """
     Takes in arrays of lava rock fields (see Day 13 of the Advent of Code 2023)
     and finds the direction and index of the reflection. Then it sums up the
@@ -62,31 +68,33 @@ def volcano_reflections(filename):
     multiplied by the number of rows above each horizontal line of reflection.
 
     Input:
-        filename [str]: the filename of the input file.
+        arrays [lst[Grid]]: the grid of each lava rock field.
 
     Returns int
     """
-    # Creates easy to iterate through representations of each lava rock field as
-    # rows and columns. The list comprehensions are a mouth-full, but they do as
-    # expected.
-    with open(filename, encoding = "utf-8") as f:
-        raw_arrays = f.read().split("\n\n")
-    row_arrays = [[line for line in array.split("\n")] for array in raw_arrays]
-    col_arrays = [  ["".join([line[i] for line in array.split("\n")])
-                     for i in range(len(array.split("\n")[0]))]
-                  for array in raw_arrays]
-    arrays = ((row_arrays[i], col_arrays[i]) for i in range(len(raw_arrays)))
-
     answer = 0
-    for row_array, col_array in arrays:
-        is_row_reflection, reflect_index = search_reflection(row_array, len(row_array))
+    for array in arrays:
+        is_row_reflection, reflect_index = search_reflection(array.rows)
         if is_row_reflection:
             answer += 100 * reflect_index
         else:
-            _, reflect_index = search_reflection(col_array, len(col_array))
+            _, reflect_index = search_reflection(array.rows.T)
             answer += reflect_index
 
     return answer
 
 
-print(volcano_reflections(sys.argv[1]))
+def solve(text):
+    """
+    Returns the Star 25 answer for the contents of a Day 13 input file.
+    """
+    return volcano_reflections(parse_input(text))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -4,82 +4,96 @@ the 26th star overall.
 """
 import sys
 
-def count_differences(str1, str2):
+import numpy as np
+
+from grid import Grid
+from instrument import phase
+
+
+def search_reflection(array):
     """
-    Counts the number of differences between two equal sized strings. It halts
-    if more than 1 difference is found, because it means the lines are too
-    different to be valid reflections of each other.
+    Searches a 2D array of characters to find a line of reflection (with exactly
+    one mismatch or "smudge") across its rows (or its columns, if it is passed
+    transposed).
 
     Inputs:
-        str1 [str]
-        str2 [str]
+        array [np.ndarray]: a (rows, columns) array of characters.
 
-    Returns int
+    Returns bool, int
     """
-    num_differences = 0
-    for index, cha1 in enumerate(str1):
-        if cha1 != str2[index]:
-            num_differences += 1
-        if num_differences > 1:
-            break
-    return num_differences
+    length = len(array)
+    for index in range(1, length):
+        if check_reflect(array, length, index):
+            return True, index
+    return False, length - 1
 
 
-def search_reflection(array, length):
+def check_reflect(array, length, reflect_index):
     """
-    Searches a 2D array of characters to find a line of reflection (with exactly
-    one mismatch or "smudge") across the rows or columns (depending on the array
-    type) of the array.
+    Checks whether a given index creates a valid reflection with exactly
+    one mismatch (or smudge) across the rows of an array, by comparing the rows
+    before it (flipped) with those after.
 
     Inputs:
-        array [lst[str]]: a list of columns/rows of an 2D array of characters.
-        length [int]: the number of rows/columns in the array (for row array and
-            column arrays respectively)
+        array [np.ndarray]: a (rows, columns) array of characters.
+        length [int]: the number of rows in the array.
+        reflect_index [int]: the index of reflection to check.
 
-    Returns int
+    Return bool
     """
-    next_col = array[0]
-    found_reflection = False
-    for index in range(1, len(array)):
-        curr_col = next_col[:]
-        next_col = array[index]
-        differences = count_differences(curr_col, next_col)
-        if differences <= 1 and check_reflect(array, length, index, differences):
-            found_reflection = True
-            break
-    if not found_reflection:
-        return False, index
-    return True, index
+    span = min(reflect_index, length - reflect_index)
+    before = array[reflect_index - span:reflect_index][::-1]
+    after = array[reflect_index:reflect_index + span]
+    return np.count_nonzero(before != after) == 1
 
 
-def check_reflect(array, length, reflect_index, last_dif):
+def search_both_reflections(array):
     """
-    Checks whether a given index creates a valid reflection with exactly
-    one mismatch (or smudge) across the rows or columns (depending on the
-    array type) of an array.
+    Searches the rows and then the columns of a lava rock field for both its
+    clean line of reflection and its line of reflection with exactly one
+    smudge, counting the mismatches across each candidate line only once.
 
     Inputs:
-        array [lst[str]]: a list of columns/rows of an 2D array of characters.
-        length [int]: the number of rows/columns in the array (for row array and
-            column arrays respectively).
-        reflect_index [int]: the index of reflection to check.
+        array [Grid]: the grid of a lava rock field.
+
+    Returns int, int: the summary value of each line of reflection, being 100
+        times the rows above it or the columns to the left of it.
     """
-    index = 2
-    not_reflection = False
-    differences = last_dif
-    while (0 <= reflect_index - index) and (reflect_index + index - 1 < length):
-        differences += count_differences(array[reflect_index - index],
-                                         array[reflect_index + index - 1])
-        if differences > 1:
-            not_reflection = True
+    # Indexed by the number of mismatches across the line, 0 or 1.
+    summaries = [None, None]
+    for weight, rows in ((100, array.rows), (1, array.rows.T)):
+        length = len(rows)
+        for index in range(1, length):
+            span = min(index, length - index)
+            before = rows[index - span:index][::-1]
+            after = rows[index:index + span]
+            mismatches = np.count_nonzero(before != after)
+            if mismatches < 2 and summaries[mismatches] is None:
+                summaries[mismatches] = weight * index
+        if None not in summaries:
             break
-        index += 1
-    if not_reflection or differences == 0:
-        return False
-    return True
+
+    # Like search_reflection, a field without a line falls back to the last
+    # column.
+    return tuple(array.width - 1 if summary is None else summary for summary in summaries)
+
+
+@phase("parse")
+def parse_input(text):
+    """
+    Parses each lava rock field into a grid, whose rows can be searched
+    directly and whose columns are searched through its transpose.
+
+    Input:
+        text [str]: the contents of the input file.
+
+    Returns lst[Grid]
+    """
+    return [Grid.from_text(array) for array in text.strip().split("\n\n")]
 
 
-def volcano_reflections(filename):
+@phase("solve")
+def volcano_reflections(arrays):
     """
     Takes in arrays of lava rock fields (see Day 13 of the Advent of Code 2023)
     and finds the direction and index of the reflection (with exactly one
@@ -88,31 +102,63 @@ def volcano_reflections(filename):
     above each horizontal line of reflection.
 
     Input:
-        filename [str]: the filename of the input file.
+        arrays [lst[Grid]]: the grid of each lava rock field.
 
     Returns int
     """
-    # Creates easy to iterate through representations of each lava rock field as
-    # rows and columns. The list comprehensions are a mouth-full, but they do as
-    # expected.
-    with open(filename, encoding = "utf-8") as f:
-        raw_arrays = f.read().split("\n\n")
-    row_arrays = [[line for line in array.split("\n")] for array in raw_arrays]
-    col_arrays = [  ["".join([line[i] for line in array.split("\n")])
-                     for i in range(len(array.split("\n")[0]))]
-                  for array in raw_arrays]
-    arrays = ((row_arrays[i], col_arrays[i]) for i in range(len(raw_arrays)))
-
     answer = 0
-    for row_array, col_array in arrays:
-        is_row_reflection, reflect_index = search_reflection(row_array, len(row_array))
+    for array in arrays:
+        is_row_reflection, reflect_index = search_reflection(array.rows)
         if is_row_reflection:
             answer += 100 * reflect_index
         else:
-            _, reflect_index = search_reflection(col_array, len(col_array))
+            _, reflect_index = search_reflection(array.rows.T)
             answer += reflect_index
 
     return answer
 
 
-print(volcano_reflections(sys.argv[1]))
+def solve(text):
+    """
+    Returns the Star 26 answer for the contents of a Day 13 input file.
+    """
+    return volcano_reflections(parse_input(text))
+
+
+@phase("solve")
+def volcano_both_reflections(arrays):
+    """
+    Takes in arrays of lava rock fields (see Day 13 of the Advent of Code 2023)
+    and sums up the summary values of both their clean lines of reflection and
+    their lines of reflection with exactly one smudge.
+
+    Input:
+        arrays [lst[Grid]]: the grid of each lava rock field.
+
+    Returns int, int
+    """
+    clean_answer = 0
+    smudged_answer = 0
+    for array in arrays:
+        clean_summary, smudged_summary = search_both_reflections(array)
+        clean_answer += clean_summary
+        smudged_answer += smudged_summary
+
+    return clean_answer, smudged_answer
+
+
+def solve_both(text):
+    """
+    Returns the Star 25 and Star 26 answers for the contents of a Day 13 input
+    file, parsing it and comparing each pair of rows only once.
+    """
+    return volcano_both_reflections(parse_input(text))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
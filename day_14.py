@@ -4,76 +4,91 @@ which are the 27th and 28th stars overall.
 """
 import sys
 
+import numpy as np
+
+from grid import EAST, NORTH, SOUTH, WEST, Grid
+from instrument import phase
+
+
 def tilt_direction(matrix, direction):
     """
     Simulates a tilt of a matrix of immovable square rocks "#" and movable round
     rocks "O" in one of four cardinal directions.
 
     Inputs:
-        matrix [lst[str]]: a list of strings representing a field of square and
-            round rocks.
-        direction [cha]: a character representing the direction of the tilt.
+        matrix [Grid]: the field of square and round rocks.
+        direction [int]: the direction of the tilt.
 
-    Returns lst[str]
+    Returns Grid
     """
     # Determines parameters of function based on the direction of the tilting.
-    direction_dict = {"N": (True, True),
-                      "S": (False, True),
-                      "W": (True, False),
-                      "E": (False, False)}
+    direction_dict = {NORTH: (True, True),
+                      SOUTH: (False, True),
+                      WEST: (True, False),
+                      EAST: (False, False)}
     is_reversed, needs_transpose = direction_dict[direction]
 
-    if needs_transpose:
-        matrix = ["".join([line[i] for line in matrix])
-                  for i in range(len(matrix[0]))]
+    rows = matrix.rows.T if needs_transpose else matrix.rows
 
     # Tilts each row by splitting it along the square blocks, sorting the
     # segments in the appropriate order, and then joining them together again.
-    new_matrix = []
-    for line in matrix:
-        sorted_lines = ["".join(sorted(subline, reverse = is_reversed))
-                        for subline in line.split("#")]
-        new_line = "#".join(sorted_lines)
-        new_matrix.append(new_line)
+    # Round rocks sort after empty spaces, so a reversed sort puts them first.
+    new_rows = np.empty_like(rows)
+    for row_index, line in enumerate(rows):
+        sorted_lines = [bytes(sorted(subline, reverse = is_reversed))
+                        for subline in line.tobytes().split(b"#")]
+        new_rows[row_index] = np.frombuffer(b"#".join(sorted_lines), dtype=np.uint8)
 
     if needs_transpose:
-        new_matrix = ["".join([line[i] for line in new_matrix])
-                      for i in range(len(new_matrix[0]))]
+        new_rows = new_rows.T
 
-    return new_matrix
+    return Grid(new_rows.flatten(), matrix.height, matrix.width)
 
 
-def rock_washing_machine(filename):
+def calculate_north_load(matrix):
     """
-    A function to take in a map of a movable platform of round and square rocks
-    (See Day 14 of the Advent of Code 2023) and prints the load on the north
-    support after tilting it to the north once, and the load after tilting it
-    in a cycle of north, west, south, and east 1,000,000,000 times.
+    Calculates the load on the north support of a platform of rocks, where each
+    round rock contributes the number of rows from it to the south edge.
 
     Input:
-        filename [str]: the filename of the input map represented as a matrix.
-    """
-    with open(filename, encoding = "utf-8") as f:
-        # We will be keeping the matrix as composed of a list of strings to take
-        # advantage of python's built in sorting algorithms
-        matrix = f.read().split("\n")
+        matrix [Grid]: the field of square and round rocks.
 
-    # Part 1
-    # Tilts matrix north and then calculates the load on the north support.
-    part_1_matrix = tilt_direction(matrix, "N")
+    Returns int
+    """
     answer = 0
-    for row_index, row in enumerate(reversed(part_1_matrix)):
-        for space in row:
-            if space == "O":
-                answer += row_index + 1
-    print(f"The answer to Star 27 is {answer}")
-
-    # Part 2
-    # Tilts the matrix in a cycle of North, West, South, and East, storing the
-    # results so it can find a loop. Once it has found a loop, it determines
-    # which element in the loop corresponds to the result of 1,000,000,000
-    # cycles.
-    directions = ["N", "W", "S", "E"]
+    for row_index, row in enumerate(reversed(matrix.rows)):
+        answer += (row_index + 1) * int(np.count_nonzero(row == ord("O")))
+    return answer
+
+
+@phase("solve")
+def tilt_north_load(matrix):
+    """
+    Tilts the matrix north and then calculates the load on the north support.
+
+    Input:
+        matrix [Grid]: the field of square and round rocks.
+
+    Returns int
+    """
+    return calculate_north_load(tilt_direction(matrix, NORTH))
+
+
+@phase("solve")
+def spin_cycle_load(matrix, cycles = 1000000000):
+    """
+    Tilts the matrix in a cycle of North, West, South, and East, storing the
+    results so it can find a loop. Once it has found a loop, it determines
+    which element in the loop corresponds to the result of the given number of
+    cycles and calculates the load on the north support.
+
+    Input:
+        matrix [Grid]: the field of square and round rocks.
+        cycles [int = 1000000000]: the number of spin cycles to run.
+
+    Returns int
+    """
+    directions = [NORTH, WEST, SOUTH, EAST]
     find_loop = []
     loop = True
     while loop:
@@ -81,21 +96,191 @@ def rock_washing_machine(filename):
         for direction in directions:
             matrix = tilt_direction(matrix, direction)
         for index, comp_matrix in enumerate(find_loop):
-            if matrix == comp_matrix:
+            if np.array_equal(matrix.cells, comp_matrix.cells):
                 loop_start = index
                 loop = False
                 break
     loop_length = len(find_loop) - loop_start
-    index = (1000000000 - loop_start) % loop_length + loop_start
-    matrix = find_loop[index]
+    index = (cycles - loop_start) % loop_length + loop_start
 
-    answer = 0
-    for row_index, row in enumerate(reversed(matrix)):
-        for space in row:
-            if space == "O":
-                answer += row_index + 1
+    return calculate_north_load(find_loop[index])
+
+
+def find_stops(matrix):
+    """
+    Finds, for each direction and each cell, the flat index a round rock there
+    comes to rest at if it is the only one tilted in that direction, along with
+    the flat step back away from that resting place.
+
+    Input:
+        matrix [Grid]: the field of square "#" and round "O" rocks.
+
+    Returns dict{int: tuple(np.ndarray[int], int)}
+    """
+    rows = matrix.rows
+    height, width = rows.shape
+    is_square = rows == ord("#")
+
+    def stops_towards_top(blocked):
+        # Each cell stops just below the last blocked cell above it in its
+        # column, or at the top edge if there is none.
+        positions = np.arange(len(blocked))[:, None]
+        return np.maximum.accumulate(np.where(blocked, positions, -1), axis=0) + 1
+
+    row_numbers = np.arange(height)[:, None]
+    col_numbers = np.arange(width)[None, :]
+    north = stops_towards_top(is_square)
+    south = height - 1 - stops_towards_top(is_square[::-1])[::-1]
+    west = stops_towards_top(is_square.T).T
+    east = width - 1 - stops_towards_top(is_square.T[::-1])[::-1].T
+
+    return {NORTH: ((north * width + col_numbers).ravel(), width),
+            SOUTH: ((south * width + col_numbers).ravel(), -width),
+            WEST: ((row_numbers * width + west).ravel(), 1),
+            EAST: ((row_numbers * width + east).ravel(), -1)}
+
+
+def tilt_rocks(rocks, stops):
+    """
+    Simulates a tilt of a field of immovable square rocks "#" and movable round
+    rocks "O" in one of four cardinal directions. Rocks sharing a resting place
+    pile up behind each other, one cell further back for each rock before them.
+
+    Inputs:
+        rocks [np.ndarray[int]]: the sorted flat indices of the round rocks.
+        stops [tuple(np.ndarray[int], int)]: the resting places and the step
+            back from them for the direction of the tilt, from find_stops.
+
+    Returns np.ndarray[int]
+    """
+    stop_table, step_back = stops
+    rock_stops = np.sort(stop_table[rocks])
+    pile_depth = np.arange(len(rock_stops)) - np.searchsorted(rock_stops, rock_stops)
+    return np.sort(rock_stops + pile_depth * step_back)
+
+
+def north_load_of_rocks(rocks, matrix):
+    """
+    Calculates the load on the north support like calculate_north_load, from
+    the flat indices of the round rocks.
+
+    Input:
+        rocks [np.ndarray[int]]: the flat indices of the round rocks.
+        matrix [Grid]: the field of square and round rocks.
+
+    Returns int
+    """
+    return int(np.sum(matrix.height - rocks // matrix.width))
+
+
+@phase("solve")
+def tilt_north_load_indexed(matrix):
+    """
+    Calculates the load on the north support after a tilt north like
+    tilt_north_load, by moving the flat indices of the round rocks to their
+    precomputed resting places.
+
+    Input:
+        matrix [Grid]: the field of square and round rocks.
+
+    Returns int
+    """
+    rocks = np.flatnonzero(matrix.cells == ord("O"))
+    return north_load_of_rocks(tilt_rocks(rocks, find_stops(matrix)[NORTH]), matrix)
+
+
+@phase("solve")
+def spin_cycle_load_indexed(matrix, cycles = 1000000000):
+    """
+    Calculates the load on the north support after the spin cycles like
+    spin_cycle_load, by tilting the flat indices of the round rocks to their
+    precomputed resting places and finding the loop with a dict of the
+    arrangements seen.
+
+    Input:
+        matrix [Grid]: the field of square and round rocks.
+        cycles [int = 1000000000]: the number of spin cycles to run.
+
+    Returns int
+    """
+    stops = find_stops(matrix)
+    directions = [NORTH, WEST, SOUTH, EAST]
+    rocks = np.flatnonzero(matrix.cells == ord("O"))
+
+    # Each arrangement of rocks is keyed by its bytes to find the first repeat.
+    find_loop = []
+    seen = {}
+    while rocks.tobytes() not in seen:
+        seen[rocks.tobytes()] = len(find_loop)
+        find_loop.append(rocks)
+        for direction in directions:
+            rocks = tilt_rocks(rocks, stops[direction])
+    loop_start = seen[rocks.tobytes()]
+    loop_length = len(find_loop) - loop_start
+    index = (cycles - loop_start) % loop_length + loop_start
+
+    return north_load_of_rocks(find_loop[index], matrix)
+
+
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a grid of rocks.
+
+    Input:
+        text [str]: the contents of the input file.
+
+    Returns Grid
+    """
+    return Grid.from_text(text)
+
+
+def solve_part_1(text):
+    """
+    Returns the Star 27 answer for the contents of a Day 14 input file.
+    """
+    return tilt_north_load(parse_input(text))
+
+
+def solve_part_2(text):
+    """
+    Returns the Star 28 answer for the contents of a Day 14 input file.
+    """
+    return spin_cycle_load(parse_input(text))
+
+
+def solve_part_1_indexed(text):
+    """
+    Returns the Star 27 answer for the contents of a Day 14 input file, using
+    the precomputed resting places of the rocks.
+    """
+    return tilt_north_load_indexed(parse_input(text))
+
+
+def solve_part_2_indexed(text):
+    """
+    Returns the Star 28 answer for the contents of a Day 14 input file, using
+    the precomputed resting places of the rocks.
+    """
+    return spin_cycle_load_indexed(parse_input(text))
+
+
+def rock_washing_machine(filename):
+    """
+    A function to take in a map of a movable platform of round and square rocks
+    (See Day 14 of the Advent of Code 2023) and prints the load on the north
+    support after tilting it to the north once, and the load after tilting it
+    in a cycle of north, west, south, and east 1,000,000,000 times.
+
+    Input:
+        filename [str]: the filename of the input map represented as a matrix.
+    """
+    with open(filename, encoding = "utf-8") as f:
+        matrix = parse_input(f.read())
 
-    print(f"The answer to Star 28 is {answer}.")
+    print(f"The answer to Star 27 is {tilt_north_load(matrix)}")
+    print(f"The answer to Star 28 is {spin_cycle_load(matrix)}.")
 
 
-rock_washing_machine(sys.argv[1])
+if __name__ == "__main__":
+    rock_washing_machine(sys.argv[1])
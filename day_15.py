@@ -4,6 +4,8 @@ which are the 29th and 30th stars overall.
 """
 import sys
 
+from instrument import phase
+
 def hash_algorithm(line):
     """
     Calculates the HASH value of an input string.
@@ -19,29 +21,33 @@ def hash_algorithm(line):
     return current_value
 
 
-def initialize_lenses(filename):
+@phase("solve")
+def sum_hashes(sequence):
     """
-    Takes in a list of instructions for initializing the lenses of the lava
-    production facility (see Day 15 of the Advent of Code 2023). It prints the
-    sum of the HASH values of the initialization instructions, and then
-    simulates the initialization sequence to find the intensity of the outputted
-    light.
+    Sums the HASH values of the initialization instructions.
 
     Input:
-        filename [str]: the filename of the input.
-    """
-    with open(filename, encoding = "utf-8") as f:
-        sequence = f.read().split(",")
+        sequence [lst[str]]: the initialization instructions.
 
-    # Part 1
-    # Sums HASH of instructions
-    star_1_answer = 0
+    Returns int
+    """
+    answer = 0
     for code in sequence:
-        star_1_answer += hash_algorithm(code)
-    print(f"The answer to Star 29 is {star_1_answer}")
+        answer += hash_algorithm(code)
+    return answer
+
 
-    # Part 2
-    # Simulates initiation
+@phase("solve")
+def focus_lenses(sequence):
+    """
+    Simulates the initialization sequence of the lenses and calculates the
+    focusing power of the resulting lens configuration.
+
+    Input:
+        sequence [lst[str]]: the initialization instructions.
+
+    Returns int
+    """
     box_dict = {box: [] for box in range(256)}
     for code in sequence:
         index = 0
@@ -66,13 +72,59 @@ def initialize_lenses(filename):
             new_lens = int(code[index + 1])
             box_dict[box] = box_dict[box] + [[label, new_lens]]
 
-    # Calculates and prints light intensity
-    star_2_answer = 0
+    # Calculates light intensity
+    answer = 0
     for box, lens_list in box_dict.items():
         for index, lens_w_label in enumerate(lens_list):
             _, lens_power = lens_w_label
-            star_2_answer += (box + 1) * (index + 1) * lens_power
-    print(f"The answer to Star 30 is {star_2_answer}")
+            answer += (box + 1) * (index + 1) * lens_power
+    return answer
+
+
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a list of initialization instructions.
+
+    Input:
+        text [str]: the contents of the input file.
+
+    Returns lst[str]
+    """
+    return text.strip().split(",")
+
+
+def solve_part_1(text):
+    """
+    Returns the Star 29 answer for the contents of a Day 15 input file.
+    """
+    return sum_hashes(parse_input(text))
+
+
+def solve_part_2(text):
+    """
+    Returns the Star 30 answer for the contents of a Day 15 input file.
+    """
+    return focus_lenses(parse_input(text))
+
+
+def initialize_lenses(filename):
+    """
+    Takes in a list of instructions for initializing the lenses of the lava
+    production facility (see Day 15 of the Advent of Code 2023). It prints the
+    sum of the HASH values of the initialization instructions, and then
+    simulates the initialization sequence to find the intensity of the outputted
+    light.
+
+    Input:
+        filename [str]: the filename of the input.
+    """
+    with open(filename, encoding = "utf-8") as f:
+        sequence = parse_input(f.read())
+
+    print(f"The answer to Star 29 is {sum_hashes(sequence)}")
+    print(f"The answer to Star 30 is {focus_lenses(sequence)}")
 
 
-initialize_lenses(sys.argv[1])
+if __name__ == "__main__":
+    initialize_lenses(sys.argv[1])
@@ -4,53 +4,119 @@ which are the 31st and 32nd stars overall.
 """
 import sys
 
-def energize_mirror(start_space, start_direct, mirror_dict):
+from grid import EAST, NORTH, OUTSIDE, SOUTH, WEST, Grid
+from instrument import phase
+
+# For each tile and each direction a beam can enter it heading in, the
+# directions the beam leaves it heading in. "/" swaps north with east and south
+# with west, while "\\" swaps north with west and south with east.
+BOUNCES = {ord("."): ((NORTH,), (EAST,), (SOUTH,), (WEST,)),
+           ord("/"): ((EAST,), (NORTH,), (WEST,), (SOUTH,)),
+           ord("\\"): ((WEST,), (SOUTH,), (EAST,), (NORTH,)),
+           ord("|"): ((NORTH,), (NORTH, SOUTH), (SOUTH,), (NORTH, SOUTH)),
+           ord("-"): ((EAST, WEST), (EAST,), (EAST, WEST), (WEST,))}
+
+
+def energize_mirror(start_space, start_direct, tiles, neighbours):
     """
     Given a starting position, direction, and a field of mirrors, the function
-    traces the path a light beam travels through the mirror, returning the set
-    of tiles that it visits.
+    traces the path a light beam travels through the mirror, returning the
+    number of tiles that it visits.
 
-    Each position and direction is represented as a complex number. The real
-    part is the row, while the imaginary part is the column.
+    Each position is the flat index of a tile, and each direction is one of the
+    grid directions. A beam state packs the two as position * 4 + direction.
+    The field is passed as memoryviews of the grid's arrays, which are much
+    faster to index one element at a time than the arrays themselves.
 
     Inputs:
-        start_space [Complex]: the starting position of the light beam.
-        start_direct [Complex]: the starting direction of the light beam.
-        mirror_dict [dict{Complex: str}]: the field of mirror the light travels
-            through, represented as a dictionary.
+        start_space [int]: the starting position of the light beam.
+        start_direct [int]: the starting direction of the light beam.
+        tiles [memoryview]: the cells of the field of mirrors the light travels
+            through.
+        neighbours [memoryview]: the flattened neighbour table of the field.
 
-    Returns set(Complex)
+    Returns int
     """
-    visited_w_direct = set()
-    visited = set()
-    stack = {(start_space - start_direct, start_direct)}
+    visited_w_direct = bytearray(4 * len(tiles))
+    visited = bytearray(len(tiles))
+    stack = [(start_space, start_direct)]
 
     # A depth first search of the mirror field by treating it as a graph.
     while stack:
         space, direction = stack.pop()
-        space += direction
-        if (space, direction) in visited_w_direct:
+        if visited_w_direct[4 * space + direction]:
             continue
-        match mirror_dict.get(space):
-            case "/": stack.add((space, -complex(direction.imag, direction.real)))
-            case "\\": stack.add((space, complex(direction.imag, direction.real)))
-            case "|":
-                if direction == 1j or direction == -1j:
-                    stack.add((space, 1))
-                    stack.add((space, -1))
-                else: stack.add((space, direction))
-            case "-":
-                if direction == 1 or direction == -1:
-                    stack.add((space, 1j))
-                    stack.add((space, -1j))
-                else: stack.add((space, direction))
-            case ".": stack.add((space, direction))
-            case None: continue
-        # We do this last so that we have a chance to check for an invalid
-        # position with the switch statement.
-        visited.add(space)
-        visited_w_direct.add((space, direction))
-    return visited
+        visited_w_direct[4 * space + direction] = 1
+        visited[space] = 1
+        for new_direction in BOUNCES[tiles[space]][direction]:
+            next_space = neighbours[4 * space + new_direction]
+            if next_space != OUTSIDE:
+                stack.append((next_space, new_direction))
+    return visited.count(1)
+
+
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a grid of the mirror field.
+
+    Input:
+        text [str]: the contents of the input file.
+
+    Returns Grid
+    """
+    return Grid.from_text(text)
+
+
+@phase("solve")
+def energize_from_corner(mirror_field):
+    """
+    Counts the tiles energized by a beam entering the top-left corner heading
+    right.
+
+    Inputs:
+        mirror_field [Grid]: the field of mirrors.
+
+    Returns int
+    """
+    return energize_mirror(0, EAST, *mirror_field.views())
+
+
+@phase("solve")
+def find_max_energy(mirror_field):
+    """
+    Counts the tiles energized by a beam entering from every edge tile of the
+    field and returns the maximum.
+
+    Inputs:
+        mirror_field [Grid]: the field of mirrors.
+
+    Returns int
+    """
+    height, width = mirror_field.height, mirror_field.width
+    field = mirror_field.views()
+    max_energy = []
+    for index in range(width):
+        max_energy.append(energize_mirror(mirror_field.index(0, index), SOUTH, *field))
+        max_energy.append(energize_mirror(mirror_field.index(height - 1, index), NORTH, *field))
+    for index in range(height):
+        max_energy.append(energize_mirror(mirror_field.index(index, 0), EAST, *field))
+        max_energy.append(energize_mirror(mirror_field.index(index, width - 1), WEST, *field))
+    return max(max_energy)
+
+
+def solve_part_1(text):
+    """
+    Returns the Star 31 answer for the contents of a Day 16 input file.
+    """
+    return energize_from_corner(parse_input(text))
+
+
+def solve_part_2(text):
+    """
+    Returns the Star 32 answer for the contents of a Day 16 input file.
+    """
+    return find_max_energy(parse_input(text))
 
 
 def count_energized_tiles(filename):
@@ -63,26 +129,11 @@ def count_energized_tiles(filename):
 
     """
     with open(filename, encoding = "utf-8") as f:
-        text = f.read().split()
-    width = len(text[0])
-    height = len(text)
-    mirror_dict = {row + col * 1j: space
-                   for row, line in enumerate(text)
-                   for col, space in enumerate(line)}
-
-    # Part 1
-    energy = len(energize_mirror(0, 1j, mirror_dict))
-    print(f"The answer to Star 31 is {energy}.")
-
-    # Part 2
-    max_energy = []
-    for index in range(width):
-        max_energy.append(len(energize_mirror(index * 1j, 1, mirror_dict)))
-        max_energy.append(len(energize_mirror(index * 1j + height - 1, -1, mirror_dict)))
-    for index in range(height):
-        max_energy.append(len(energize_mirror(index, 1j, mirror_dict)))
-        max_energy.append(len(energize_mirror(index + width * 1j - 1j, -1j, mirror_dict)))
-    print(f"The answer to Star 32 is {max(max_energy)}.")
+        mirror_field = parse_input(f.read())
+
+    print(f"The answer to Star 31 is {energize_from_corner(mirror_field)}.")
+    print(f"The answer to Star 32 is {find_max_energy(mirror_field)}.")
 
 
-count_energized_tiles(sys.argv[1])
+if __name__ == "__main__":
+    count_energized_tiles(sys.argv[1])
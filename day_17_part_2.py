@@ -5,33 +5,15 @@ the 34th star overall.
 from heapq import heappop, heappush
 import sys
 
-class Node:
-    """
-    An encapsulation of a tuple for storing the position and last direction of a
-    node without the non-sortable nature of complex numbers interfering with
-    the heapq functions.
-    """
-    def __init__(self, position, direction):
-        self.pos = position
-        self.direct = direction
-
-    def __lt__(self, other):
-        return False
-
-    def __eq__(self, other):
-        return (self.pos, self.direct) == (other.pos, other.direct)
+import day_17_part_1
+from grid import EAST, OUTSIDE, SOUTH, Grid
+from instrument import phase
 
-    def __hash__(self):
-        return hash((self.pos, self.direct))
 
-    def __str__(self):
-        return str((self.pos, self.direct))
-
-
-def find_neighbors(node, height, width, cost_dict):
+def find_neighbors(node, costs, neighbours):
     """
-    Given an input node, the bounds of a matrix, and the cost for each position,
-    the function outputs a list of all valid movements from the node.
+    Given an input node, the cost for each position, and the neighbour table of
+    the city, the function outputs a list of all valid movements from the node.
 
     The node has a position and a last moved direction. The new valid movements
     it can make are at right angles to the last direction and of lengths 4 to
@@ -41,43 +23,58 @@ def find_neighbors(node, height, width, cost_dict):
     found valid movements are treated as "neighbors" to the input node.
 
     Inputs:
-        node [Node]: a node we need to find the "neighbors" to.
-        height [int]: the height of the input matrix.
-        width [int]: the width of the input matrix
-        cost_dict [dict{Complex: int}]: a dictionary storing the cost of
-            moving into a given position.
+        node [int]: a node we need to find the "neighbors" to, packed as
+            position * 4 + direction.
+        costs [memoryview]: the cost of moving into each position.
+        neighbours [memoryview]: the flattened neighbour table of the city.
 
-    Returns lst[Node]
+    Returns lst[tuple(int, int)]
     """
     neighbors = []
-    if node.pos == 0j:
+    position, direction = divmod(node, 4)
+    if position == 0:
         # For the start of the path, we can move either left or down.
-        directions = (1j, 1)
+        directions = (EAST, SOUTH)
     else:
         # For all other nodes, we need to turn left or right with respect to the
         # last moved direction.
-        directions = (node.direct * 1j, node.direct * -1j)
+        directions = ((direction + 1) % 4, (direction + 3) % 4)
 
     # We consider both directions, finding the costs and position of a movement
     # of length 4 to 10, breaking once the movement becomes invalid to move to
-    # the next direction/output.
+    # the next direction/output. The first three blocks only add to the cost.
     for new_direct in directions:
-        move_cost = cost_dict.get(node.pos + new_direct, 0) + \
-                      cost_dict.get(node.pos + new_direct * 2, 0) + \
-                      cost_dict.get(node.pos + new_direct * 3, 0)
-        new_pos = node.pos + new_direct * 3
-        for _ in range(4, 11):
-            new_pos += new_direct
-            if 0 <= new_pos.real < height and 0 <= new_pos.imag < width:
-                move_cost += cost_dict[new_pos]
-                neighbors.append((Node(new_pos, new_direct), move_cost))
-            else:
+        move_cost = 0
+        new_pos = position
+        for length in range(1, 11):
+            new_pos = neighbours[4 * new_pos + new_direct]
+            if new_pos == OUTSIDE:
                 break
+            move_cost += costs[new_pos]
+            if length >= 4:
+                neighbors.append((4 * new_pos + new_direct, move_cost))
 
     return neighbors
 
 
-def must_straight_dijkstra(filename):
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the input file into a grid of the cost of moving into each position
+    of the city.
+
+    Input:
+        text [str]: the contents of the input file.
+
+    Returns Grid
+    """
+    city = Grid.from_text(text)
+    city.cells -= ord("0")
+    return city
+
+
+@phase("solve")
+def must_straight_dijkstra(city):
     """
     Finds the heat loss to a minimal cost path through the lava island city
     blocks with the stipulation that the carts of lava cannot reverse and cannot
@@ -92,39 +89,61 @@ def must_straight_dijkstra(filename):
     See the find_neighbors doc string for a more in-depth description of how the
     limitations of the problem are treated.
 
-    Input:
-        filename [str]: the filename of the input.
+    Each node is packed into a single int as position * 4 + direction, so that
+    nodes can be pushed onto the heap and marked in a flat array directly.
+
+    Inputs:
+        city [Grid]: the cost of moving into each position of the city.
 
     Returns int
     """
-    with open(filename, encoding = "utf-8") as f:
-        text = f.read().split()
-        height = len(text)
-        width = len(text[0])
-        cost_dict = {row + col * 1j: int(cost)
-                    for row, line in enumerate(text)
-                    for col, cost in enumerate(line)}
-
-    queue = [(0, Node(0j, 1j))]
-    seen = set()
-    min_distance = {Node(0j, 1j): 0}
+    costs, neighbours = city.views()
+    exit_position = len(city) - 1
+
+    # The top-left corner (position 0), as if it had been entered heading east.
+    start_node = EAST
+    queue = [(0, start_node)]
+    seen = bytearray(4 * len(city))
+    min_distance = {start_node: 0}
     while queue:
         cost, node = heappop(queue)
-        if node not in seen:
-            seen.add(node)
-            if node.pos == complex(height - 1, width - 1):
+        if not seen[node]:
+            seen[node] = 1
+            if node // 4 == exit_position:
                 break
-            neighbors = find_neighbors(node, height, width, cost_dict)
+            neighbors = find_neighbors(node, costs, neighbours)
             for neighbor, move_cost in neighbors:
-                if neighbor not in seen:
+                if not seen[neighbor]:
                     new_cost = move_cost + cost
                     prev_cost = min_distance.get(neighbor)
                     if prev_cost is None or new_cost < prev_cost:
                         min_distance[neighbor] = new_cost
                         heappush(queue, (new_cost, neighbor))
 
-    print(cost)
+    return cost
+
+
+def solve(text):
+    """
+    Returns the Star 34 answer for the contents of a Day 17 input file.
+    """
+    return must_straight_dijkstra(parse_input(text))
+
+
+def solve_both(text):
+    """
+    Returns the Star 33 and Star 34 answers for the contents of a Day 17 input
+    file, parsing it only once. Both searches also share the neighbour table of
+    the city, which is built on first use.
+    """
+    city = parse_input(text)
+    return day_17_part_1.limited_straight_dijkstra(city), must_straight_dijkstra(city)
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
 
 
 if __name__ == "__main__":
-    must_straight_dijkstra(sys.argv[1])
\ No newline at end of file
+    main(sys.argv[1])
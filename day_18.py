@@ -4,10 +4,13 @@ stars overall.
 """
 import sys
 
+from instrument import phase
+
 # A dictionary to translate direction commands into their complex counterparts.
 DIRECTIONS = {"R": 1j, "D": 1, "L": -1j, "U": -1,
               "0": 1j, "1": 1, "2": -1j, "3": -1}
 
+@phase("solve")
 def find_lagoon_area(dig_instructions):
     """
     Calculates the area of the lagoon by following the dig instructions to find
@@ -53,21 +56,51 @@ def find_lagoon_area(dig_instructions):
     return answer
 
 
+@phase("parse")
+def parse_input(text):
+    """
+    Parses the inputs for Day 18 of the Advent of Code 2023, splitting them into
+    inputs for the first star solution and the second star solution.
+
+    Input:
+        text [str]: the contents of the input file.
+
+    Returns lst[tuple(str, int)], lst[tuple(str, int)]
+    """
+    dig_instructions = [line.split() for line in text.strip().split("\n")]
+    star_1_instructions = [(direct, int(dig_len))
+                        for direct, dig_len, _ in dig_instructions]
+    star_2_instructions = [(code[-2], int(code[2: -2], 16))
+                        for _, _, code in dig_instructions]
+    return star_1_instructions, star_2_instructions
+
+
+def solve_part_1(text):
+    """
+    Returns the Star 35 answer for the contents of a Day 18 input file.
+    """
+    star_1_instructions, _ = parse_input(text)
+    return find_lagoon_area(star_1_instructions)
+
+
+def solve_part_2(text):
+    """
+    Returns the Star 36 answer for the contents of a Day 18 input file.
+    """
+    _, star_2_instructions = parse_input(text)
+    return find_lagoon_area(star_2_instructions)
+
+
 def solve_day_18(filename):
     """
-    Parses the inputs for Day 17 of the Advent of Code 2023, splitting them into
-    inputs for the first star solution and the second star solution. It then
-    prints the results of passing these inputs to the lagoon lake area solver.
+    Parses the inputs for Day 18 of the Advent of Code 2023 and prints the
+    results of passing them to the lagoon lake area solver.
 
     Input:
         filename [str]: the filename of the input.
     """
     with open(filename, encoding = "utf-8") as f:
-        dig_instructions = [line.split() for line in f.read().split("\n")]
-        star_1_instructions = [(direct, int(dig_len))
-                            for direct, dig_len, _ in dig_instructions]
-        star_2_instructions = [(code[-2], int(code[2: -2], 16))
-                            for _, _, code in dig_instructions]
+        star_1_instructions, star_2_instructions = parse_input(f.read())
     print(f"The answer to Star 35 is {find_lagoon_area(star_1_instructions)}.")
     print(f"The answer to Star 36 is {find_lagoon_area(star_2_instructions)}.")
 
@@ -4,6 +4,9 @@ the 37th star overall.
 """
 import sys
 
+from instrument import phase
+from loader import as_buffer, iter_sections, map_input
+
 def parse_rules(rule_str):
     """
     Takes in the string of a rule for a workflow and parses it into the type of
@@ -26,55 +29,60 @@ def parse_rules(rule_str):
 
 def parse_workflows(raw_workflows):
     """
-    Takes in the strings for the workflows and splits it into a dictionary,
+    Takes in the lines for the workflows and splits them into a dictionary,
     where the key is the name of a workflow and the value is a list of parsed
     rules.
 
     Input:
-        raw_workflows [str]: the raw string data for the workflows.
+        raw_workflows [lst[bytes]]: the raw lines of the workflows.
 
     Returns dict{str: lst[tuple(str)]}
     """
     workflows = {}
-    raw_workflows = raw_workflows.split()
     for line in raw_workflows:
-        line = line.split("{")
-        workflow, rule_strs = line[0], line[1][:-1].split(",")
-        operations = [parse_rules(rule_str) for rule_str in rule_strs]
+        workflow, rule_strs = line[:-1].decode("ascii").split("{")
+        operations = [parse_rules(rule_str) for rule_str in rule_strs.split(",")]
         workflows[workflow] = operations
     return workflows
 
 
 def parse_items(raw_items):
     """
-    Takes in the raw data for items and their quality scores and converts them
+    Takes in the raw lines for items and their quality scores and converts them
     into a list of dictionaries, where the key is the quality name and the
     value is the score.
 
+    Input:
+        raw_items [lst[bytes]]: the raw lines of the items.
+
     Returns lst[dict{str: str}]
     """
     items = []
-    raw_items = raw_items.split()
     for line in raw_items:
-        line = line[1: -1].split(",")
-        item = {quality.split("=")[0]: quality.split("=")[1] for quality in line}
+        line = line[1: -1].decode("ascii").split(",")
+        item = dict(quality.split("=") for quality in line)
         items.append(item)
     return items
 
 
-def parse_input(filename):
+@phase("parse")
+def parse_input(text):
     """
     Parses the raw input text file and spits out processed equivalents.
 
+    Input:
+        text [str]: the contents of the input file, or a buffer from
+            map_input.
+
     Returns dict{str: lst[tuple(str)]}, lst[dict{str: str}]
     """
-    with open(filename, encoding = "utf-8") as f:
-        raw_workflows, raw_items = f.read().split("\n\n")
-        workflows = parse_workflows(raw_workflows)
-        items = parse_items(raw_items)
+    raw_workflows, raw_items = iter_sections(as_buffer(text))
+    workflows = parse_workflows(raw_workflows)
+    items = parse_items(raw_items)
     return workflows, items
 
 
+@phase("solve")
 def follow_workflows(workflows, items):
     """
     Takes in a list of items for processing and a series of Elf workflows (see
@@ -116,6 +124,13 @@ def follow_workflows(workflows, items):
     return answer
 
 
+def solve(text):
+    """
+    Returns the Star 37 answer for the contents of a Day 19 input file.
+    """
+    return follow_workflows(*parse_input(text))
+
+
 def main(filename):
     """
     Links the output of parse_input to the input of follow_workflows, and then
@@ -124,7 +139,8 @@ def main(filename):
     Input:
         filename [str]: the filename of the input text.
     """
-    workflows, items = parse_input(filename)
+    with map_input(filename) as data:
+        workflows, items = parse_input(data)
     star_1 = follow_workflows(workflows, items)
 
     print(f"The answer to Star 37 is {star_1}.")
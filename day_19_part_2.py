@@ -4,6 +4,10 @@ the 38th star overall.
 """
 import sys
 
+import day_19_part_1
+from instrument import phase
+from loader import as_buffer, iter_sections, map_input
+
 def parse_operator(op_str):
     """
     Takes in the string of a rule for a workflow and parses it into the type of
@@ -26,29 +30,43 @@ def parse_operator(op_str):
     return "compare", quality, comparison, new_bound, destination
 
 
-def parse_input(filename):
+def parse_workflows(raw_workflows):
     """
-    Takes in the test for the workflows and items, discards the items, and
-    splits the text for the workflows into a dictionary, where the key is the
-    name of a workflow and the value is a list of parsed rules.
+    Takes in the lines for the workflows and splits them into a dictionary,
+    where the key is the name of a workflow and the value is a list of parsed
+    rules.
 
     Input:
-        raw_workflows [str]: the raw string data for the workflows.
+        raw_workflows [lst[bytes]]: the raw lines of the workflows.
 
     Returns dict{str: lst[tuple(str)]}
     """
-    with open(filename, encoding = "utf-8") as f:
-        raw_workflows, _ = f.read().split("\n\n")
     workflows = {}
-    raw_workflows = raw_workflows.split()
     for line in raw_workflows:
-        line = line.split("{")
-        workflow, op_strs = line[0], line[1][:-1].split(",")
-        operations = [parse_operator(op_str) for op_str in op_strs]
+        workflow, op_strs = line[:-1].decode("ascii").split("{")
+        operations = [parse_operator(op_str) for op_str in op_strs.split(",")]
         workflows[workflow] = operations
     return workflows
 
 
+@phase("parse")
+def parse_input(text):
+    """
+    Takes in the test for the workflows and items, discards the items, and
+    splits the text for the workflows into a dictionary, where the key is the
+    name of a workflow and the value is a list of parsed rules.
+
+    Input:
+        text [str]: the contents of the input file, or a buffer from
+            map_input.
+
+    Returns dict{str: lst[tuple(str)]}
+    """
+    # Only the first section is needed, so the items are never read at all.
+    return parse_workflows(next(iter_sections(as_buffer(text))))
+
+
+@phase("solve")
 def graph_workflows(workflows):
     """
     Takes in a dictionary of Elf workflows (see Day 19 of the Advent of Code
@@ -140,6 +158,72 @@ def graph_workflows(workflows):
     return answer
 
 
+def solve(text):
+    """
+    Returns the Star 38 answer for the contents of a Day 19 input file.
+    """
+    return graph_workflows(parse_input(text))
+
+
+@phase("parse")
+def parse_both(text):
+    """
+    Parses the workflows, in the form used by graph_workflows, and the items of
+    the input file.
+
+    Input:
+        text [str]: the contents of the input file, or a buffer from
+            map_input.
+
+    Returns dict{str: lst[tuple(str)]}, lst[dict{str: str}]
+    """
+    raw_workflows, raw_items = iter_sections(as_buffer(text))
+    return parse_workflows(raw_workflows), day_19_part_1.parse_items(raw_items)
+
+
+@phase("solve")
+def sort_items(workflows, items):
+    """
+    Takes in a list of items and the parsed Elf workflows (see Day 19 of the
+    Advent of Code 2023) and sums up the values for the qualities of all of
+    the accepted items, like follow_workflows of Star 37 but comparing against
+    the parsed bounds of the rules.
+
+    Input:
+        workflows dict{str: lst[tuple(str)]}: the workflows, as parsed by
+            parse_workflows.
+        items lst[dict{str: str}]: the items to be processed according to the
+            workflows.
+
+    Returns int
+    """
+    answer = 0
+    for item in items:
+        directory = "in"
+        while directory not in ("A", "R"):
+            for operation, *rest in workflows[directory]:
+                if operation == "go to":
+                    directory = rest[0]
+                    break
+                quality, comparison, new_bound, destination = rest
+                value = int(item[quality])
+                if value < new_bound if comparison == "<" else value > new_bound:
+                    directory = destination
+                    break
+        if directory == "A":
+            answer += sum(int(value) for value in item.values())
+    return answer
+
+
+def solve_both(text):
+    """
+    Returns the Star 37 and Star 38 answers for the contents of a Day 19 input
+    file, parsing it only once.
+    """
+    workflows, items = parse_both(text)
+    return sort_items(workflows, items), graph_workflows(workflows)
+
+
 def main(filename):
     """
     Links the output of parse_input to the input of follow_workflows, and then
@@ -148,7 +232,8 @@ def main(filename):
     Input:
         filename [str]: the filename of the input text.
     """
-    workflows = parse_input(filename)
+    with map_input(filename) as data:
+        workflows = parse_input(data)
     star_2 = graph_workflows(workflows)
 
     print(f"The answer to Star 38 is {star_2}.")
@@ -5,9 +5,11 @@ the 39th star overall.
 from copy import deepcopy
 import sys
 
-def parse_inputs(filename):
-    with open(filename, encoding = "utf-8") as f:
-        text = f.read().strip().split("\n")
+from instrument import phase
+
+@phase("parse")
+def parse_inputs(text):
+    text = text.strip().split("\n")
     create_modules = [(line.split()[0][0], line.split()[0][1:])
                       for line in text
                       if line.split()[0][0] != "b"]
@@ -18,9 +20,8 @@ def parse_inputs(filename):
     return create_modules, inputs_and_outputs
 
 
-def elf_computer(filename):
-    create_modules, inputs_and_outputs = parse_inputs(filename)
-
+@phase("solve")
+def elf_computer(create_modules, inputs_and_outputs):
     class Module:
         def __init__(self, module_name):
             self.inputs = {}
@@ -128,5 +129,17 @@ def elf_computer(filename):
     return sum(total_high) * sum(total_low)
 
 
+def solve(text):
+    """
+    Returns the Star 39 answer for the contents of a Day 20 input file.
+    """
+    return elf_computer(*parse_inputs(text))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
 if __name__ == "__main__":
-    print(elf_computer(sys.argv[1]))
+    main(sys.argv[1])
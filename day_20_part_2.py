@@ -5,9 +5,12 @@ the 40th star overall.
 from math import lcm
 import sys
 
-def parse_inputs(filename):
-    with open(filename, encoding = "utf-8") as f:
-        text = f.read().strip().split("\n")
+import day_20_part_1
+from instrument import phase
+
+@phase("parse")
+def parse_inputs(text):
+    text = text.strip().split("\n")
     create_modules = [(line.split()[0][0], line.split()[0][1:])
                       for line in text
                       if line.split()[0][0] != "b"]
@@ -18,9 +21,8 @@ def parse_inputs(filename):
     return create_modules, inputs_and_outputs
 
 
-def elf_computer(filename):
-    create_modules, inputs_and_outputs = parse_inputs(filename)
-
+@phase("solve")
+def elf_computer(create_modules, inputs_and_outputs):
     class Module:
         def __init__(self, module_name):
             self.inputs = {}
@@ -117,5 +119,27 @@ def elf_computer(filename):
             return answer
 
 
+def solve(text):
+    """
+    Returns the Star 40 answer for the contents of a Day 20 input file.
+    """
+    return elf_computer(*parse_inputs(text))
+
+
+def solve_both(text):
+    """
+    Returns the Star 39 and Star 40 answers for the contents of a Day 20 input
+    file, parsing it only once.
+    """
+    create_modules, inputs_and_outputs = parse_inputs(text)
+    return (day_20_part_1.elf_computer(create_modules, inputs_and_outputs),
+            elf_computer(create_modules, inputs_and_outputs))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
 if __name__ == "__main__":
-    print(elf_computer(sys.argv[1]))
\ No newline at end of file
+    main(sys.argv[1])
\ No newline at end of file
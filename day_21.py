@@ -3,83 +3,152 @@ Module to solve Day 21 of the Advent of Code 2023, which are the 41st and
 42nd stars overall.
 """
 import sys
-from functools import reduce
+
+import numpy as np
+
+from grid import OUTSIDE, Grid
+from instrument import phase
 
 NUM_STEPS: int = 26501365
-EMPTY = -1
-ROCK = -2
-START = -3
+UNREACHED = -1
+
+@phase("build")
+def count_maze(maze: Grid) -> np.ndarray:
+    """
+    Finds the fewest steps from the starting plot to every plot of the maze,
+    returning them as a flat int32 array with UNREACHED for rocks and plots that
+    cannot be reached.
+    """
+    cells, neighbours = maze.views()
+    rock = ord("#")
+    steps: list[int] = [UNREACHED] * len(maze)
+
+    start = maze.find("S")
+    steps[start] = 0
+    next_wave: list[int] = [start]
+
+    # Effectively a lazy breadth first search
+    while next_wave:
+        curr_wave = next_wave
+        next_wave = []
 
-def count_maze(maze: list[list[int]]) -> None:
-    height = len(maze)
-    width = len(maze[0])
+        for tile in curr_wave:
+            value = steps[tile]
+            for direction in range(4):
+                neighbour = neighbours[4 * tile + direction]
+                if neighbour == OUTSIDE or cells[neighbour] == rock:
+                    continue
+                if steps[neighbour] == UNREACHED:
+                    steps[neighbour] = value + 1
+                    next_wave.append(neighbour)
+
+    return np.array(steps, dtype=np.int32)
+
+
+@phase("build")
+def count_maze_waves(maze: Grid) -> np.ndarray:
+    """
+    Finds the fewest steps to every plot like count_maze, but steps a whole
+    wave of the breadth first search at a time with NumPy.
+    """
+    steps = np.full(len(maze), UNREACHED, dtype=np.int32)
+    is_plot = maze.cells != ord("#")
+
+    start = maze.find("S")
+    steps[start] = 0
+    next_wave = np.array([start])
+
+    step = 0
+    while len(next_wave):
+        step += 1
+        neighbors = maze.neighbours[next_wave].ravel()
+        neighbors = np.unique(neighbors[neighbors != OUTSIDE])
+        next_wave = neighbors[is_plot[neighbors] & (steps[neighbors] == UNREACHED)]
+        steps[next_wave] = step
+
+    return steps
+
+
+@phase("parse")
+def parse_input(text: str) -> Grid:
+    """
+    Parses the text of a garden map into a grid of rocks, empty plots, and the
+    starting plot.
+
+    Input:
+        text: the contents of the input file
+    """
+    return Grid.from_text(text)
+
+
+@phase("solve")
+def count_near_plots(steps: np.ndarray) -> int:
+    """
+    Counts the plots reachable in exactly 64 steps, given the fewest steps to
+    each plot found by count_maze.
+    """
+    return int(np.count_nonzero((steps % 2 == 0) & (0 <= steps) & (steps <= 64)))
+
+
+@phase("solve")
+def count_infinite_plots(steps: np.ndarray) -> int:
+    """
+    Counts the plots reachable in exactly NUM_STEPS steps of an infinitely
+    tiled maze, given the fewest steps to each plot found by count_maze.
+    """
+    loops = (NUM_STEPS - 65) // 131
 
-    curr_wave: list[tuple[int, int]]
-    next_wave: list[tuple[int, int]]
+    is_odd = (steps % 2 == 1) & (0 <= steps)
+    is_even = (steps % 2 == 0) & (0 <= steps)
+    is_corner = 66 <= steps
+    full_odd = int(np.count_nonzero(is_odd))
+    full_even = int(np.count_nonzero(is_even))
+    corner_odd = int(np.count_nonzero(is_odd & is_corner))
+    corner_even = int(np.count_nonzero(is_even & is_corner))
+    return (full_odd * (loops + 1) * (loops + 1)
+            + full_even * loops * loops
+            - corner_odd * (loops + 1)
+            + corner_even * loops)
 
-    for row, line in enumerate(maze):
-        for col, value in enumerate(line):
-            if value == START:
-                maze[row][col] = 0
-                next_wave = [(row, col)]
-                break
-        else:
-            continue
-        break
-    else:
-        raise Exception
 
-    def find_next_step(r: int, c: int) -> list[tuple[int, int]]:
-        directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
+def solve_part_1(text: str) -> int:
+    """
+    Returns the Star 41 answer for the contents of a Day 21 input file.
+    """
+    return count_near_plots(count_maze(parse_input(text)))
 
-        valid_neighbors = []
 
-        for d_r, d_c in directions:
-            n_r, n_c = r + d_r, c + d_c
-            if (0 <= n_r < height) and (0 <= n_c < width) and maze[n_r][n_c] == EMPTY:
-                valid_neighbors.append((n_r, n_c))
+def solve_part_2(text: str) -> int:
+    """
+    Returns the Star 42 answer for the contents of a Day 21 input file.
+    """
+    return count_infinite_plots(count_maze(parse_input(text)))
 
-        return valid_neighbors
 
-    # Effectively a lazy breadth first search
-    while next_wave:
-        curr_wave = next_wave
-        next_wave = []
+def solve_part_1_waves(text: str) -> int:
+    """
+    Returns the Star 41 answer for the contents of a Day 21 input file, running
+    the search a wave at a time.
+    """
+    return count_near_plots(count_maze_waves(parse_input(text)))
 
-        for row, col in curr_wave:
-            value = maze[row][col]
-            unvisited_neighbors = find_next_step(row, col)
 
-            for next_row, next_col in unvisited_neighbors:
-                maze[next_row][next_col] = value + 1
-                next_wave.append((next_row, next_col))
+def solve_part_2_waves(text: str) -> int:
+    """
+    Returns the Star 42 answer for the contents of a Day 21 input file, running
+    the search a wave at a time.
+    """
+    return count_infinite_plots(count_maze_waves(parse_input(text)))
 
 
 def main(file: str) -> None:
     with open(file, encoding="utf-8") as f:
-        maze: list[list[int]] = [[ROCK if cha == "#" else EMPTY if cha == "." else START for cha in line]
-                                 for line in f.read().strip().split("\n")]
-
-    count_maze(maze)
+        maze: Grid = parse_input(f.read())
 
-    loops = (NUM_STEPS - 65) // 131
+    steps = count_maze(maze)
 
-    flattened_maze: list[int] = [num for line in maze for num in line]
-
-    part_1 = reduce(lambda x, y: x + (y % 2 == 0 and 0 <= y <= 64), flattened_maze, 0)
-    print(f"Your Star 1 answer is {part_1}")
-
-    # There are technically faster ways to these comparisons by precise
-    # filtering, but I found this is fast enough and the most transparent.
-    full_odd = reduce(lambda x, y: x + (y % 2 == 1 and 0 <= y), flattened_maze, 0)
-    full_even = reduce(lambda x, y: x + (y % 2 == 0 and 0 <= y), flattened_maze, 0)
-    corner_odd = reduce(lambda x, y: x + (y % 2 == 1 and 66 <= y), flattened_maze, 0)
-    corner_even = reduce(lambda x, y: x + (y % 2 == 0 and 66 <= y), flattened_maze, 0)
-    part_2 = (full_odd * (loops + 1) * (loops + 1)
-              + full_even * loops * loops
-              - corner_odd * (loops + 1)
-              + corner_even * loops)
-    print(f"Your Star 2 answer is {part_2}")
+    print(f"Your Star 1 answer is {count_near_plots(steps)}")
+    print(f"Your Star 2 answer is {count_infinite_plots(steps)}")
 
 
 if __name__ == "__main__":
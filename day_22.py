@@ -5,6 +5,9 @@ Module to solve Day 22 of the Advent of Code 2023, which are the 43rd and
 import sys
 from heapq import heappop, heappush
 
+from instrument import phase
+from loader import as_buffer, iter_lines, map_input
+
 class Brick:
     def __init__(self, name, start, end):
         self.name = name
@@ -60,19 +63,21 @@ class Brick:
 
 
 def name_from_number(integer: int) -> str:
-    assert integer < 17576
-    first_cha = integer % 26 + 65
-    second_cha = (integer // 26) % 26 + 65
-    third_cha = integer // 676 + 65
-    return chr(third_cha) + chr(second_cha) + chr(first_cha)
-
-
-def create_bricks(filename: str):
-    with open(filename, encoding = "utf-8") as f:
-        raw_bricks = f.read().strip().split("\n")
-        raw_bricks = [(tuple(int(i) for i in line.split("~")[0].split(",")),
-                      tuple(int(j) for j in line.split("~")[1].split(",")))
-                      for line in raw_bricks]
+    # Names are the number in base 26, written with at least three letters, so
+    # that inputs of more than 26 ** 3 bricks still get unique names.
+    characters = []
+    while integer or len(characters) < 3:
+        characters.append(chr(integer % 26 + 65))
+        integer //= 26
+    return "".join(reversed(characters))
+
+
+@phase("parse")
+def create_bricks(text):
+    raw_bricks = [line.split(b"~") for line in iter_lines(as_buffer(text))]
+    raw_bricks = [(tuple(int(i) for i in start.split(b",")),
+                  tuple(int(j) for j in end.split(b",")))
+                  for start, end in raw_bricks]
     bricks = []
     for index, start_end in enumerate(raw_bricks):
         name = name_from_number(index)
@@ -119,6 +124,7 @@ def cascade_bricks(brick):
     return collapsed_bricks
 
 
+@phase("build")
 def play_tetris(bricks):
 
     tetris_playfield = {(x, y): [] for x in range(10) for y in range(10)}
@@ -133,9 +139,8 @@ def play_tetris(bricks):
     return bricks
 
 
-def main(file):
-    bricks = create_bricks(file)
-    bricks = play_tetris(bricks)
+@phase("solve")
+def cascade_all_bricks(bricks):
     part_1 = 0
     part_2 = 0
     for brick, _ in bricks:
@@ -143,6 +148,30 @@ def main(file):
         part_2 += brick_answer
         if brick_answer == 0:
             part_1 += 1
+    return part_1, part_2
+
+
+def solve_part_1(text):
+    """
+    Returns the Star 43 answer for the contents of a Day 22 input file.
+    """
+    part_1, _ = cascade_all_bricks(play_tetris(create_bricks(text)))
+    return part_1
+
+
+def solve_part_2(text):
+    """
+    Returns the Star 44 answer for the contents of a Day 22 input file.
+    """
+    _, part_2 = cascade_all_bricks(play_tetris(create_bricks(text)))
+    return part_2
+
+
+def main(file):
+    with map_input(file) as data:
+        bricks = create_bricks(data)
+    bricks = play_tetris(bricks)
+    part_1, part_2 = cascade_all_bricks(bricks)
     print(f"The answer to part 1 is {part_1}.")
     print(f"The answer to part 2 is {part_2}.")
 
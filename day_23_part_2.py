@@ -4,47 +4,47 @@ the 46th star overall.
 """
 import sys
 
-DIRECTIONS = (1, -1, 1j, -1j)
-CHAR_DIRECTIONS = {"^": -1, "v": 1, ">": 1j, "<": -1j, ".": 0, "#": 0}
+import day_23_part_1
+from grid import DIRECTIONS, EAST, NORTH, OUTSIDE, SOUTH, WEST, Grid, opposite
+from instrument import phase
 
-def find_start(node_type_dict):
-    index = 0
-    while True:
-        if node_type_dict[complex(0, index)] == ".":
-            return complex(0, index)
-        index += 1
+# The direction each slope forces a step in, keyed by the byte of its character.
+SLOPES = {ord("^"): NORTH, ord("v"): SOUTH, ord(">"): EAST, ord("<"): WEST}
 
 
-def find_nodes(filename):
-    with open(filename, encoding = "utf-8") as f:
-        text = f.read().strip().split()
-        height = len(text)
-        node_type_dict = {complex(row, col): char
-                          for row, line in enumerate(text)
-                          for col, char in enumerate(line)}
+@phase("parse")
+def find_nodes(text):
+    trail_map = Grid.from_text(text)
+    tiles, neighbours = trail_map.views()
+    path = ord(".")
+    forest = ord("#")
+    exit_row_start = len(trail_map) - trail_map.width
 
-    start_node = find_start(node_type_dict)
+    # Nodes are the flat indices of the junctions, with the start on the top
+    # row and the exit on the bottom row.
+    start_node = trail_map.find(".")
     adjacency_list = {start_node: []}
-    queue = [(start_node, start_node + 1, 1)]
+    queue = [(start_node, neighbours[4 * start_node + SOUTH], SOUTH)]
     visited = {start_node}
 
     while queue:
         source_node, current_node, curr_direction = queue.pop()
-        current_char = "."
+        current_char = path
         length = 1
         exit_node_flag = False
 
         # Find next node
-        while current_char == "." and not exit_node_flag:
+        while current_char == path and not exit_node_flag:
             curr_direction = [direction for direction in DIRECTIONS if
-                              direction != -curr_direction and
-                              node_type_dict[current_node + direction] != "#"][0]
-            current_node += curr_direction
-            current_char = node_type_dict[current_node]
+                              direction != opposite(curr_direction) and
+                              neighbours[4 * current_node + direction] != OUTSIDE and
+                              tiles[neighbours[4 * current_node + direction]] != forest][0]
+            current_node = neighbours[4 * current_node + curr_direction]
+            current_char = tiles[current_node]
             length += 1
 
             # Check for ending node
-            if current_node.real == height - 1:
+            if current_node >= exit_row_start:
                 exit_node_flag = True
 
         # Case for ending node
@@ -56,9 +56,9 @@ def find_nodes(filename):
                                           [(source_node, length)]
             continue
 
-        #
-        last_direction = CHAR_DIRECTIONS[current_char]
-        current_node += last_direction
+        # Steps down the slope onto the junction it leads to
+        last_direction = SLOPES[current_char]
+        current_node = neighbours[4 * current_node + last_direction]
         length += 1
         adjacency_list[source_node] = adjacency_list.get(source_node, []) + \
                                       [(current_node, length)]
@@ -69,19 +69,32 @@ def find_nodes(filename):
         if current_node not in visited:
             visited.add(current_node)
 
-
             next_directions = (direction for direction in DIRECTIONS if
-                               direction == CHAR_DIRECTIONS[node_type_dict[current_node + direction]])
+                               direction == SLOPES.get(
+                                   tiles[neighbours[4 * current_node + direction]]))
             for next_direction in next_directions:
-                target_node = current_node + next_direction
+                target_node = neighbours[4 * current_node + next_direction]
                 queue.append((current_node, target_node, next_direction))
 
     return adjacency_list, start_node, exit_node
 
 
-def star_45(filename):
-    adjacency_list, start_node, exit_node = find_nodes(filename)
+@phase("build")
+def add_reverse_edges(adjacency_list):
+    """
+    Takes in the junction graph of Star 45, whose edges only run down the
+    slopes, and returns the graph with every edge also running back up them.
+    """
+    undirected_list = {node: list(targets) for node, targets in adjacency_list.items()}
+    for source, targets in adjacency_list.items():
+        for target, length in targets:
+            undirected_list.setdefault(target, []).append((source, length))
+
+    return undirected_list
 
+
+@phase("solve")
+def star_45(adjacency_list, start_node, exit_node):
     def find_longest_path(exit_node, source, visited):
         if source == exit_node:
             return 0
@@ -102,4 +115,28 @@ def star_45(filename):
     return find_longest_path(exit_node, start_node, frozenset({start_node}))
 
 
-print(star_45(sys.argv[1]))
+def solve(text):
+    """
+    Returns the Star 46 answer for the contents of a Day 23 input file.
+    """
+    return star_45(*find_nodes(text))
+
+
+def solve_both(text):
+    """
+    Returns the Star 45 and Star 46 answers for the contents of a Day 23 input
+    file. The trails are only walked once, to build the junction graph of Star
+    45, which is then made undirected for Star 46.
+    """
+    adjacency_list, start_node, exit_node = day_23_part_1.find_nodes(text)
+    return (day_23_part_1.star_45(adjacency_list, start_node, exit_node),
+            star_45(add_reverse_edges(adjacency_list), start_node, exit_node))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -4,21 +4,23 @@ the 47th star overall.
 """
 import sys
 
+from instrument import phase
+
 MIN_BOUND = 200000000000000
 MAX_BOUND = 400000000000000
 TEST_MIN_BOUND = 7
 TEST_MAX_BOUND = 27
 
-def parse_input(filename):
-    with open(filename, encoding = "utf-8") as f:
-        text = f.read().strip().split("\n")
-        hailstones = []
-        for line in text:
-            line = line.replace(",", "").split("@")
-            position, velocity = line
-            position = tuple(int(pos) for pos in position.strip().split())
-            velocity = tuple(int(vel) for vel in velocity.strip().split())
-            hailstones.append((position, velocity))
+@phase("parse")
+def parse_input(text):
+    text = text.strip().split("\n")
+    hailstones = []
+    for line in text:
+        line = line.replace(",", "").split("@")
+        position, velocity = line
+        position = tuple(int(pos) for pos in position.strip().split())
+        velocity = tuple(int(vel) for vel in velocity.strip().split())
+        hailstones.append((position, velocity))
 
     return tuple(hailstones)
 
@@ -59,9 +61,8 @@ def do_lines_intersect(hstone_1, hstone_2, test):
     return 0
 
 
-def check_hailstones(filename, test = False):
-    hailstones = parse_input(filename)
-
+@phase("solve")
+def check_hailstones(hailstones, test = False):
     answer = 0
     for index, hstone_1 in enumerate(hailstones):
         for hstone_2 in hailstones[index + 1:]:
@@ -70,4 +71,17 @@ def check_hailstones(filename, test = False):
     return answer
 
 
-print(check_hailstones(sys.argv[1], False))
+def solve(text):
+    """
+    Returns the Star 47 answer for the contents of a Day 24 input file.
+    """
+    return check_hailstones(parse_input(text))
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -5,6 +5,9 @@ the 46th star overall.
 import sys
 from sympy import Matrix, linsolve
 
+import day_24_part_1
+from instrument import phase
+
 # Four dimensional line with three dependent variables, one degree of freedom
 
 # For a hailstone_n = (x_n, y_n, z_n), (dx_n, dy_0, dz_0), there will be some
@@ -63,26 +66,47 @@ def create_solution_matrix(hstone_1, hstone_2, hstone_3):
     return solution
 
 
-def parse_input(filename):
-    with open(filename, encoding = "utf-8") as f:
-        text = f.read().strip().split("\n")
-        hailstones = []
-        for line in text:
-            line = line.replace(",", "").split("@")
-            position, velocity = line
-            position = tuple(int(pos) for pos in position.strip().split())
-            velocity = tuple(int(vel) for vel in velocity.strip().split())
-            hailstones.append((position, velocity))
+@phase("parse")
+def parse_input(text):
+    text = text.strip().split("\n")
+    hailstones = []
+    for line in text:
+        line = line.replace(",", "").split("@")
+        position, velocity = line
+        position = tuple(int(pos) for pos in position.strip().split())
+        velocity = tuple(int(vel) for vel in velocity.strip().split())
+        hailstones.append((position, velocity))
 
     return tuple(hailstones)
 
 
-def check_hailstones(filename):
-    hailstones = parse_input(filename)
-
+@phase("solve")
+def check_hailstones(hailstones):
     solution = create_solution_matrix(hailstones[0], hailstones[1], hailstones[2])
 
     return sum(solution[0:3])
 
 
-print(check_hailstones(sys.argv[1]))
+def solve(text):
+    """
+    Returns the Star 48 answer for the contents of a Day 24 input file.
+    """
+    return check_hailstones(parse_input(text))
+
+
+def solve_both(text):
+    """
+    Returns the Star 47 and Star 48 answers for the contents of a Day 24 input
+    file, parsing it only once.
+    """
+    hailstones = parse_input(text)
+    return day_24_part_1.check_hailstones(hailstones), check_hailstones(hailstones)
+
+
+def main(filename):
+    with open(filename, encoding = "utf-8") as f:
+        print(solve(f.read()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
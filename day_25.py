@@ -6,6 +6,8 @@ completion of the other 49 stars)
 import sys
 import random
 
+from instrument import phase
+
 class Node:
     """
     A simple class to represent a node in a graph, storing pointers to the nodes
@@ -75,6 +77,7 @@ def copy_graph(og_graph: set[Node]) -> set[Node]:
     return set(new_graph.values())
 
 
+@phase("build")
 def create_graph(edge_list: list[tuple[str, list[str]]]) -> set[Node]:
     """
     Creates a graph from the parsed Advent of Code data.
@@ -98,6 +101,7 @@ def create_graph(edge_list: list[tuple[str, list[str]]]) -> set[Node]:
     return set(graph.values())
 
 
+@phase("solve")
 def search_for_cut_size(og_graph: set[Node], cut_size: int) -> tuple[int, int]:
     """
     This function is unfortunately probabilistic. A more systematic approach
@@ -112,8 +116,10 @@ def search_for_cut_size(og_graph: set[Node], cut_size: int) -> tuple[int, int]:
     while True:
         graph = copy_graph(og_graph)
 
-        rand_index = random.randrange(total_size)
-        a_node = node_list[rand_index]
+        # The starting node has to come from the copy, otherwise merging into it
+        # would corrupt the original graph for the following attempts.
+        start_node = node_list[random.randrange(total_size)]
+        a_node = next(node for node in graph if node == start_node)
         graph.remove(a_node)
 
         while len(graph) > 0:
@@ -128,7 +134,8 @@ def search_for_cut_size(og_graph: set[Node], cut_size: int) -> tuple[int, int]:
             graph.remove(next_merge)
 
 
-def parse_input(filename: str) -> list[tuple[str, list[str]]]:
+@phase("parse")
+def parse_input(text: str) -> list[tuple[str, list[str]]]:
     """
     Reads in a day 25 Advent of Code text file and parses it. The input
     specifications can be found the Advent of Code website.
@@ -139,8 +146,7 @@ def parse_input(filename: str) -> list[tuple[str, list[str]]]:
     ...]
     """
 
-    with open(filename, 'r', encoding='utf-8') as f:
-        raw_lines = f.read().strip().split('\n')
+    raw_lines = text.strip().split('\n')
     edge_list: list[tuple[str, list[str]]] = []
     for line in raw_lines:
         node, neighbors = line.split(":")
@@ -150,13 +156,21 @@ def parse_input(filename: str) -> list[tuple[str, list[str]]]:
     return edge_list
 
 
-def main(filename: str) -> None:
+def solve(text: str) -> int:
+    """
+    Returns the Star 49 answer for the contents of a Day 25 input file.
+    """
     random.seed()
-    graph = create_graph(parse_input(filename))
+    graph = create_graph(parse_input(text))
     size1, size2 = search_for_cut_size(graph, 3)
-    print(f"Your answer to Day 25 is {size1 * size2}")
+    return size1 * size2
+
+
+def main(filename: str) -> None:
+    with open(filename, 'r', encoding='utf-8') as f:
+        print(f"Your answer to Day 25 is {solve(f.read())}")
 
 
 if __name__ == '__main__':
-    main("day_25.txt")
+    main(sys.argv[1])
     sys.exit(0)
@@ -0,0 +1,215 @@
+"""
+Module to check accelerated engines against the reference solvers. Each check
+runs an engine and the solver it is meant to replace on the same randomly
+generated inputs (made by generators.py), and reports any input on which their
+answers differ, or on which only one of them raises.
+
+Cases are spread over a pool of worker processes, one per seed. A failing
+input is shrunk before it is reported: first by generating it again at smaller
+sizes, and then by deleting as many of its lines as possible while the engine
+still disagrees with the reference, which leaves a small reproducer.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from importlib import import_module
+from typing import Callable, Iterator
+import argparse
+import sys
+
+from benchmark import DEFAULT_SIZES
+from generators import generate
+from solvers import COMBINED_SOLVERS, ENGINES, SOLVERS, get_solver
+
+# checks are stored as a tuple with the following elements:
+# (day, part, module_name, function_name), where part is 0 for an engine that
+# answers both stars at once, which is compared against both star solvers.
+check = tuple[int, int, str, str]
+
+# outcomes are ("answer", answer) for a solve that returned, or
+# ("error", exception name) for one that raised.
+outcome = tuple[str, object]
+
+# mismatches are stored as a tuple with the following elements:
+# (check, seed, text, reference_outcome, engine_outcome), where text is the
+# shrunk input on which the two outcomes differ.
+mismatch = tuple[check, int, str, outcome, outcome]
+
+
+def registered_checks(days: list[int]) -> list[check]:
+    """
+    Returns the checks of every engine registered for the given days: those in
+    solvers.ENGINES, and the combined solvers of solvers.COMBINED_SOLVERS.
+    """
+    checks = []
+    for day in days:
+        for part in (1, 2):
+            for module_name, function_name in ENGINES.get((day, part), ()):
+                checks.append((day, part, module_name, function_name))
+        if day in COMBINED_SOLVERS:
+            checks.append((day, 0, *COMBINED_SOLVERS[day]))
+    return checks
+
+
+@cache
+def _engine(module_name: str, function_name: str) -> Callable:
+    return getattr(import_module(module_name), function_name)
+
+
+def _reference(day: int, part: int) -> Callable:
+    if part == 0:
+        part_1, part_2 = get_solver(day, 1), get_solver(day, 2)
+        return lambda text: (part_1(text), part_2(text))
+    return get_solver(day, part)
+
+
+def run_solver(function: Callable, text: str) -> outcome:
+    """
+    Runs a solver on an input, catching any exception so that a raising solver
+    can be compared with the other.
+    """
+    try:
+        answer = function(text)
+    except Exception as error:  # pylint: disable = broad-exception-caught
+        return "error", type(error).__name__
+    # Combined solvers may return any sequence of the two answers.
+    return "answer", tuple(answer) if isinstance(answer, (list, tuple)) else answer
+
+
+def compare(day: int, part: int, module_name: str, function_name: str,
+            text: str) -> tuple[outcome, outcome]:
+    """
+    Returns the outcomes of the reference solver and of an engine on an input.
+    """
+    return (run_solver(_reference(day, part), text),
+            run_solver(_engine(module_name, function_name), text))
+
+
+def _disagree(star_check: check, text: str) -> bool:
+    """
+    Whether an engine disagrees with the reference on an input the reference can
+    solve. Inputs the reference raises on are not valid puzzles, so shrinking
+    never keeps them.
+    """
+    reference, engine = compare(*star_check, text)
+    return reference[0] == "answer" and reference != engine
+
+
+def shrink_lines(text: str, still_fails: Callable[[str], bool]) -> str:
+    """
+    Deletes chunks of lines from a failing input for as long as it keeps
+    failing, starting with halves of the input and going down to single lines.
+
+    Inputs:
+        text: an input on which still_fails is True
+        still_fails: whether an input still shows the failure
+    """
+    lines = text.split("\n")
+    chunk = len(lines) // 2
+    while chunk >= 1:
+        removed = False
+        index = 0
+        while index < len(lines):
+            candidate = lines[:index] + lines[index + chunk:]
+            if candidate and still_fails("\n".join(candidate)):
+                lines = candidate
+                removed = True
+            else:
+                index += chunk
+        if not removed:
+            chunk //= 2
+    return "\n".join(lines)
+
+
+def _run_case(star_check: check, seed: int, size: int, shrink: bool) -> mismatch | None:
+    """
+    Runs a check on the input generated for a seed in a worker, returning the
+    (shrunk) mismatch if the engine disagrees with the reference.
+    """
+    text = generate(star_check[0], size, seed)
+    if not _disagree(star_check, text):
+        return None
+
+    if shrink:
+        # Regenerating at smaller sizes keeps the input well formed, so it is
+        # tried before any lines are deleted.
+        day = star_check[0]
+        while size > 1 and _disagree(star_check, smaller := generate(day, size // 2, seed)):
+            size //= 2
+            text = smaller
+        text = shrink_lines(text, lambda candidate: _disagree(star_check, candidate))
+
+    return (star_check, seed, text, *compare(*star_check, text))
+
+
+def run_differential(checks: list[check], seeds: int = 100, sizes: dict[int, int] | None = None,
+                     workers: int | None = None, shrink: bool = True) -> Iterator[mismatch]:
+    """
+    Runs every check on the inputs generated for a range of seeds across a pool
+    of worker processes, yielding each mismatch found.
+
+    Inputs:
+        checks: the checks to run
+        seeds: the number of random inputs to try per check
+        sizes: the generator size per day, defaulting to the smallest size of
+            benchmark.DEFAULT_SIZES
+        workers: the number of worker processes, defaulting to the CPU count
+        shrink: whether to shrink each failing input before it is reported
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for star_check in checks:
+            day = star_check[0]
+            size = (sizes or {}).get(day, DEFAULT_SIZES[day][0])
+            futures.extend(executor.submit(_run_case, star_check, seed, size, shrink)
+                           for seed in range(seeds))
+        for future in futures:
+            result = future.result()
+            if result is not None:
+                yield result
+
+
+def main(args: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Check accelerated engines against the solvers.")
+    parser.add_argument("days", type=int, nargs="*", default=list(range(1, 26)),
+                        help="the days whose registered engines are checked (default: all)")
+    parser.add_argument("--engine", metavar="MODULE:FUNCTION", default=None,
+                        help="check this engine instead of the registered ones")
+    parser.add_argument("--part", type=int, choices=(0, 1, 2), default=1,
+                        help="the star --engine answers, or 0 for both stars at once")
+    parser.add_argument("--seeds", type=int, default=100,
+                        help="random inputs per check")
+    parser.add_argument("--size", type=int, default=None,
+                        help="generator size (default: the smallest benchmark size)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("--no-shrink", action="store_true",
+                        help="report failing inputs without shrinking them")
+    options = parser.parse_args(args)
+
+    if options.engine is None:
+        checks = registered_checks(options.days)
+    else:
+        module_name, _, function_name = options.engine.partition(":")
+        checks = [(day, options.part, module_name, function_name) for day in options.days
+                  if options.part == 0 or (day, options.part) in SOLVERS]
+    sizes = None if options.size is None else dict.fromkeys(options.days, options.size)
+
+    failed = set()
+    for star_check, seed, text, reference, engine in run_differential(
+            checks, options.seeds, sizes, options.workers, not options.no_shrink):
+        failed.add(star_check)
+        day, part, module_name, function_name = star_check
+        print(f"MISMATCH day {day} part {part or 'both'} {module_name}.{function_name} "
+              f"seed {seed}: reference {reference[1]!r}, engine {engine[1]!r}")
+        print("\n".join(f"    {line}" for line in text.split("\n")))
+    for day, part, module_name, function_name in checks:
+        status = "FAIL" if (day, part, module_name, function_name) in failed else "ok"
+        print(f"{status:<4} day {day:>2} part {part or 'both':<4} {module_name}.{function_name}",
+              file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
+    sys.exit(0)
@@ -0,0 +1,456 @@
+"""
+Module to generate valid synthetic inputs for every day of the Advent of Code
+2023 at a configurable size, for benchmarking and for checking solvers against
+each other. Each generator takes in a size and a seeded random number generator
+and returns the text of an input file.
+
+The meaning of size depends on the day:
+    grid side length: days 3, 10, 11, 14, 16, 17, 21, and 23
+    node count: days 8, 20, and 25
+    line count: days 1, 2, 4, 7, 9, 12, 15 (steps), 18, 19, 22, and 24
+    other: day 5 (lines per map), day 6 (races), day 13 (patterns)
+"""
+from itertools import product
+from random import Random
+from string import ascii_lowercase, ascii_uppercase
+from typing import Callable
+
+from day_01 import DIGIT_STRINGS
+from day_03 import SYMBOLS
+
+generator = Callable[[int, Random], str]
+
+CAMEL_CARDS = "23456789TJQKA"
+ALMANAC_MAPS = ("seed-to-soil", "soil-to-fertilizer", "fertilizer-to-water",
+                "water-to-light", "light-to-temperature",
+                "temperature-to-humidity", "humidity-to-location")
+
+
+def _three_letter_names(letters: str) -> list[str]:
+    return ["".join(name) for name in product(letters, repeat=3)]
+
+
+def _split_evenly(total: int, chunks: int) -> list[int]:
+    """
+    Splits a total into the given number of positive, nearly equal parts.
+    """
+    return [total // chunks + (index < total % chunks) for index in range(chunks)]
+
+
+def generate_day_01(size: int, rng: Random) -> str:
+    words = [word for word in DIGIT_STRINGS if word != "zero"]
+    lines = []
+    for _ in range(size):
+        pieces = []
+        for _ in range(rng.randint(2, 6)):
+            roll = rng.random()
+            if roll < 0.3:
+                pieces.append(str(rng.randint(1, 9)))
+            elif roll < 0.6:
+                pieces.append(rng.choice(words))
+            else:
+                pieces.append("".join(rng.choices(ascii_lowercase, k=rng.randint(1, 5))))
+        # Every line needs at least one real digit for the first star.
+        pieces.insert(rng.randrange(len(pieces) + 1), str(rng.randint(1, 9)))
+        lines.append("".join(pieces))
+    return "\n".join(lines)
+
+
+def generate_day_02(size: int, rng: Random) -> str:
+    lines = []
+    for game_id in range(1, size + 1):
+        pulls = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(("red", "green", "blue"), rng.randint(1, 3))
+            pulls.append(", ".join(f"{rng.randint(1, 20)} {color}" for color in colors))
+        lines.append(f"Game {game_id}: " + "; ".join(pulls))
+    return "\n".join(lines)
+
+
+def generate_day_03(size: int, rng: Random) -> str:
+    lines = []
+    for _ in range(size):
+        line: list[str] = []
+        while len(line) < size:
+            roll = rng.random()
+            if roll < 0.001:
+                # A few numbers are too long for an int64.
+                line.extend(str(rng.randint(10 ** 18, 10 ** 25)))
+                line.append(".")
+            elif roll < 0.08:
+                line.extend(str(rng.randint(1, 999)))
+                line.append(".")
+            elif roll < 0.12:
+                line.append(rng.choice(SYMBOLS))
+            else:
+                line.append(".")
+        lines.append("".join(line[:size]))
+    return "\n".join(lines)
+
+
+def generate_day_04(size: int, rng: Random) -> str:
+    lines = []
+    for card in range(1, size + 1):
+        numbers = rng.sample(range(1, 100), 35)
+        winning, others = numbers[:10], numbers[10:]
+        # A card cannot win copies of cards past the end of the table.
+        matches = min(rng.choice((0, 0, 0, 1, 1, 2, 3, 4, 5, 10)), size - card)
+        scratched = winning[:matches] + others[:25 - matches]
+        rng.shuffle(scratched)
+        lines.append(f"Card {card:>3}: " + " ".join(f"{num:>2}" for num in winning)
+                     + " | " + " ".join(f"{num:>2}" for num in scratched))
+    return "\n".join(lines)
+
+
+def generate_day_05(size: int, rng: Random) -> str:
+    span = 2 ** 32
+    seeds = []
+    for _ in range(10):
+        length = rng.randint(1, 10 ** 8)
+        seeds += [rng.randrange(span - length), length]
+    blocks = ["seeds: " + " ".join(str(seed) for seed in seeds)]
+    for map_name in ALMANAC_MAPS:
+        # Cuts the seed space into intervals and lays them back down in a
+        # shuffled order, which makes each map a bijection.
+        cuts = sorted(rng.sample(range(1, span), size - 1))
+        sources = list(zip([0] + cuts, cuts + [span]))
+        shuffled = sources[:]
+        rng.shuffle(shuffled)
+        lines = [f"{map_name} map:"]
+        dest = 0
+        for start, end in shuffled:
+            lines.append(f"{dest} {start} {end - start}")
+            dest += end - start
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def generate_day_06(size: int, rng: Random) -> str:
+    times = [rng.randint(7, 99) for _ in range(size)]
+    # A few races have a record that can only be tied, or cannot be reached.
+    records = [time * time // 4 + rng.randint(0, 1) if rng.random() < 0.005
+               else rng.randrange(time * time // 4) for time in times]
+    return ("Time:     " + " ".join(f"{time:>4}" for time in times) + "\n"
+            + "Distance: " + " ".join(f"{record:>4}" for record in records))
+
+
+def generate_day_07(size: int, rng: Random) -> str:
+    # A dict rather than a set keeps the order, and so the output, independent
+    # of string hashing.
+    hands: dict[str, None] = {}
+    while len(hands) < size:
+        hands["".join(rng.choices(CAMEL_CARDS, k=5))] = None
+    return "\n".join(f"{hand} {rng.randint(1, 1000)}" for hand in hands)
+
+
+def generate_day_08(size: int, rng: Random) -> str:
+    # Builds a few chains from a node ending in A to a node ending in Z, where
+    # each Z node loops back to the start of its chain. The first chain runs
+    # from AAA to ZZZ so that both stars have a path.
+    chains = max(1, min(6, size // 10))
+    names = [name for name in _three_letter_names(ascii_uppercase)
+             if name[2] not in "AZ"]
+    middles = rng.sample(names, max(chains, size - 2 * chains))
+    prefixes = sorted({name[:2] for name in names} - {"AA", "ZZ"})
+    starts = ["AAA"] + [prefix + "A" for prefix in rng.sample(prefixes, chains - 1)]
+    ends = ["ZZZ"] + [prefix + "Z" for prefix in rng.sample(prefixes, chains - 1)]
+
+    lines = []
+    for chain in range(chains):
+        chain_middles = middles[chain::chains]
+        path = [starts[chain]] + chain_middles + [ends[chain]]
+        for node, next_node in zip(path, path[1:]):
+            lines.append(f"{node} = ({next_node}, {next_node})")
+        lines.append(f"{ends[chain]} = ({chain_middles[0]}, {chain_middles[0]})")
+    rng.shuffle(lines)
+    instructions = "".join(rng.choices("LR", k=263))
+    return instructions + "\n\n" + "\n".join(lines)
+
+
+def generate_day_09(size: int, rng: Random) -> str:
+    lines = []
+    for _ in range(size):
+        coefficients = [rng.randint(-5, 5) for _ in range(rng.randint(1, 6))]
+        values = [sum(coeff * x ** power for power, coeff in enumerate(coefficients))
+                  for x in range(21)]
+        lines.append(" ".join(str(value) for value in values))
+    return "\n".join(lines)
+
+
+def generate_day_10(size: int, rng: Random) -> str:
+    # Scatters junk pipes everywhere and then lays a rectangular loop one tile
+    # in from the border, with S in its top-left corner.
+    size = max(size, 5)
+    grid = [rng.choices("|-LJ7F.", k=size) for _ in range(size)]
+    last = size - 2
+    for col in range(2, last):
+        grid[1][col] = "-"
+        grid[last][col] = "-"
+    for row in range(2, last):
+        grid[row][1] = "|"
+        grid[row][last] = "|"
+    grid[1][1], grid[1][last], grid[last][last], grid[last][1] = "S", "7", "J", "L"
+    return "\n".join("".join(line) for line in grid)
+
+
+def generate_day_11(size: int, rng: Random) -> str:
+    empty_rows = set(rng.sample(range(size), size // 10))
+    empty_cols = set(rng.sample(range(size), size // 10))
+    lines = []
+    for row in range(size):
+        lines.append("".join("#" if row not in empty_rows and col not in empty_cols
+                             and rng.random() < 0.02 else "."
+                             for col in range(size)))
+    return "\n".join(lines)
+
+
+def generate_day_12(size: int, rng: Random) -> str:
+    lines = []
+    for _ in range(size):
+        solution = "".join(rng.choices("#.", weights=(2, 3), k=rng.randint(8, 20)))
+        if "#" not in solution:
+            solution = "#" + solution[1:]
+        numbers = [len(chunk) for chunk in solution.split(".") if chunk]
+        masked = "".join("?" if rng.random() < 0.5 else spring for spring in solution)
+        lines.append(f"{masked} {','.join(str(number) for number in numbers)}")
+    return "\n".join(lines)
+
+
+def generate_day_13(size: int, rng: Random) -> str:
+    patterns = []
+    for _ in range(size):
+        height, width = rng.randint(5, 17), rng.randint(5, 17)
+        reflect = rng.randint(1, width - 1)
+        rows = []
+        for _ in range(height):
+            row = rng.choices("#.", k=width)
+            for col in range(reflect, width):
+                mirror = 2 * reflect - 1 - col
+                if mirror >= 0:
+                    row[col] = row[mirror]
+            rows.append("".join(row))
+        if rng.random() < 0.5:
+            # Transposes the pattern to give a horizontal line of reflection.
+            rows = ["".join(row[col] for row in rows) for col in range(width)]
+        patterns.append("\n".join(rows))
+    return "\n\n".join(patterns)
+
+
+def generate_day_14(size: int, rng: Random) -> str:
+    return "\n".join("".join(rng.choices("O#.", weights=(2, 1, 7), k=size))
+                     for _ in range(size))
+
+
+def generate_day_15(size: int, rng: Random) -> str:
+    labels = ["".join(rng.choices(ascii_lowercase, k=rng.randint(2, 6)))
+              for _ in range(max(1, size // 4))]
+    steps = []
+    for _ in range(size):
+        label = rng.choice(labels)
+        steps.append(f"{label}={rng.randint(1, 9)}" if rng.random() < 0.7 else f"{label}-")
+    return ",".join(steps)
+
+
+def generate_day_16(size: int, rng: Random) -> str:
+    return "\n".join("".join(rng.choice("/\\|-") if rng.random() < 0.1 else "."
+                             for _ in range(size))
+                     for _ in range(size))
+
+
+def generate_day_17(size: int, rng: Random) -> str:
+    return "\n".join("".join(rng.choices("123456789", k=size)) for _ in range(size))
+
+
+def generate_day_18(size: int, rng: Random) -> str:
+    # Both stars trace a staircase down and to the right and then close it with
+    # long moves left and up, which is always a simple polygon. The second
+    # star's closing moves are split so they fit in five hex digits, and the
+    # first star's are split to match.
+    steps = max(1, (size - 2) // 2)
+    star_1 = [(direct, rng.randint(1, 20)) for _ in range(steps) for direct in "RD"]
+    star_2 = [(direct, rng.randint(1, 50000)) for _ in range(steps) for direct in "RD"]
+    for closing, direct in (("L", "R"), ("U", "D")):
+        total_2 = sum(dist for step, dist in star_2 if step == direct)
+        chunks = -(-total_2 // 0xFFFFF)
+        total_1 = sum(dist for step, dist in star_1 if step == direct)
+        star_1 += [(closing, dist) for dist in _split_evenly(total_1, chunks)]
+        star_2 += [(closing, dist) for dist in _split_evenly(total_2, chunks)]
+    hex_direction = {"R": 0, "D": 1, "L": 2, "U": 3}
+    return "\n".join(f"{direct_1} {dist_1} (#{dist_2:05x}{hex_direction[direct_2]})"
+                     for (direct_1, dist_1), (direct_2, dist_2) in zip(star_1, star_2))
+
+
+def generate_day_19(size: int, rng: Random) -> str:
+    names = iter(rng.sample(_three_letter_names(ascii_lowercase), size + 1))
+    pending = ["in"]
+    defined = 0
+    workflows = []
+    while pending:
+        name = pending.pop()
+        defined += 1
+        destinations = []
+        for _ in range(rng.randint(2, 4)):
+            if defined + len(pending) < size and rng.random() < 0.6:
+                destinations.append(next(names))
+                pending.append(destinations[-1])
+            else:
+                destinations.append(rng.choice("AR"))
+        rules = [f"{rng.choice('xmas')}{rng.choice('<>')}{rng.randint(1, 4000)}:{dest}"
+                 for dest in destinations[:-1]]
+        workflows.append(f"{name}{{{','.join(rules + [destinations[-1]])}}}")
+    rng.shuffle(workflows)
+    items = [f"{{x={rng.randint(1, 4000)},m={rng.randint(1, 4000)},"
+             f"a={rng.randint(1, 4000)},s={rng.randint(1, 4000)}}}"
+             for _ in range(size)]
+    return "\n".join(workflows) + "\n\n" + "\n".join(items)
+
+
+def generate_day_20(size: int, rng: Random) -> str:
+    # Mirrors the structure of the real puzzle: the broadcaster feeds several
+    # chains of flip-flops that count in binary, and a conjunction on each
+    # chain resets its counter when it reaches a chosen value, sending a pulse
+    # through an inverter into the conjunction in front of rx.
+    bits = 12
+    chains = max(1, size // (bits + 2))
+    names = iter(rng.sample(_three_letter_names(ascii_lowercase), chains * (bits + 2) + 1))
+    final = next(names)
+    lines = [f"&{final} -> rx"]
+    firsts = []
+    for _ in range(chains):
+        flip_flops = [next(names) for _ in range(bits)]
+        conjunction, inverter = next(names), next(names)
+        firsts.append(flip_flops[0])
+        target = rng.randrange(2 ** (bits - 1), 2 ** bits) | 1
+        for bit, flip_flop in enumerate(flip_flops):
+            outputs = flip_flops[bit + 1: bit + 2]
+            if target >> bit & 1:
+                outputs.append(conjunction)
+            lines.append(f"%{flip_flop} -> {', '.join(outputs)}")
+        resets = [flip_flop for bit, flip_flop in enumerate(flip_flops)
+                  if bit == 0 or not target >> bit & 1]
+        lines.append(f"&{conjunction} -> {', '.join(resets + [inverter])}")
+        lines.append(f"&{inverter} -> {final}")
+    rng.shuffle(lines)
+    return f"broadcaster -> {', '.join(firsts)}\n" + "\n".join(lines)
+
+
+def generate_day_21(size: int, rng: Random) -> str:
+    size |= 1
+    middle = size // 2
+    grid = [["#" if rng.random() < 0.1 and row != middle and col != middle else "."
+             for col in range(size)] for row in range(size)]
+    grid[middle][middle] = "S"
+    return "\n".join("".join(line) for line in grid)
+
+
+def generate_day_22(size: int, rng: Random) -> str:
+    lines = []
+    z_level = 1
+    for _ in range(min(size, 17575)):
+        x, y = rng.randrange(10), rng.randrange(10)
+        length = rng.randint(0, 3)
+        end_x, end_y, end_z = x, y, z_level
+        match rng.choice("xyz"):
+            case "x": end_x = min(9, x + length)
+            case "y": end_y = min(9, y + length)
+            case "z": end_z = z_level + length
+        lines.append(f"{x},{y},{z_level}~{end_x},{end_y},{end_z}")
+        z_level = end_z + rng.randint(1, 2)
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
+def generate_day_23(size: int, _rng: Random) -> str:
+    # Lays junctions on a lattice and links each one to its neighbours to the
+    # right and below with straight corridors guarded by slopes, then connects
+    # the first junction to the entrance and the last junction to the exit.
+    spacing, offset = 6, 3
+    size = max(size, offset + 4)
+    junctions = (size - offset - 3) // spacing + 1
+    grid = [["#"] * size for _ in range(size)]
+    last = offset + spacing * (junctions - 1)
+    for row in range(offset - 1):
+        grid[row][offset] = "."
+    grid[offset - 1][offset] = "v"
+    for row in range(last + 2, size):
+        grid[row][last] = "."
+    grid[last + 1][last] = "v"
+    for i, j in product(range(junctions), repeat=2):
+        row, col = offset + spacing * i, offset + spacing * j
+        grid[row][col] = "."
+        if j + 1 < junctions:
+            grid[row][col + 1: col + spacing] = [">"] + ["."] * (spacing - 3) + [">"]
+        if i + 1 < junctions:
+            for step in range(1, spacing):
+                grid[row + step][col] = "v" if step in (1, spacing - 1) else "."
+    return "\n".join("".join(line) for line in grid)
+
+
+def generate_day_24(size: int, rng: Random) -> str:
+    # Every hailstone is placed so that a single thrown rock hits all of them.
+    rock_pos = [rng.randint(2 * 10 ** 14, 4 * 10 ** 14) for _ in range(3)]
+    rock_vel = [rng.randint(-300, 300) for _ in range(3)]
+    times = rng.sample(range(10 ** 11, 10 ** 12), size)
+    lines = []
+    for time in times:
+        velocity = []
+        for component in rock_vel:
+            speed = rng.randint(-300, 300)
+            while speed in (0, component):
+                speed = rng.randint(-300, 300)
+            velocity.append(speed)
+        position = [pos + (vel - speed) * time
+                    for pos, vel, speed in zip(rock_pos, rock_vel, velocity)]
+        lines.append(", ".join(str(pos) for pos in position) + " @ "
+                     + ", ".join(str(speed) for speed in velocity))
+    return "\n".join(lines)
+
+
+def generate_day_25(size: int, rng: Random) -> str:
+    # Two well connected clusters joined by exactly three wires.
+    size = max(16, min(size, 17576))
+    names = rng.sample(_three_letter_names(ascii_lowercase), size)
+    clusters = (names[:size // 2], names[size // 2:])
+    # Edges are kept in a dict, like the hands of day 7, for a stable order.
+    edges: dict[tuple[str, str], None] = {}
+    for cluster in clusters:
+        count = len(cluster)
+        for index, node in enumerate(cluster):
+            for step in (1, 2, 3):
+                edges[(node, cluster[(index + step) % count])] = None
+        for _ in range(count // 4):
+            first, second = rng.sample(cluster, 2)
+            if (second, first) not in edges:
+                edges[(first, second)] = None
+    for _ in range(3):
+        edges[(rng.choice(clusters[0]), rng.choice(clusters[1]))] = None
+
+    neighbors: dict[str, list[str]] = {}
+    for first, second in edges:
+        neighbors.setdefault(first, []).append(second)
+    return "\n".join(f"{node}: {' '.join(targets)}" for node, targets in neighbors.items())
+
+
+GENERATORS: dict[int, generator] = {
+    1: generate_day_01, 2: generate_day_02, 3: generate_day_03,
+    4: generate_day_04, 5: generate_day_05, 6: generate_day_06,
+    7: generate_day_07, 8: generate_day_08, 9: generate_day_09,
+    10: generate_day_10, 11: generate_day_11, 12: generate_day_12,
+    13: generate_day_13, 14: generate_day_14, 15: generate_day_15,
+    16: generate_day_16, 17: generate_day_17, 18: generate_day_18,
+    19: generate_day_19, 20: generate_day_20, 21: generate_day_21,
+    22: generate_day_22, 23: generate_day_23, 24: generate_day_24,
+    25: generate_day_25,
+}
+
+
+def generate(day: int, size: int, seed: int = 2023) -> str:
+    """
+    Generates the text of a synthetic input for a day.
+
+    Inputs:
+        day: the day of the puzzle, from 1 to 25
+        size: the size of the input, whose meaning depends on the day
+        seed: the seed for the random number generator
+    """
+    return GENERATORS[day](size, Random(seed))
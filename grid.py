@@ -0,0 +1,128 @@
+"""
+Module providing the grid type shared by the puzzles whose input is a map of
+characters (days 3, 10, 11, 13, 14, 16, 17, 21, and 23).
+
+A grid keeps its cells in a single flat NumPy array, one byte per character of
+the input, and refers to cells by their flat index (row * width + col). Moves
+between cells go through a neighbour table, which holds the flat index of the
+cell one step in each direction, or OUTSIDE if that step leaves the grid.
+"""
+from functools import cached_property
+
+import numpy as np
+
+# Directions index the columns of the neighbour table, and are ordered clockwise
+# so that turning right is +1 and reversing is +2 (mod 4).
+NORTH = 0
+EAST = 1
+SOUTH = 2
+WEST = 3
+DIRECTIONS = (NORTH, EAST, SOUTH, WEST)
+
+OUTSIDE = -1
+
+
+def opposite(direction: int) -> int:
+    return (direction + 2) % 4
+
+
+class Grid:
+    """
+    A rectangular map of cells stored row by row in a flat array. Grids read
+    from text hold the byte value of each character (uint8), but any array of
+    height * width values can be wrapped, such as int32 distances.
+    """
+
+    cells: np.ndarray
+    height: int
+    width: int
+
+    def __init__(self, cells: np.ndarray, height: int, width: int):
+        if cells.shape != (height * width,):
+            raise ValueError(f"Expected {height * width} cells, got shape {cells.shape}.")
+        self.cells = cells
+        self.height = height
+        self.width = width
+
+    @classmethod
+    def from_text(cls, text: str | bytes) -> "Grid":
+        """
+        Reads a grid from the contents of an input file, one row per line. The
+        bytes are loaded straight into the array, with the newlines dropped.
+
+        Input:
+            text: the contents of the input file, as text or raw bytes
+        """
+        data = text.encode("ascii") if isinstance(text, str) else bytes(text)
+        data = data.replace(b"\r\n", b"\n").strip()
+        width = data.find(b"\n")
+        if width == -1:
+            width = len(data)
+        height = (len(data) + 1) // (width + 1)
+        if height * (width + 1) - 1 != len(data):
+            raise ValueError("The rows of the grid have different lengths.")
+
+        # Every row is followed by a newline except the last, so one is added
+        # to let the buffer be viewed as rows and the newline column dropped.
+        lines = np.frombuffer(data + b"\n", dtype=np.uint8).reshape(height, width + 1)
+        return cls(lines[:, :width].flatten(), height, width)
+
+    def __repr__(self):
+        return f"Grid({self.height}x{self.width}, {self.cells.dtype})"
+
+    def __len__(self):
+        return self.height * self.width
+
+    @property
+    def rows(self) -> np.ndarray:
+        """
+        A (height, width) view of the cells. Writing to it writes to the grid.
+        """
+        return self.cells.reshape(self.height, self.width)
+
+    def index(self, row: int, col: int) -> int:
+        return row * self.width + col
+
+    def position(self, index: int) -> tuple[int, int]:
+        return divmod(index, self.width)
+
+    def find(self, character: str) -> int:
+        """
+        Returns the flat index of the first cell holding a character.
+        """
+        matches = np.flatnonzero(self.cells == ord(character))
+        if len(matches) == 0:
+            raise ValueError(f"There is no {character!r} in the grid.")
+        return int(matches[0])
+
+    def mask(self, characters: str) -> np.ndarray:
+        """
+        Returns a flat boolean array marking the cells holding any of the
+        given characters.
+        """
+        return np.isin(self.cells, np.frombuffer(characters.encode("ascii"), dtype=np.uint8))
+
+    @cached_property
+    def neighbours(self) -> np.ndarray:
+        """
+        A (height * width, 4) int32 table of the flat index one step north,
+        east, south, and west of each cell, or OUTSIDE past the edge.
+        """
+        indices = np.arange(len(self), dtype=np.int32)
+        rows, cols = np.divmod(indices, self.width)
+        table = np.full((len(self), 4), OUTSIDE, dtype=np.int32)
+        for direction, inside, step in ((NORTH, rows > 0, -self.width),
+                                        (EAST, cols < self.width - 1, 1),
+                                        (SOUTH, rows < self.height - 1, self.width),
+                                        (WEST, cols > 0, -1)):
+            table[inside, direction] = indices[inside] + step
+        return table
+
+    def views(self) -> tuple[memoryview, memoryview]:
+        """
+        Returns memoryviews of the cells and of the flattened neighbour table,
+        where the neighbour of index in direction is at 4 * index + direction.
+        Indexing these yields plain ints without copying the arrays, which is
+        much faster than indexing the arrays one element at a time.
+        """
+        return self.cells.data, self.neighbours.ravel().data
@@ -0,0 +1,218 @@
+"""
+Module providing opt-in instrumentation for the solvers. Day modules mark their
+parse, build, and solve functions with the phase decorator, and when
+instrumentation is enabled every call records its wall time and the net number
+of memory blocks it allocated.
+
+Instrumentation is switched on by setting the ADVENT_TIMINGS environment
+variable, or by calling enable() (as the --timings flag of the command line
+tools does) before the day modules are imported. When it is off, phase returns
+the decorated function untouched, so there is no overhead at all.
+
+Setting ADVENT_MEMORY, or calling enable(memory=True) (the --memory flag), also
+traces allocations with tracemalloc and records the peak memory each phase
+used above what was allocated when it started. Tracing slows the solvers down
+considerably, so it is kept separate from the timings.
+
+Setting ADVENT_PROFILE to a filename runs the whole process under cProfile and
+writes the statistics to that file on exit.
+"""
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Iterator
+import atexit
+import cProfile
+import os
+import pstats
+import resource
+import sys
+import tracemalloc
+
+TIMINGS_VARIABLE = "ADVENT_TIMINGS"
+MEMORY_VARIABLE = "ADVENT_MEMORY"
+PROFILE_VARIABLE = "ADVENT_PROFILE"
+
+# phase_stats map (module, phase, function) to [calls, seconds, blocks, peak],
+# where seconds and blocks exclude any nested phases, and peak is the most
+# bytes any one call had allocated at once beyond its starting point
+# (including nested phases), or 0 if memory is not being traced.
+phase_stats = dict[tuple[str, str, str], list]
+
+_stats: phase_stats = {}
+# One [seconds, blocks, peak] entry per phase currently running, which nested
+# phases add themselves to so that they can be subtracted from their parent.
+# peak is the highest traced memory seen while the phase ran, which has to be
+# saved before a nested phase resets tracemalloc's peak.
+_active: list[list] = []
+_enabled = False
+_memory = False
+
+
+def enable(memory: bool = False) -> None:
+    """
+    Turns instrumentation on for any day module imported after this call, and
+    prints a report to stderr when the process exits.
+
+    Input:
+        memory: whether to also trace the peak memory of each phase
+    """
+    global _enabled, _memory
+    if memory and not _memory:
+        _memory = True
+        tracemalloc.start()
+    if not _enabled:
+        _enabled = True
+        atexit.register(lambda: print(report(), file=sys.stderr) if _stats else None)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def is_tracing_memory() -> bool:
+    return _memory
+
+
+def current_rss() -> float:
+    """
+    Returns the current resident set size of this process in MiB. Where /proc is
+    not available this falls back to the peak, which is never lower.
+    """
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 1024 ** 2
+    except OSError:
+        return peak_rss()
+
+
+def peak_rss() -> float:
+    """
+    Returns the peak resident set size of this process in MiB. On Linux this is
+    read from /proc, because ru_maxrss survives the exec of a spawned process
+    and would report the parent's peak instead.
+    """
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def phase(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator marking a function as one phase ("parse", "build", or "solve") of
+    a solver.
+
+    Input:
+        name: the name of the phase
+    """
+    def decorate(function: Callable) -> Callable:
+        if not _enabled:
+            return function
+
+        key = (function.__module__, name, function.__qualname__)
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            traced = 0
+            if _memory:
+                traced, peak = tracemalloc.get_traced_memory()
+                if _active:
+                    _active[-1][2] = max(_active[-1][2], peak)
+                tracemalloc.reset_peak()
+            _active.append([0.0, 0, traced])
+            blocks = sys.getallocatedblocks()
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds = perf_counter() - start
+                blocks = sys.getallocatedblocks() - blocks
+                nested_seconds, nested_blocks, peak = _active.pop()
+                if _memory:
+                    peak = max(peak, tracemalloc.get_traced_memory()[1])
+                if _active:
+                    _active[-1][0] += seconds
+                    _active[-1][1] += blocks
+                    _active[-1][2] = max(_active[-1][2], peak)
+                record = _stats.setdefault(key, [0, 0.0, 0, 0])
+                record[0] += 1
+                record[1] += seconds - nested_seconds
+                record[2] += blocks - nested_blocks
+                record[3] = max(record[3], peak - traced)
+
+        return timed
+
+    return decorate
+
+
+def collect() -> phase_stats:
+    """
+    Returns the statistics recorded so far and clears them.
+    """
+    stats = dict(_stats)
+    _stats.clear()
+    return stats
+
+
+def merge(stats: phase_stats) -> None:
+    """
+    Adds statistics collected in another process to the ones in this process.
+    """
+    for key, (calls, seconds, blocks, peak) in stats.items():
+        record = _stats.setdefault(key, [0, 0.0, 0, 0])
+        record[0] += calls
+        record[1] += seconds
+        record[2] += blocks
+        record[3] = max(record[3], peak)
+
+
+def report() -> str:
+    """
+    Formats the recorded statistics as a table, one row per phase function.
+    The peak memory column is only included when memory is being traced.
+    """
+    lines = [f"{'module':<15} {'phase':<6} {'function':<35} {'calls':>7} "
+             f"{'seconds':>10} {'blocks':>10}" + (f" {'peak KiB':>10}" if _memory else "")]
+    for (module, name, function), (calls, seconds, blocks, peak) in sorted(_stats.items()):
+        memory = f" {peak / 1024:>10.1f}" if _memory else ""
+        lines.append(f"{module:<15} {name:<6} {function:<35} {calls:>7} "
+                     f"{seconds:>10.4f} {blocks:>10}" + memory)
+    return "\n".join(lines)
+
+
+@contextmanager
+def profiled(filename: str | None = None) -> Iterator[cProfile.Profile]:
+    """
+    Runs the body of the with statement under cProfile. The statistics are
+    written to the given file, or printed to stderr sorted by cumulative time
+    if no file is given.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if filename:
+            profiler.dump_stats(filename)
+        else:
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+
+
+if os.environ.get(MEMORY_VARIABLE, "") not in ("", "0"):
+    enable(memory=True)
+elif os.environ.get(TIMINGS_VARIABLE, "") not in ("", "0"):
+    enable()
+
+if os.environ.get(PROFILE_VARIABLE):
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+    atexit.register(lambda: (_profiler.disable(),
+                             _profiler.dump_stats(os.environ[PROFILE_VARIABLE])))
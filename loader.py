@@ -0,0 +1,81 @@
+"""
+Module providing zero-copy loading of input files. Rather than being read and
+decoded into one large string, an input file is memory-mapped, and parsers walk
+it with the line iterator below. Each line is sliced out of the mapping as
+bytes and split into bytes fields, so the only copies made are of the pieces a
+parser actually looks at, and no Python strings are created along the way.
+
+Parsers built on this module also accept the text passed in by the solver
+registry, which is encoded to bytes once up front.
+"""
+from contextlib import contextmanager
+from typing import Iterator
+import mmap
+import os
+
+# buffers are anything the line iterator can walk: bytes, or a memory-mapped
+# file, which supports the same find and slicing operations without being read.
+buffer = bytes | mmap.mmap
+
+
+@contextmanager
+def map_input(filename: str) -> Iterator[buffer]:
+    """
+    Memory-maps an input file for reading for the body of the with statement.
+    Empty files cannot be mapped, so they are given as empty bytes instead.
+
+    Input:
+        filename: the path of the input file
+    """
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def as_buffer(data: str | buffer) -> buffer:
+    """
+    Returns the contents of an input file as a buffer, encoding it if it was
+    given as text.
+    """
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def iter_lines(data: buffer, skip_blank: bool = True) -> Iterator[bytes]:
+    """
+    Yields every line of a buffer as bytes, without the trailing newline or
+    carriage return. Only one line is copied out of the buffer at a time.
+
+    Inputs:
+        data: the contents of the input file
+        skip_blank: whether to leave out empty lines, which is needed by
+            parsers that split their input into sections on empty lines
+    """
+    start = 0
+    size = len(data)
+    while start < size:
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = size
+        line = data[start:end].rstrip(b"\r")
+        start = end + 1
+        if line or not skip_blank:
+            yield line
+
+
+def iter_sections(data: buffer) -> Iterator[list[bytes]]:
+    """
+    Yields the lines of each section of a buffer, where sections are separated
+    by one or more empty lines.
+    """
+    section: list[bytes] = []
+    for line in iter_lines(data, skip_blank=False):
+        if line:
+            section.append(line)
+        elif section:
+            yield section
+            section = []
+    if section:
+        yield section
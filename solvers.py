@@ -0,0 +1,223 @@
+"""
+Module holding a registry of the solver for every star of the Advent of Code
+2023, keyed by day and part. Each solver is a function taking in the contents
+of an input file and returning the answer, and the day modules are only
+imported the first time one of their solvers is requested.
+"""
+from functools import cache, partial
+from importlib import import_module
+from typing import Callable
+import argparse
+import sys
+
+from budget import MemoryBudgetExceeded, memory_budget
+import instrument
+
+solver = Callable[[str], int]
+# combined_solvers take in the text of an input file and return the answers to
+# both of its stars.
+combined_solver = Callable[[str], tuple[int, int]]
+
+# Maps (day, part) to (module_name, function_name), where the function takes in
+# the text of an input file and returns the answer to that star.
+SOLVERS: dict[tuple[int, int], tuple[str, str]] = {
+    (1, 1): ("day_01", "solve_part_1"),
+    (1, 2): ("day_01", "solve_part_2"),
+    (2, 1): ("day_02", "solve_part_1"),
+    (2, 2): ("day_02", "solve_part_2"),
+    (3, 1): ("day_03", "solve_part_1"),
+    (3, 2): ("day_03", "solve_part_2"),
+    (4, 1): ("day_04", "solve_part_1"),
+    (4, 2): ("day_04", "solve_part_2"),
+    (5, 1): ("day_05_part_1", "solve"),
+    (5, 2): ("day_05_part_2", "solve"),
+    (6, 1): ("day_06_part_1", "solve"),
+    (6, 2): ("day_06_part_2", "solve"),
+    (7, 1): ("day_07_part_1", "solve"),
+    (7, 2): ("day_07_part_2", "solve"),
+    (8, 1): ("day_08_part_1", "solve"),
+    (8, 2): ("day_08_part_2", "solve"),
+    (9, 1): ("day_09_part_1", "solve"),
+    (9, 2): ("day_09_part_2", "solve"),
+    (10, 1): ("day_10_part_1", "solve"),
+    (10, 2): ("day_10_part_2", "solve"),
+    (11, 1): ("day_11", "solve_part_1"),
+    (11, 2): ("day_11", "solve_part_2"),
+    (12, 1): ("day_12", "solve_part_1"),
+    (12, 2): ("day_12", "solve_part_2"),
+    (13, 1): ("day_13_part_1", "solve"),
+    (13, 2): ("day_13_part_2", "solve"),
+    (14, 1): ("day_14", "solve_part_1"),
+    (14, 2): ("day_14", "solve_part_2"),
+    (15, 1): ("day_15", "solve_part_1"),
+    (15, 2): ("day_15", "solve_part_2"),
+    (16, 1): ("day_16", "solve_part_1"),
+    (16, 2): ("day_16", "solve_part_2"),
+    (17, 1): ("day_17_part_1", "solve"),
+    (17, 2): ("day_17_part_2", "solve"),
+    (18, 1): ("day_18", "solve_part_1"),
+    (18, 2): ("day_18", "solve_part_2"),
+    (19, 1): ("day_19_part_1", "solve"),
+    (19, 2): ("day_19_part_2", "solve"),
+    (20, 1): ("day_20_part_1", "solve"),
+    (20, 2): ("day_20_part_2", "solve"),
+    (21, 1): ("day_21", "solve_part_1"),
+    (21, 2): ("day_21", "solve_part_2"),
+    (22, 1): ("day_22", "solve_part_1"),
+    (22, 2): ("day_22", "solve_part_2"),
+    (23, 1): ("day_23_part_1", "solve"),
+    (23, 2): ("day_23_part_2", "solve"),
+    (24, 1): ("day_24_part_1", "solve"),
+    (24, 2): ("day_24_part_2", "solve"),
+    (25, 1): ("day_25", "solve"),
+}
+
+# Maps day to (module_name, function_name) for the days whose stars are solved
+# in separate modules, where the function parses the input once and answers
+# both stars from what it shares between them.
+COMBINED_SOLVERS: dict[int, tuple[str, str]] = {
+    5: ("day_05_part_2", "solve_both"),
+    6: ("day_06_part_2", "solve_both"),
+    7: ("day_07_part_2", "solve_both"),
+    8: ("day_08_part_2", "solve_both"),
+    9: ("day_09_part_2", "solve_both"),
+    10: ("day_10_part_2", "solve_both"),
+    13: ("day_13_part_2", "solve_both"),
+    17: ("day_17_part_2", "solve_both"),
+    19: ("day_19_part_2", "solve_both"),
+    20: ("day_20_part_2", "solve_both"),
+    23: ("day_23_part_2", "solve_both"),
+    24: ("day_24_part_2", "solve_both"),
+}
+
+
+# Maps a star to the (module_name, function_name) of each accelerated engine
+# for it, which must give the same answers as the star's solver in SOLVERS.
+# differential.py checks that they do, and benchmark.py --engines times them.
+ENGINES: dict[tuple[int, int], list[tuple[str, str]]] = {
+    (1, 1): [("day_01", "solve_part_1_vectorized")],
+    (1, 2): [("day_01", "solve_part_2_automaton")],
+    (2, 1): [("day_02", "solve_part_1_table")],
+    (2, 2): [("day_02", "solve_part_2_table")],
+    (3, 1): [("day_03", "solve_part_1_indexed"), ("day_03", "solve_part_1_stream"),
+             ("day_03", "solve_part_1_vectorized")],
+    (3, 2): [("day_03", "solve_part_2_indexed"), ("day_03", "solve_part_2_stream"),
+             ("day_03", "solve_part_2_vectorized")],
+    (4, 1): [("day_04", "solve_part_1_bitset")],
+    (4, 2): [("day_04", "solve_part_2_bitset")],
+    (5, 1): [("day_05_part_1", "solve_composed"), ("day_05_part_1", "solve_indexed")],
+    (5, 2): [("day_05_part_2", "solve_composed"), ("day_05_part_2", "solve_vectorized"),
+             ("day_05_part_2", "solve_indexed")],
+    (6, 1): [("day_06_part_1", "solve_batch")],
+    (7, 1): [("day_07_part_1", "solve_keyed")],
+    (7, 2): [("day_07_part_2", "solve_keyed")],
+    (11, 1): [("day_11", "solve_part_1_sorted")],
+    (11, 2): [("day_11", "solve_part_2_sorted")],
+    (14, 1): [("day_14", "solve_part_1_indexed")],
+    (14, 2): [("day_14", "solve_part_2_indexed")],
+    (21, 1): [("day_21", "solve_part_1_waves")],
+    (21, 2): [("day_21", "solve_part_2_waves")],
+}
+
+
+@cache
+def get_solver(day: int, part: int) -> solver:
+    """
+    Returns the solver for a star, importing its day module the first time it
+    is requested. Later requests reuse the already imported function.
+
+    Inputs:
+        day: the day of the puzzle, from 1 to 25
+        part: the part of the puzzle, 1 or 2
+    """
+    if (day, part) not in SOLVERS:
+        raise KeyError(f"There is no solver for day {day} part {part}.")
+    module_name, function_name = SOLVERS[(day, part)]
+    return getattr(import_module(module_name), function_name)
+
+
+@cache
+def get_combined_solver(day: int) -> combined_solver:
+    """
+    Returns a solver answering both stars of a day. Days without a combined
+    solver in COMBINED_SOLVERS are answered by running each star's solver.
+
+    Input:
+        day: the day of the puzzle, from 1 to 24
+    """
+    if day in COMBINED_SOLVERS:
+        module_name, function_name = COMBINED_SOLVERS[day]
+        return getattr(import_module(module_name), function_name)
+    part_1, part_2 = get_solver(day, 1), get_solver(day, 2)
+    return lambda text: (part_1(text), part_2(text))
+
+
+def solve(day: int, part: int, text: str) -> int:
+    """
+    Solves a star for the contents of an input file.
+
+    Inputs:
+        day: the day of the puzzle, from 1 to 25
+        part: the part of the puzzle, 1 or 2
+        text: the contents of the input file
+    """
+    return get_solver(day, part)(text)
+
+
+def main(args: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Solve one star for an input file.")
+    parser.add_argument("day", type=int)
+    parser.add_argument("part", choices=("1", "2", "both"),
+                        help="the part to solve, or both to solve both at once")
+    parser.add_argument("filename")
+    parser.add_argument("--timings", action="store_true",
+                        help="report the time and allocations of each phase")
+    parser.add_argument("--memory", action="store_true",
+                        help="also report the peak memory of each phase (slow)")
+    parser.add_argument("--memory-budget", metavar="MB", type=float, default=None,
+                        help="flush caches, then abort, if the solve goes over MB MiB")
+    parser.add_argument("--profile", metavar="FILE", nargs="?", const="",
+                        help="profile the solve, writing the stats to FILE if given")
+    parser.add_argument("--cache", metavar="PATH", nargs="?", const="",
+                        help="look the answer up in (and save it to) a result cache")
+    options = parser.parse_args(args)
+
+    # Instrumentation has to be on before the day module is imported, and the
+    # import itself is kept out of the profile.
+    if options.timings or options.memory:
+        instrument.enable(memory=options.memory)
+    with open(options.filename, "rb") as f:
+        data = f.read()
+    both = options.part == "both"
+    if options.cache is None:
+        star_solver = get_combined_solver(options.day) if both else \
+                      get_solver(options.day, int(options.part))
+        run = partial(star_solver, data.decode("utf-8"))
+    else:
+        # Imported here because the cache module itself imports this one.
+        from cache import ResultCache  # pylint: disable = import-outside-toplevel
+        result_cache = ResultCache(options.cache or None)
+        run = partial(result_cache.solve_both, options.day, data) if both else \
+              partial(result_cache.solve, options.day, int(options.part), data)
+    try:
+        with memory_budget(options.memory_budget):
+            if options.profile is None:
+                answer = run()
+            else:
+                with instrument.profiled(options.profile or None):
+                    answer = run()
+    except MemoryBudgetExceeded:
+        parser.exit(1, f"Day {options.day} went over the memory budget of "
+                       f"{options.memory_budget} MiB.\n")
+    if both:
+        for part, part_answer in enumerate(answer, 1):
+            print(f"Your day {options.day} part {part} answer is {part_answer}")
+    else:
+        print(f"Your day {options.day} part {options.part} answer is {answer}")
+    if options.memory:
+        print(f"Peak RSS: {instrument.peak_rss():.1f} MiB", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
+    sys.exit(0)